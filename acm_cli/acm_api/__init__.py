@@ -1,6 +1,29 @@
-from .acm_api import AcmApi, AcmApiError
-from .structs import SubmitStatus, Problem, SortType, Language, ProblemsPage, ProblemsTag
-from .apis.timus.timus_api import TimusApi
+import importlib
+
+from .acm_api import AcmApi, AcmApiError, OfflineError, SubmitThrottledError
+from .transport import TransportOptions
+from .structs import SubmitStatus, Verdict, Problem, SortType, Language, ProblemsPage, ProblemsTag, ProblemSetMenu
 
 __version__ = "0.0.1"
-__all__ = [AcmApi, TimusApi, SubmitStatus, Problem, SortType, AcmApiError, Language, ProblemsPage, ProblemsTag]
+__all__ = ['AcmApi', 'TimusApi', 'SubmitStatus', 'Verdict', 'Problem', 'SortType', 'AcmApiError', 'OfflineError',
+           'SubmitThrottledError', 'Language', 'ProblemsPage', 'ProblemsTag', 'ProblemSetMenu', 'HttpCache', 'CacheKind',
+           'ParsedCache', 'AsyncAcmApi', 'SyncAcmApi', 'AsyncTimusApi', 'SubmitWatcher', 'BackoffPolicy', 'TransportOptions']
+
+# settings only need the structs, so "--help" and shell completion never load sqlite3, requests or asyncio
+_LAZY_MODULES = {
+    'HttpCache': '.http_cache',
+    'CacheKind': '.http_cache',
+    'ParsedCache': '.parsed_cache',
+    'SubmitWatcher': '.submit_watcher',
+    'BackoffPolicy': '.submit_watcher',
+    'TimusApi': '.apis.timus.timus_api',
+    'AsyncAcmApi': '.async_acm_api',
+    'SyncAcmApi': '.async_acm_api',
+    'AsyncTimusApi': '.apis.timus.async_timus_api',
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_MODULES:
+        raise AttributeError('module {0!r} has no attribute {1!r}'.format(__name__, name))
+    return getattr(importlib.import_module(_LAZY_MODULES[name], __name__), name)
@@ -1,5 +1,5 @@
 from abc import ABCMeta, abstractmethod
-from typing import List
+from typing import Callable, Dict, Iterator, List, Optional
 
 from .structs import Problem, SubmitStatus, SortType, Language, ProblemsTag, ProblemsPage
 
@@ -8,7 +8,22 @@ class AcmApiError(Exception):
     pass
 
 
+class OfflineError(AcmApiError):
+    # raised in the offline mode when the judge would have to be asked
+    pass
+
+
+class SubmitThrottledError(AcmApiError):
+    # the judge rejected a submit because the previous one was sent less than submit_interval ago
+    pass
+
+
 class AcmApi(metaclass=ABCMeta):
+    # minimal number of seconds the judge requires between two submits of one user
+    submit_interval = 0.0
+    # in the offline mode: when the oldest of the stored responses used so far was downloaded
+    data_fetched_at = None  # type: Optional[float]
+
     @abstractmethod
     def login(self, judge_id: str, password: str) -> None:
         pass
@@ -21,6 +36,10 @@ class AcmApi(metaclass=ABCMeta):
     def get_auth_key(self) -> str:
         pass
 
+    @abstractmethod
+    def set_password(self, password: str) -> None:
+        pass
+
     @abstractmethod
     def get_compilation_error(self, submit_id: str) -> str:
         pass
@@ -29,10 +48,26 @@ class AcmApi(metaclass=ABCMeta):
     def get_problem(self, number: int) -> Problem:
         pass
 
+    @abstractmethod
+    def fetch_problem(self, number: int) -> bytes:
+        pass
+
+    @abstractmethod
+    def get_problem_parser(self) -> Callable[[bytes], Problem]:
+        pass
+
     @abstractmethod
     def get_submit_status(self, submit_id: str) -> SubmitStatus:
         pass
 
+    @abstractmethod
+    def get_submits_window(self, from_id: str, count: int) -> List[SubmitStatus]:
+        pass
+
+    @abstractmethod
+    def get_submit_statuses(self, submit_ids: List[str]) -> Dict[str, SubmitStatus]:
+        pass
+
     @abstractmethod
     def submit(self, judge_id: str, language: str, problem_num: int, source: str) -> str:
         pass
@@ -46,6 +81,14 @@ class AcmApi(metaclass=ABCMeta):
     def get_problem_submits(self, problem_number: int, count: int = 1000) -> List[SubmitStatus]:
         pass
 
+    @abstractmethod
+    def iter_problem_submits(self, problem_number: int, count: int = 1000) -> Iterator[SubmitStatus]:
+        pass
+
+    @abstractmethod
+    def iter_my_submits(self, count: int = 1000, from_id: str = None) -> Iterator[SubmitStatus]:
+        pass
+
     @abstractmethod
     def get_submit_source(self, submit_id: str) -> str:
         pass
@@ -54,6 +97,10 @@ class AcmApi(metaclass=ABCMeta):
     def get_languages(self) -> List[Language]:
         pass
 
+    @abstractmethod
+    def get_language_id(self, name: str) -> Optional[str]:
+        pass
+
     @abstractmethod
     def get_tags(self) -> List[ProblemsTag]:
         pass
@@ -69,3 +116,11 @@ class AcmApi(metaclass=ABCMeta):
     @abstractmethod
     def get_page_by_id(self, page_id: str) -> ProblemsPage:
         pass
+
+    @abstractmethod
+    def complete_tag_id(self, prefix: str) -> List[str]:
+        pass
+
+    @abstractmethod
+    def complete_page_id(self, prefix: str) -> List[str]:
+        pass
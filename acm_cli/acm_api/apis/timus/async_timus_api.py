@@ -0,0 +1,174 @@
+import asyncio
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+
+from . import parsers
+from .timus_api import TimusApiBase, TimusUrls, get_status_windows, get_missing_ids, DEFAULT_RENDERER
+from ... import profiler
+from ...async_acm_api import AsyncAcmApi
+from ...async_http import AsyncHttpClient
+from ...http_cache import HttpCache, CacheKind
+from ...parsed_cache import ParsedCache
+from ...single_flight import AsyncSingleFlight
+from ...transport import TransportOptions
+from ...structs import Problem, SubmitStatus, SortType, Language, ProblemsPage, ProblemsTag, ProblemSetMenu
+
+
+class AsyncTimusApi(TimusApiBase, AsyncAcmApi):
+    def __init__(self, locale, cache: HttpCache = None, parsed_cache: ParsedCache = None,
+                 transport: TransportOptions = None, renderer: str = DEFAULT_RENDERER):
+        super().__init__(locale, cache, parsed_cache, transport, renderer)
+        self._http = AsyncHttpClient(self._transport)
+        self._http.cookies['Locale'] = locale
+        # coroutines asking for the same page at once share one request
+        self._in_flight = AsyncSingleFlight()
+
+    async def _get(self, url: str, kind: CacheKind = CacheKind.status):
+        with profiler.span('http', url) as record:
+            response, cache_status = await self._in_flight.do(url, lambda: self._get_cached(url, kind))
+            self._record_get(record, response, cache_status)
+        return response
+
+    async def _get_cached(self, url: str, kind: CacheKind) -> Tuple[object, Optional[str]]:
+        if self._transport.offline:
+            return self._get_stored(url), 'offline'
+        key, cached = self._find_cached(url, kind)
+        if key is None:
+            return await self._http.get(url), None
+        if self._is_fresh(cached, kind):
+            return cached, 'hit'
+
+        headers = cached.get_validators() if cached is not None else {}
+        return self._store(key, cached, url, await self._http.get(url, headers=headers))
+
+    async def _post(self, url: str, payload: Dict[str, Union[str, int]], allow_redirects: bool = True):
+        with profiler.span('http', url) as record:
+            response = await self._http.post(url, payload, allow_redirects=allow_redirects)
+            if record is not None:
+                record.bytes = len(response.content)
+        return response
+
+    async def _parse(self, parser_name: str, content: bytes, struct: type = None):
+        # parsing is CPU bound, keep it off the event loop
+        parser = getattr(parsers, parser_name)
+        loop = asyncio.get_running_loop()
+        if self._parsed_cache is None or struct is None:
+            return await loop.run_in_executor(None, parser, content)
+        return await loop.run_in_executor(None, self._parsed_cache.get_or_parse, parser, content, struct)
+
+    async def login(self, judge_id: str, password: str) -> None:
+        self._set_identity(judge_id, password)
+        await self._post(self._url(TimusUrls.auth), self._login_payload(), allow_redirects=False)
+
+    def login_local(self, judge_id: str, password: str, auth_key: str) -> None:
+        self._set_identity(judge_id, password)
+        self._http.cookies['AuthorID'] = auth_key
+
+    def get_auth_key(self) -> str:
+        return self._http.cookies['AuthorID']
+
+    async def get_compilation_error(self, submit_id: str) -> str:
+        return self._read_text(await self._get(self._compilation_error_url(submit_id)))
+
+    async def get_problem(self, number: int) -> Problem:
+        return await self._parse(self._problem_parser, await self.fetch_problem(number), Problem)
+
+    async def fetch_problem(self, number: int) -> bytes:
+        return (await self._get(self._problem_url(number), CacheKind.problem)).content
+
+    def get_problem_parser(self) -> Callable[[bytes], Problem]:
+        return getattr(parsers, self._problem_parser)
+
+    async def get_submit_status(self, submit_id: str) -> SubmitStatus:
+        response = await self._get(self._submit_status_url(submit_id))
+        return await self._parse('parse_submit_status', response.content)
+
+    async def get_submits_window(self, from_id: str, count: int) -> List[SubmitStatus]:
+        response = await self._get(self._submits_window_url(from_id, count))
+        return await self._parse('parse_problem_submits', response.content)
+
+    async def get_submit_statuses(self, submit_ids: List[str]) -> Dict[str, SubmitStatus]:
+        submit_ids = [str(submit_id) for submit_id in submit_ids]
+        windows = get_status_windows(submit_ids)
+        pages = await asyncio.gather(*[self.get_submits_window(str(from_id), count) for from_id, count in windows])
+        statuses = {status.submit_id: status for page in pages for status in page}
+
+        missing = get_missing_ids(submit_ids, statuses)
+        for submit_id, status in zip(missing, await asyncio.gather(*[self.get_submit_status(x) for x in missing])):
+            statuses[submit_id] = self._check_own_status(submit_id, status)
+        return {submit_id: statuses[submit_id] for submit_id in submit_ids}
+
+    async def submit(self, judge_id: str, language: str, problem_num: int, source: str) -> str:
+        payload = self._submit_payload(judge_id, language, problem_num, source)
+        response = await self._post(self._url(TimusUrls.submit), payload, allow_redirects=False)
+        return self._read_submit_id(response, problem_num)
+
+    async def get_problem_set(self, page: ProblemsPage=None, tag: ProblemsTag=None, sort_type: SortType = SortType.id,
+                              show_ac: bool = True) -> List[Problem]:
+        response = await self._get(self._problem_set_url(page, tag, sort_type, show_ac), CacheKind.problem_set)
+        return await self._parse('parse_problem_set', response.content, Problem)
+
+    async def get_problem_submits(self, problem_number: int, count: int = 1000) -> List[SubmitStatus]:
+        response = await self._get(self._my_submits_url(count, problem_number=problem_number))
+        return await self._parse('parse_problem_submits', response.content)
+
+    async def iter_problem_submits(self, problem_number: int, count: int = 1000) -> AsyncIterator[SubmitStatus]:
+        # the asyncio client buffers whole responses, so rows are yielded after the download
+        for status in await self.get_problem_submits(problem_number, count):
+            yield status
+
+    async def iter_my_submits(self, count: int = 1000, from_id: str = None) -> AsyncIterator[SubmitStatus]:
+        response = await self._get(self._my_submits_url(count, from_id=from_id))
+        for status in await self._parse('parse_problem_submits', response.content):
+            yield status
+
+    async def get_submit_source(self, submit_id: str) -> str:
+        url, payload = self._submit_source_request(await self.get_submit_status(submit_id))
+        return self._read_text(await self._post(url, payload))
+
+    async def get_languages(self) -> List[Language]:
+        languages = self._recall(self._languages)
+        if languages is not None:
+            return languages
+        return await self._in_flight.do('languages', self._load_languages)
+
+    async def _load_languages(self) -> List[Language]:
+        response = await self._get(self._url(TimusUrls.submit), CacheKind.metadata)
+        return self._remember_languages(await self._parse('parse_languages', response.content, Language), response)
+
+    async def get_language_id(self, name: str) -> Optional[str]:
+        await self.get_languages()
+        return self._resolve_language(name)
+
+    async def _get_problem_set_menu(self) -> ProblemSetMenu:
+        # tags and pages come from one page, which is fetched and parsed once for both
+        menu = self._recall(self._menu)
+        if menu is not None:
+            return menu
+        return await self._in_flight.do('menu', self._load_problem_set_menu)
+
+    async def _load_problem_set_menu(self) -> ProblemSetMenu:
+        response = await self._get(self._url(TimusUrls.problem_set), CacheKind.metadata)
+        menu = await self._parse('parse_problem_set_menu', response.content, ProblemSetMenu)
+        return self._remember_menu(menu, response)
+
+    async def get_tags(self) -> List[ProblemsTag]:
+        return (await self._get_problem_set_menu()).tags
+
+    async def get_pages(self) -> List[ProblemsPage]:
+        return (await self._get_problem_set_menu()).pages
+
+    async def get_tag_by_id(self, tag_id: str) -> ProblemsTag:
+        await self._get_problem_set_menu()
+        return self._find_tag(tag_id)
+
+    async def get_page_by_id(self, page_id: str) -> ProblemsPage:
+        await self._get_problem_set_menu()
+        return self._find_page(page_id)
+
+    async def complete_tag_id(self, prefix: str) -> List[str]:
+        await self._get_problem_set_menu()
+        return self._tag_lookup.complete(prefix)
+
+    async def complete_page_id(self, prefix: str) -> List[str]:
+        await self._get_problem_set_menu()
+        return self._page_lookup.complete(prefix)
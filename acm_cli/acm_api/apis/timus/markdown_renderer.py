@@ -0,0 +1,155 @@
+import re
+from typing import AbstractSet, List
+
+import lxml.html
+
+_SPACES = re.compile(r'\s+')
+
+_BLOCK_TAGS = frozenset(['address', 'blockquote', 'center', 'dd', 'div', 'dl', 'dt', 'h1', 'h2', 'h3', 'h4', 'h5',
+                         'h6', 'hr', 'li', 'ol', 'p', 'pre', 'table', 'ul'])
+_HEADER_TAGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+_SKIPPED_TAGS = frozenset(['script', 'style', 'head', 'title'])
+# variables are in italics and often have an index, *a*_1 reads better than _a__1
+_EMPHASIS_TAGS = {'i': '*', 'em': '*', 'var': '*', 'cite': '*', 'dfn': '*', 'b': '**', 'strong': '**',
+                  'code': '`', 'tt': '`', 'kbd': '`', 'samp': '`'}
+# formulas on Timus are written with sub and sup: a<sub>i</sub>, 10<sup>18</sup>
+_INDEX_TAGS = {'sub': '_', 'sup': '^'}
+_PRE_INDENT = '    '
+
+
+def render_markdown(element: lxml.html.HtmlElement, skipped: AbstractSet[lxml.html.HtmlElement] = frozenset()) -> str:
+    # renders the content of the element as it is, without serializing it back to HTML;
+    # the skipped elements are left out together with their tails, as if they were removed
+    return '\n\n'.join(_render_blocks(element, skipped))
+
+
+def _collapse(text: str) -> str:
+    return _SPACES.sub(' ', text) if text else ''
+
+
+def _wrap(text: str, prefix: str, suffix: str) -> str:
+    # the markup goes around the words, the spaces stay outside
+    stripped = text.strip()
+    if not stripped:
+        return text
+    start = len(text) - len(text.lstrip())
+    return text[:start] + prefix + stripped + suffix + text[start + len(stripped):]
+
+
+def _make_block(inline: List[str]) -> str:
+    lines = [line.strip() for line in ''.join(inline).split('\n')]
+    return '\n'.join(lines).strip('\n')
+
+
+def _render_blocks(element: lxml.html.HtmlElement, skipped: AbstractSet[lxml.html.HtmlElement]) -> List[str]:
+    blocks = []
+    inline = [_collapse(element.text)]
+    for child in element:
+        if child in skipped:
+            continue
+        if not isinstance(child.tag, str):
+            # comments and processing instructions
+            pass
+        elif child.tag in _BLOCK_TAGS:
+            block = _make_block(inline)
+            if block:
+                blocks.append(block)
+            inline = []
+            blocks.extend(x for x in _render_block(child, skipped) if x)
+        else:
+            inline.append(_render_inline(child, skipped))
+        inline.append(_collapse(child.tail))
+
+    block = _make_block(inline)
+    if block:
+        blocks.append(block)
+    return blocks
+
+
+def _render_block(element: lxml.html.HtmlElement, skipped: AbstractSet[lxml.html.HtmlElement]) -> List[str]:
+    tag = element.tag
+    if tag in _HEADER_TAGS:
+        title = ' '.join(_render_content(element, skipped).split())
+        return ['#' * _HEADER_TAGS[tag] + ' ' + title] if title else []
+    if tag == 'pre':
+        return [_render_pre(element)]
+    if tag in ('ul', 'ol'):
+        return [_render_list(element, skipped)]
+    if tag == 'table':
+        return [_render_table(element, skipped)]
+    if tag == 'blockquote':
+        return ['\n'.join('> ' + line if line else '>' for line in block.split('\n'))
+                for block in _render_blocks(element, skipped)]
+    if tag == 'hr':
+        return ['* * *']
+    return _render_blocks(element, skipped)
+
+
+def _render_pre(element: lxml.html.HtmlElement) -> str:
+    text = element.text_content()
+    if text.startswith('\n'):
+        text = text[1:]
+    return '\n'.join(_PRE_INDENT + line if line else '' for line in text.rstrip().split('\n'))
+
+
+def _render_list(element: lxml.html.HtmlElement, skipped: AbstractSet[lxml.html.HtmlElement]) -> str:
+    items = []
+    for child in element:
+        if child in skipped or child.tag != 'li':
+            continue
+        marker = '  {0}. '.format(len(items) + 1) if element.tag == 'ol' else '  * '
+        lines = '\n'.join(_render_blocks(child, skipped)).split('\n')
+        indent = ' ' * len(marker)
+        items.append('\n'.join([marker + lines[0]] + [indent + line if line else '' for line in lines[1:]]))
+    return '\n'.join(items)
+
+
+def _render_table(element: lxml.html.HtmlElement, skipped: AbstractSet[lxml.html.HtmlElement]) -> str:
+    rows = []
+    for row in element.iter('tr'):
+        # rows of nested tables are rendered with their cells
+        if row in skipped or next(row.iterancestors('table')) is not element:
+            continue
+        cells = [x for x in row if x.tag in ('td', 'th') and x not in skipped]
+        rows.append('| ' + ' | '.join(' '.join(' '.join(_render_blocks(x, skipped)).split()) for x in cells) + ' |')
+        if len(rows) == 1 and cells and all(x.tag == 'th' for x in cells):
+            rows.append('|' + '---|' * len(cells))
+    return '\n'.join(rows)
+
+
+def _render_content(element: lxml.html.HtmlElement, skipped: AbstractSet[lxml.html.HtmlElement]) -> str:
+    parts = [_collapse(element.text)]
+    for child in element:
+        if child in skipped:
+            continue
+        if isinstance(child.tag, str):
+            parts.append(_render_inline(child, skipped))
+        parts.append(_collapse(child.tail))
+    return ''.join(parts)
+
+
+def _render_inline(element: lxml.html.HtmlElement, skipped: AbstractSet[lxml.html.HtmlElement]) -> str:
+    tag = element.tag
+    if tag == 'br':
+        return '\n'
+    if tag in _SKIPPED_TAGS:
+        return ''
+    if tag == 'img':
+        src = element.get('src')
+        return '![{0}]({1})'.format(element.get('alt', ''), src) if src else ''
+
+    content = _render_content(element, skipped)
+    if tag in _EMPHASIS_TAGS:
+        marker = _EMPHASIS_TAGS[tag]
+        return _wrap(content, marker, marker)
+    if tag in _INDEX_TAGS:
+        index = content.strip()
+        if len(index) > 1:
+            index = '{' + index + '}'
+        return _INDEX_TAGS[tag] + index if index else ''
+    if tag == 'a':
+        href = element.get('href')
+        if not href or href.startswith('javascript:'):
+            return content
+        return _wrap(content, '[', ']({0})'.format(href))
+    return content
@@ -1,18 +1,36 @@
+import html
+import sys
 import urllib.parse
-from functools import reduce
-from typing import List
+from typing import AbstractSet, Callable, Dict, Iterable, Iterator, List, Optional, Set
 
+import lxml.etree
 import lxml.html
 from html2text import html2text
 
+from .markdown_renderer import render_markdown
 from ...acm_api import SubmitStatus, Problem, Language, ProblemsTag, ProblemsPage
+from ...structs import ProblemSetMenu
+from ... import profiler
+from ...profiler import profiled
 
 
+# the only query over a problem page: every block of the statement is looked up by its class afterwards
+_CLASSED_ELEMENTS = lxml.etree.XPath('//*[@class or @id]')
+_LINKS = lxml.etree.XPath('a[@href]')
+_SPANS = lxml.etree.XPath('span')
+
+_INPUT_TITLES = ['Input', 'Исходные данные']
+_OUTPUT_TITLES = ['Output', 'Результат']
+_SAMPLE_TITLES = ['Sample', 'Пример', 'Samples', 'Примеры']
+
+
+@profiled('parse')
 def parse_submit_status(html: str) -> SubmitStatus:
     status_element = lxml.html.fromstring(html).find_class('even')[0]
     return _parse_submit_status_element(status_element)
 
 
+@profiled('parse')
 def parse_languages(html: str) -> List[Language]:
         tree = lxml.html.fromstring(html)
         select_tag = tree.xpath('//select')[0]
@@ -21,20 +39,41 @@ def parse_languages(html: str) -> List[Language]:
         return list([Language(tag.attrib['value'], tag.text) for tag in option_tags])
 
 
+@profiled('parse')
 def parse_problem(html: str) -> Problem:
+    return _parse_problem(html, _render_html2text)
+
+
+@profiled('parse')
+def parse_problem_native(html: str) -> Problem:
+    # the same as parse_problem, but the statement is rendered from the tree without html2text
+    return _parse_problem(html, _render_native)
+
+
+def _parse_problem(html: str, render: Callable[..., str]) -> Problem:
     tree = lxml.html.fromstring(html)
 
+    # the page is walked once and never modified
+    text = None
+    classes = {}  # type: Dict[str, List[lxml.html.HtmlElement]]
+    for element in _CLASSED_ELEMENTS(tree):
+        if text is None and element.get('id') == 'problem_text':
+            text = element
+        for name in element.get('class', '').split():
+            classes.setdefault(name, []).append(element)
+
     problem = Problem()
-    _set_number_and_title(tree, problem)
-    _set_limits(tree, problem)
-    _set_author_and_source(tree, problem)
-    _set_tags(tree, problem)
-    _set_links(tree, problem)
-    _set_text_and_samples(tree, problem)
+    _set_number_and_title(classes['problem_title'][0], problem)
+    _set_limits(classes['problem_limits'][0], problem)
+    _set_author_and_source(classes['problem_source'][0], problem)
+    _set_tags(classes['problem_tags_toggle'][0], problem)
+    _set_links(classes['problem_links'][0], classes, problem)
+    _set_text_and_samples(text, classes, problem, render)
 
     return problem
 
 
+@profiled('parse')
 def parse_problem_set(html: str) -> List[Problem]:
     tree = lxml.html.fromstring(html)
     problems = list()
@@ -46,29 +85,65 @@ def parse_problem_set(html: str) -> List[Problem]:
             problem.is_accepted = True
         elif content[0].xpath('.//img[@src="images/minus.gif"]'):
             problem.is_accepted = False
-        problem.number = content[1].text_content()
+        problem.number = int(content[1].text_content())
         problem.title = content[2].text_content()
         problem.source = content[3].text_content()
-        problem.rating_length = content[4].text_content()
-        problem.difficulty = content[5].text_content()
+        problem.rating_length = _parse_int(content[4].text_content()) or 0
+        problem.difficulty = _parse_int(content[5].text_content()) or 0
         problems.append(problem)
     return problems
 
 
-def parse_problem_submits(html: str) -> List[SubmitStatus]:
-    tree = lxml.html.fromstring(html)
-    evens = tree.find_class('even')
-    odds = tree.find_class('odd')
-    status_elements = reduce(list.__add__, [list(x) for x in zip(evens, odds)], [])
-    if len(evens) > len(odds):
-        status_elements.append(evens[-1])
+@profiled('parse')
+def parse_problem_submits(html: bytes) -> List[SubmitStatus]:
+    return list(_iter_problem_submits([html]))
 
-    return [_parse_submit_status_element(element) for element in status_elements]
 
+def iter_problem_submits(chunks: Iterable[bytes], encoding: str = 'utf-8') -> Iterator[SubmitStatus]:
+    return profiler.iterate('parse', 'iter_problem_submits', _iter_problem_submits(chunks, encoding))
 
-def parse_tags(html: str) -> List[ProblemsPage]:
-    tree = lxml.html.fromstring(html)
-    ps = tree.xpath('//p')[2:]
+
+def _iter_problem_submits(chunks: Iterable[bytes], encoding: str = 'utf-8') -> Iterator[SubmitStatus]:
+    # Status rows are parsed as soon as their closing tag arrives and dropped
+    # right after, so memory does not grow with the number of rows
+    parser = lxml.etree.HTMLPullParser(events=('end',), tag='tr', encoding=encoding)
+    parser.set_element_class_lookup(lxml.html.HtmlElementClassLookup())
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from _read_submit_rows(parser)
+    parser.close()
+    yield from _read_submit_rows(parser)
+
+
+def _read_submit_rows(parser: lxml.etree.HTMLPullParser) -> Iterator[SubmitStatus]:
+    for _event, element in parser.read_events():
+        classes = element.get('class', '').split()
+        if 'even' in classes or 'odd' in classes:
+            yield _parse_submit_status_element(element)
+        element.clear()
+        parent = element.getparent()
+        while parent is not None and element.getprevious() is not None:
+            del parent[0]
+
+
+@profiled('parse')
+def parse_problem_set_menu(html: str) -> ProblemSetMenu:
+    ps = lxml.html.fromstring(html).xpath('//p')
+    return ProblemSetMenu(_parse_pages(ps), _parse_tags(ps))
+
+
+@profiled('parse')
+def parse_tags(html: str) -> List[ProblemsTag]:
+    return _parse_tags(lxml.html.fromstring(html).xpath('//p'))
+
+
+@profiled('parse')
+def parse_pages(html: str) -> List[ProblemsPage]:
+    return _parse_pages(lxml.html.fromstring(html).xpath('//p'))
+
+
+def _parse_tags(ps: List[lxml.html.HtmlElement]) -> List[ProblemsTag]:
+    ps = ps[2:]
     tags = list()
     for element in ps[0].xpath('.//a') + ps[1].xpath('.//a'):
         tag_id = urllib.parse.parse_qs(urllib.parse.urlparse(element.attrib['href']).query)['tag'][0]
@@ -78,9 +153,7 @@ def parse_tags(html: str) -> List[ProblemsPage]:
     return tags
 
 
-def parse_pages(html: str) -> List[ProblemsPage]:
-    tree = lxml.html.fromstring(html)
-    ps = tree.xpath('//p')
+def _parse_pages(ps: List[lxml.html.HtmlElement]) -> List[ProblemsPage]:
     pages = list()
     pages_elements = [ps[0].xpath('.//a')[0]] + ps[1].xpath('.//a')[0::2]
     for element in pages_elements:
@@ -102,19 +175,33 @@ def _parse_submit_status_element(status_element: lxml.html.HtmlElement) -> Submi
     if len(id_element.getchildren()) == 1:
         status.source_file = id_element.getchildren()[0].attrib['href'].split('/')[1]
     status.date = _get_info_from_submit_element(status_element, 'date')
-    status.author = _get_info_from_submit_element(status_element, 'coder')
-    status.problem = _get_info_from_submit_element(status_element, 'problem')
-    status.language = _get_info_from_submit_element(status_element, 'language')
-    status.test = _get_info_from_submit_element(status_element, 'test')
-    status.runtime = _get_info_from_submit_element(status_element, 'runtime')
-    status.memory = _get_info_from_submit_element(status_element, 'memory')
+    # authors, problems and languages repeat across rows, so share one string object per value
+    status.author = sys.intern(_get_info_from_submit_element(status_element, 'coder'))
+    status.problem = sys.intern(_get_info_from_submit_element(status_element, 'problem'))
+    status.language = sys.intern(_get_info_from_submit_element(status_element, 'language'))
+    status.test = _parse_int(_get_info_from_submit_element(status_element, 'test'))
+    status.runtime = _parse_float(_get_info_from_submit_element(status_element, 'runtime'))
+    # memory looks like "1 234 KB"
+    memory = _get_info_from_submit_element(status_element, 'memory').split()[:-1]
+    status.memory = _parse_int(''.join(memory))
 
     status.set_verdict(_parse_verdict(status_element))
-    status.memory = ' '.join(status.memory.split()[:-1])
 
     return status
 
 
+def _parse_int(text: str) -> Optional[int]:
+    text = text.strip()
+    return int(text) if text.isdigit() else None
+
+
+def _parse_float(text: str) -> Optional[float]:
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
 def _parse_verdict(element: lxml.html.HtmlElement) -> str:
     verdict = element.find_class('verdict_rj')
     if len(verdict) == 0:
@@ -124,22 +211,20 @@ def _parse_verdict(element: lxml.html.HtmlElement) -> str:
     return verdict[0].text_content()
 
 
-def _set_number_and_title(tree: lxml.html.HtmlElement, problem: Problem) -> None:
-    title = tree.find_class('problem_title')[0].text
+def _set_number_and_title(title_element: lxml.html.HtmlElement, problem: Problem) -> None:
+    title = title_element.text
     dot_position = title.find('.')
     problem.number = int(title[:dot_position])
     problem.title = title[dot_position+1:].strip()
 
 
-def _set_limits(tree: lxml.html.HtmlElement, problem: Problem) -> None:
-    limits = tree.find_class('problem_limits')[0]
+def _set_limits(limits: lxml.html.HtmlElement, problem: Problem) -> None:
     limits = [x for x in limits.itertext()]
     problem.time_limit = limits[0].split(':')[1].strip()
     problem.memory_limit = limits[1].split(':')[1].strip()
 
 
-def _set_author_and_source(tree: lxml.html.HtmlElement, problem: Problem) -> None:
-    source = tree.find_class('problem_source')[0]
+def _set_author_and_source(source: lxml.html.HtmlElement, problem: Problem) -> None:
     source = [x for x in source.itertext()]
     if len(source) == 0:
         pass
@@ -157,9 +242,8 @@ def _set_author_and_source(tree: lxml.html.HtmlElement, problem: Problem) -> Non
             raise Exception()
 
 
-def _set_tags(tree: lxml.html.HtmlElement, problem: Problem) -> None:
-    tags_div = tree.find_class('problem_tags_toggle')[0].getparent()
-    tags = tags_div.xpath('./a[@href]')
+def _set_tags(tags_toggle: lxml.html.HtmlElement, problem: Problem) -> None:
+    tags = _LINKS(tags_toggle.getparent())
     problem.tags = [x.text for x in tags]
 
 
@@ -167,11 +251,11 @@ def _get_number_from_links(element: str) -> int:
     return int(element[:-1].split('(')[-1])
 
 
-def _set_links(tree: lxml.html.HtmlElement, problem: Problem) -> None:
-    links = tree.find_class('problem_links')[0]
-    problem.difficulty = int(links.xpath('./span')[0].text.split()[1])
-    problem.is_accepted = len(links.find_class('myac')) == 1
-    links = links.xpath('a[@href]')
+def _set_links(links: lxml.html.HtmlElement, classes: Dict[str, List[lxml.html.HtmlElement]],
+               problem: Problem) -> None:
+    problem.difficulty = int(_SPANS(links)[0].text.split()[1])
+    problem.is_accepted = len(_find_class(classes, 'myac', links)) == 1
+    links = _LINKS(links)
     if not problem.is_accepted:
         problem.is_accepted = False if len(links) == 7 else None
     problem.discussion_count = _get_number_from_links(links[2].text)
@@ -181,35 +265,91 @@ def _set_links(tree: lxml.html.HtmlElement, problem: Problem) -> None:
     problem.rating_length = _get_number_from_links(links[2].text)
 
 
-def _set_text_and_samples(tree: lxml.html.HtmlElement, problem: Problem) -> None:
-    text = tree.get_element_by_id('problem_text')
-    source = text.find_class('problem_source')[0]
-    source.getparent().remove(source)
+def _to_html(element: lxml.html.HtmlElement) -> str:
+    return lxml.html.tostring(element).decode('utf-8')
+
+
+def _escape_text(text: Optional[str]) -> str:
+    # lxml.html.tostring escapes text and writes non-ASCII characters as references
+    if not text:
+        return ''
+    return html.escape(text, quote=False).encode('ascii', 'xmlcharrefreplace').decode('ascii')
+
+
+def _to_html_without(element: lxml.html.HtmlElement, skipped: AbstractSet[lxml.html.HtmlElement],
+                     parents: Set[lxml.html.HtmlElement] = None) -> str:
+    # serializes the element as if the skipped descendants were removed from it, tails included, like remove() does
+    if parents is None:
+        parents = set(parent for x in skipped for parent in x.iterancestors())
+    closing = '</{0}>'.format(element.tag)
+    opening = _to_html(lxml.html.Element(element.tag, dict(element.attrib)))[:-len(closing)]
+    children = []
+    for child in element.iterchildren():
+        if child in skipped:
+            continue
+        children.append(_to_html_without(child, skipped, parents) if child in parents else _to_html(child))
+    return opening + _escape_text(element.text) + ''.join(children) + closing + _escape_text(element.tail)
+
+
+def _is_inside(element: lxml.html.HtmlElement, root: lxml.html.HtmlElement,
+               skipped: Set[lxml.html.HtmlElement] = frozenset()) -> bool:
+    while element is not None and element is not root:
+        if element in skipped:
+            return False
+        element = element.getparent()
+    return element is root
+
+
+def _find_class(classes: Dict[str, List[lxml.html.HtmlElement]], name: str, root: lxml.html.HtmlElement,
+                skipped: Set[lxml.html.HtmlElement] = frozenset()) -> List[lxml.html.HtmlElement]:
+    # what root.find_class(name) would return once the skipped elements were removed
+    return [x for x in classes.get(name, []) if _is_inside(x, root, skipped)]
+
+
+@profiled('render')
+def _render_native(element: lxml.html.HtmlElement, skipped: AbstractSet[lxml.html.HtmlElement] = frozenset()) -> str:
+    return render_markdown(element, skipped)
+
+
+@profiled('render')
+def _render_html2text(element: lxml.html.HtmlElement,
+                      skipped: AbstractSet[lxml.html.HtmlElement] = frozenset()) -> str:
+    statement = _to_html_without(element, skipped) if skipped else _to_html(element)
+    return html2text(statement).strip()
+
+
+def _set_text_and_samples(text: lxml.html.HtmlElement, classes: Dict[str, List[lxml.html.HtmlElement]],
+                          problem: Problem, render: Callable[..., str]) -> None:
+    source = _find_class(classes, 'problem_source', text)[0]
+    skipped = {source}
+
     input_next = False
     output_next = False
     for div in text.iterchildren():
-        if div.text in ['Input', 'Исходные данные']:
+        if div is source:
+            continue
+        if div.text in _INPUT_TITLES:
             input_next = True
-        elif div.text in ['Output', 'Результат']:
+        elif div.text in _OUTPUT_TITLES:
             output_next = True
         elif input_next:
             input_next = False
-            problem.input = html2text(lxml.html.tostring(div).decode('utf-8')).strip()
+            problem.input = render(div)
         elif output_next:
             output_next = False
-            problem.output = html2text(lxml.html.tostring(div).decode('utf-8')).strip()
+            problem.output = render(div)
         else:
             continue
-        div.getparent().remove(div)
-    samples = text.find_class('sample')
+        skipped.add(div)
+
+    samples = _find_class(classes, 'sample', text, skipped)
     if len(samples) == 1:
         sample = samples[0]
-        sample_h3 = text.find_class('problem_subtitle')
-        sample_texts = [u'Sample', u'Пример', u'Samples', u'Примеры']
-        sample_h3 = next(x for x in sample_h3 if x.text in sample_texts)
-        sample.getparent().remove(sample)
-        sample_h3.getparent().remove(sample_h3)
-        intables = sample.find_class('intable')
+        subtitles = _find_class(classes, 'problem_subtitle', text, skipped)
+        sample_h3 = next(x for x in subtitles if x.text in _SAMPLE_TITLES)
+        skipped.update([sample, sample_h3])
+        intables = _find_class(classes, 'intable', sample)
         problem.sample_inputs = [x.text.rstrip() for x in intables[0::2]]
         problem.sample_outputs = [x.text.rstrip() for x in intables[1::2]]
-    problem.text = html2text(lxml.html.tostring(text).decode('utf-8')).strip()
+
+    problem.text = render(text, skipped)
@@ -1,17 +1,52 @@
+import re
+import time
 import urllib.parse
 import os.path
 from enum import Enum
-from typing import List, Dict, Union
+from typing import Callable, Iterator, List, Dict, Optional, Union, Tuple
 
-import requests
-import time
+from ...acm_api import AcmApi, AcmApiError, OfflineError, SubmitThrottledError, Problem, SubmitStatus, SortType, \
+    Language, ProblemsPage, ProblemsTag
+from ... import profiler
+from ...http_cache import HttpCache, CacheKind, CachedResponse, get_default_ttl
+from ...lookup import IdLookup, LanguageLookup
+from ...parsed_cache import ParsedCache
+from ...single_flight import SingleFlight
+from ...structs import ProblemSetMenu
+from ...transport import TransportOptions, create_session
+
+
+# Timus rejects a submit that comes sooner than 10 seconds after the previous one
+SUBMIT_INTERVAL = 10.0
+# the page a too early submit gets: "You can submit only once in 10 seconds"
+_THROTTLED_RE = re.compile(r'\b{0:.0f}\s+(second|секунд)'.format(SUBMIT_INTERVAL), re.IGNORECASE)
+_MAX_STATUS_WINDOW = 100
+_STREAM_CHUNK_SIZE = 16 * 1024
+
+DEFAULT_JUDGE_URL = 'http://acm.timus.ru'
+
+# Bump on any change of parsing results to invalidate cached parsed objects
+PARSER_VERSION = 2
 
-from . import parsers
-from ...acm_api import AcmApi, AcmApiError, Problem, SubmitStatus, SortType, Language, ProblemsPage, ProblemsTag
+# statement renderers and the problem parsers that use them, parsed problems are cached by the parser name
+PROBLEM_PARSERS = {'html2text': 'parse_problem', 'native': 'parse_problem_native'}
+DEFAULT_RENDERER = 'html2text'
 
 
-_MAX_SUBMIT_ATTEMPTS_TIME = 15
-_QUERY_WAIT_TIME = 0.3
+# names people type for a language, resolved against the compilers of the judge
+LANGUAGE_ALIASES = {
+    'c': 'c11',
+    'c++': 'c++14',
+    'python': 'python 3',
+    'python2': 'python 2.7',
+    'python3': 'python 3',
+}
+
+
+def _get_parsers():
+    # lxml and html2text are slow to import, so they are loaded only when a page has to be parsed
+    from . import parsers
+    return parsers
 
 
 class TimusApiError(AcmApiError):
@@ -19,84 +54,166 @@ class TimusApiError(AcmApiError):
     pass
 
 
-class TimusUrls(Enum):
-    timus = 'http://acm.timus.ru'
-    submit = 'http://acm.timus.ru/submit.aspx'
-    auth = 'http://acm.timus.ru/auth.aspx'
-    status = 'http://acm.timus.ru/status.aspx'
-    error = 'http://acm.timus.ru/ce.aspx'
-    get_submit = 'http://acm.timus.ru/getsubmit.aspx'
-    problem = 'http://acm.timus.ru/problem.aspx'
-    problem_set = 'http://acm.timus.ru/problemset.aspx'
-
-    def __init__(self, url):
-        self.url = url
+def get_problem_parser_name(renderer: str) -> str:
+    if renderer not in PROBLEM_PARSERS:
+        raise TimusApiError('Unknown statement renderer: {0}'.format(renderer))
+    return PROBLEM_PARSERS[renderer]
 
-    def __str__(self):
-        return self.url
 
-    def set_query(self, query_params: Dict[str, Union[str, int]]) -> str:
-        return self.url + '?' + urllib.parse.urlencode(query_params)
+class TimusUrls(Enum):
+    submit = '/submit.aspx'
+    auth = '/auth.aspx'
+    status = '/status.aspx'
+    error = '/ce.aspx'
+    get_submit = '/getsubmit.aspx'
+    problem = '/problem.aspx'
+    problem_set = '/problemset.aspx'
 
+    def __init__(self, path):
+        self.path = path
 
-class TimusApi(AcmApi):
-    def __init__(self, locale):
+    def __str__(self):
+        return self.path
+
+    def get_url(self, base_url: str, query_params: Dict[str, Union[str, int]] = None) -> str:
+        url = base_url + self.path
+        if query_params is not None:
+            url += '?' + urllib.parse.urlencode(query_params)
+        return url
+
+
+def get_status_windows(submit_ids: List[str], max_count: int = _MAX_STATUS_WINDOW) -> List[Tuple[int, int]]:
+    # Greedy cover from the newest id gives the minimal number of (from, count) windows
+    windows = []
+    ids = sorted(set(int(submit_id) for submit_id in submit_ids), reverse=True)
+    i = 0
+    while i < len(ids):
+        top = ids[i]
+        while i + 1 < len(ids) and top - ids[i + 1] < max_count:
+            i += 1
+        windows.append((top, top - ids[i] + 1))
+        i += 1
+    return windows
+
+
+class _Memo(object):
+    # metadata kept in memory between the commands of the daemon, no longer than the http cache keeps its page
+    def __init__(self, value, fetched_at: Optional[float]):
+        self.value = value
+        self.loaded_at = time.monotonic()
+        # in the offline mode: when the stored page behind the value was downloaded
+        self.fetched_at = fetched_at
+
+
+class TimusApiBase(object):
+    # urls, payloads, caches and metadata of the judge, shared by the blocking and the asyncio clients,
+    # which only send the requests and run the parsers
+    parser_version = PARSER_VERSION
+    submit_interval = SUBMIT_INTERVAL
+
+    def __init__(self, locale, cache: HttpCache = None, parsed_cache: ParsedCache = None,
+                 transport: TransportOptions = None, renderer: str = DEFAULT_RENDERER):
         self.locale = locale
+        self._problem_parser = get_problem_parser_name(renderer)
         self._password = None
         self._judge_id = None
-        self._session = requests.Session()
-        self._session.cookies.set('Locale', locale)
-        self._cached_pages = None
-        self._cached_tags = None
-        self._cached_languages = None
+        self._transport = transport if transport is not None else TransportOptions()
+        self._base_url = self._transport.base_url or DEFAULT_JUDGE_URL
+        self._cache = cache
+        self._parsed_cache = parsed_cache
+        self._languages = None  # type: _Memo
+        self._menu = None  # type: _Memo
+        self._language_lookup = None  # type: LanguageLookup
+        self._tag_lookup = None  # type: IdLookup[ProblemsTag]
+        self._page_lookup = None  # type: IdLookup[ProblemsPage]
+
+    def set_password(self, password: str) -> None:
+        self._password = password
 
-    def login(self, judge_id: str, password: str) -> None:
+    def _set_identity(self, judge_id: str, password: str) -> None:
         self._judge_id = judge_id
         self._password = password
-        payload = {
+
+    def _url(self, url: TimusUrls, query_params: Dict[str, Union[str, int]] = None) -> str:
+        return url.get_url(self._base_url, query_params)
+
+    def _note_fetched_at(self, fetched_at: float) -> None:
+        if self.data_fetched_at is None or fetched_at < self.data_fetched_at:
+            self.data_fetched_at = fetched_at
+
+    def _get_stored(self, url: str) -> CachedResponse:
+        # the offline mode: any stored response is good, however old it is
+        cached = None
+        if self._cache is not None:
+            cached = self._cache.get(self._cache.make_key(url, self.locale, self._judge_id))
+        if cached is None:
+            raise OfflineError('{0} was never downloaded, it is not available in the offline mode'.format(url))
+        self._note_fetched_at(cached.fetched_at)
+        return cached
+
+    def _find_cached(self, url: str, kind: CacheKind) -> Tuple[Optional[str], Optional[CachedResponse]]:
+        # no key when the responses of this kind are not cached
+        if self._cache is None or self._cache.get_ttl(kind) <= 0:
+            return None, None
+        key = self._cache.make_key(url, self.locale, self._judge_id)
+        return key, self._cache.get(key)
+
+    def _is_fresh(self, cached: Optional[CachedResponse], kind: CacheKind) -> bool:
+        return cached is not None and cached.age < self._cache.get_ttl(kind)
+
+    def _store(self, key: str, cached: Optional[CachedResponse], url: str, response) -> Tuple[object, str]:
+        if response.status_code == 304 and cached is not None:
+            self._cache.refresh(key)
+            return cached, 'revalidated'
+        if response.status_code != 200:
+            return response, 'miss'
+        return self._cache.put(key, url, response.content, response.headers), 'miss'
+
+    @staticmethod
+    def _record_get(record, response, cache_status: Optional[str]) -> None:
+        if record is not None:
+            record.cache = cache_status
+            record.bytes = len(response.content) if cache_status in (None, 'miss') else 0
+
+    def _login_payload(self) -> Dict[str, Union[str, int]]:
+        return {
             'Action': 'login',
-            'JudgeID': judge_id
+            'JudgeID': self._judge_id
         }
 
-        self._session.post(TimusUrls.auth, payload, allow_redirects=False)
-
-    def login_local(self, judge_id: str, password: str, auth_key: str) -> None:
-        self._judge_id = judge_id
-        self._password = password
-        self._session.cookies.set('AuthorID', auth_key)
-
-    def get_auth_key(self) -> str:
-        return self._session.cookies['AuthorID']
+    def _compilation_error_url(self, submit_id: str) -> str:
+        return self._url(TimusUrls.error, {'id': submit_id})
 
-    def get_compilation_error(self, submit_id: str) -> str:
-        query = {'id': submit_id}
-        url = TimusUrls.error.set_query(query)
-        response = self._session.get(url)
+    def _problem_url(self, number: int) -> str:
+        return self._url(TimusUrls.problem, {'num': number})
 
-        # if compilation error is found, timus return a text/plain
-        # else he return html page
-        if response.headers['Content-Type'].startswith('text/html'):
-            return ''
+    def _submit_status_url(self, submit_id: str) -> str:
+        return self._url(TimusUrls.status, {'count': 1, 'from': submit_id, 'author': 'me'})
 
-        return response.content.decode('utf-8')
+    def _submits_window_url(self, from_id: str, count: int) -> str:
+        # submit ids are global, so the window covers ids from from_id - count + 1 to from_id
+        return self._url(TimusUrls.status, {'count': count, 'from': from_id})
 
-    def get_problem(self, number: int) -> Problem:
-        query = {'num': number}
-        url = TimusUrls.problem.set_query(query)
-        response = self._session.get(url)
-        return parsers.parse_problem(response.content)
+    def _my_submits_url(self, count: int, problem_number: int = None, from_id: str = None) -> str:
+        query = {'author': 'me', 'count': count}
+        if problem_number is not None:
+            query['num'] = problem_number
+        if from_id is not None:
+            query['from'] = from_id
+        return self._url(TimusUrls.status, query)
 
-    def get_submit_status(self, submit_id: str) -> SubmitStatus:
-        query = {'count': 1, 'from': submit_id, 'author': 'me'}
-        url = TimusUrls.status.set_query(query)
-        response = self._session.get(url)
-        return parsers.parse_submit_status(response.content)
+    def _problem_set_url(self, page: Optional[ProblemsPage], tag: Optional[ProblemsTag], sort_type: SortType,
+                         show_ac: bool) -> str:
+        if page is None:
+            page = ProblemsPage('all', '')
+        if tag is None:
+            tag = ProblemsTag('', '')
+        return self._url(TimusUrls.problem_set,
+                         {'page': page.id, 'tag': tag.id, 'sort': sort_type.name, 'skipac': not show_ac})
 
-    def submit(self, judge_id: str, language: str, problem_num: int, source: str) -> str:
-        # The break between submissions must be at least 10 seconds
-        # if we spend more than once at 10 seconds, Timus return a submit
-        # page with error string
-        payload = {
+    @staticmethod
+    def _submit_payload(judge_id: str, language: str, problem_num: int, source: str) -> Dict[str, Union[str, int]]:
+        return {
             'Action': 'submit',
             'SpaceID': 1,
             'JudgeID': judge_id,
@@ -105,86 +222,257 @@ class TimusApi(AcmApi):
             'Source': source,
         }
 
-        start_time = time.time()
-        while (time.time() - start_time) < _MAX_SUBMIT_ATTEMPTS_TIME:
-            response = self._session.post(TimusUrls.submit, payload, allow_redirects=False)
-            if 'x-submitid' in response.headers:
-                return response.headers['x-submitid']
-            time.sleep(_QUERY_WAIT_TIME)
-
-        raise TimusApiError('Can\'t submit problem in {0} seconds. Try again later', _MAX_SUBMIT_ATTEMPTS_TIME)
-
-    def get_problem_set(self, page: ProblemsPage=None, tag: ProblemsTag=None, sort_type: SortType = SortType.id,
-                        show_ac: bool = True) -> List[Problem]:
-        if page is None:
-            page = ProblemsPage('all', '')
-        if tag is None:
-            tag = ProblemsTag('', '')
-        query = {'page': page.id, 'tag': tag.id, 'sort': sort_type.name, 'skipac': not show_ac}
-        url = TimusUrls.problem_set.set_query(query)
-        response = self._session.get(url)
-        return parsers.parse_problem_set(response.content)
-
-    def get_problem_submits(self, problem_number: int, count: int = 1000) -> List[SubmitStatus]:
-        query = {'author': 'me', 'count': count, 'num': problem_number}
-        url = TimusUrls.status.set_query(query)
-        response = self._session.get(url)
-        return parsers.parse_problem_submits(response.content)
-
-    def get_submit_source(self, submit_id: str) -> str:
-        status = self.get_submit_status(submit_id)
+    def _submit_source_request(self, status: SubmitStatus) -> Tuple[str, Dict[str, Union[str, int]]]:
         payload = {
             'Action': 'getsubmit',
             'JudgeID': self._judge_id,
             'Password': self._password
         }
-        url = TimusUrls.get_submit.value + '/' + status.source_file
-        response = self._session.post(url, payload)
+        return self._url(TimusUrls.get_submit) + '/' + status.source_file, payload
 
-        # if source code is found, timus return a text/plain
+    @staticmethod
+    def _read_text(response) -> str:
+        # if the text is found, timus return a text/plain
         # else he return html page
         if response.headers['Content-Type'].startswith('text/html'):
             # TODO(actics): raise exception
             return ''
-
         return response.content.decode('utf-8')
 
+    @staticmethod
+    def _read_submit_id(response, problem_num: int) -> str:
+        if 'x-submitid' not in response.headers:
+            if _THROTTLED_RE.search(response.content.decode('utf-8', 'replace')):
+                raise SubmitThrottledError('Timus rejected the submit of problem {0}: too early'.format(problem_num))
+            raise TimusApiError('Timus rejected the submit of problem {0}'.format(problem_num))
+        return response.headers['x-submitid']
+
+    def _check_own_status(self, submit_id: str, status: SubmitStatus) -> SubmitStatus:
+        # the page of one submit starts from the given id and shows the nearest submit of the user,
+        # which is another submit when the id belongs to someone else
+        if status.submit_id != submit_id:
+            raise TimusApiError('Submit {0} is not found among the submits of {1}'.format(submit_id, self._judge_id))
+        return status
+
+    def _get_metadata_ttl(self) -> float:
+        if self._cache is not None:
+            return self._cache.get_ttl(CacheKind.metadata)
+        return get_default_ttl(CacheKind.metadata)
+
+    def _recall(self, memo: Optional[_Memo]):
+        if memo is None or time.monotonic() - memo.loaded_at >= self._get_metadata_ttl():
+            return None
+        if memo.fetched_at is not None:
+            self._note_fetched_at(memo.fetched_at)
+        return memo.value
+
+    def _memo(self, value, response) -> _Memo:
+        return _Memo(value, response.fetched_at if self._transport.offline else None)
+
+    def _remember_languages(self, languages: List[Language], response) -> List[Language]:
+        self._language_lookup = LanguageLookup(languages, LANGUAGE_ALIASES)
+        self._languages = self._memo(languages, response)
+        return languages
+
+    def _remember_menu(self, menu: ProblemSetMenu, response) -> ProblemSetMenu:
+        self._tag_lookup = IdLookup(menu.tags)
+        self._page_lookup = IdLookup(menu.pages)
+        self._menu = self._memo(menu, response)
+        return menu
+
+    def _resolve_language(self, name: str) -> Optional[str]:
+        language = self._language_lookup.resolve(name)
+        return language.id if language is not None else None
+
+    def _find_tag(self, tag_id: str) -> ProblemsTag:
+        tag = self._tag_lookup.get(tag_id)
+        if tag is None:
+            raise ValueError('Timus don\'t have tag with id {0}'.format(tag_id.lower()))
+        return tag
+
+    def _find_page(self, page_id: str) -> ProblemsPage:
+        page = self._page_lookup.get(page_id)
+        if page is None:
+            raise ValueError('Timus don\'t have page with id {0}'.format(page_id.lower()))
+        return page
+
+
+def get_missing_ids(submit_ids: List[str], statuses: Dict[str, SubmitStatus]) -> List[str]:
+    # hidden submits are not shown on the common status page
+    return [submit_id for submit_id in submit_ids if submit_id not in statuses]
+
+
+class TimusApi(TimusApiBase, AcmApi):
+    def __init__(self, locale, cache: HttpCache = None, parsed_cache: ParsedCache = None,
+                 transport: TransportOptions = None, renderer: str = DEFAULT_RENDERER):
+        super().__init__(locale, cache, parsed_cache, transport, renderer)
+        self._cookies = {'Locale': locale}
+        self._requests_session = None
+        # threads asking for the same page at once share one request
+        self._in_flight = SingleFlight()
+
+    @property
+    def _session(self):
+        # requests is slow to import and is not needed when everything is served from the cache
+        self._transport.check_online(self._base_url)
+        if self._requests_session is None:
+            self._requests_session = create_session(self._transport)
+            for name, value in self._cookies.items():
+                self._requests_session.cookies.set(name, value)
+        return self._requests_session
+
+    def _get(self, url: str, kind: CacheKind = CacheKind.status):
+        with profiler.span('http', url) as record:
+            response, cache_status = self._in_flight.do(url, lambda: self._get_cached(url, kind))
+            self._record_get(record, response, cache_status)
+        return response
+
+    def _get_cached(self, url: str, kind: CacheKind) -> Tuple[object, Optional[str]]:
+        if self._transport.offline:
+            return self._get_stored(url), 'offline'
+        key, cached = self._find_cached(url, kind)
+        if key is None:
+            return self._session.get(url, timeout=self._transport.timeout), None
+        if self._is_fresh(cached, kind):
+            return cached, 'hit'
+
+        headers = cached.get_validators() if cached is not None else {}
+        return self._store(key, cached, url, self._session.get(url, headers=headers, timeout=self._transport.timeout))
+
+    def _get_stream(self, url: str) -> Iterator[bytes]:
+        with self._session.get(url, stream=True, timeout=self._transport.timeout) as response:
+            yield from profiler.iterate('http', url, response.iter_content(_STREAM_CHUNK_SIZE), len)
+
+    def _post(self, url: str, payload: Dict[str, Union[str, int]], **kwargs):
+        with profiler.span('http', url) as record:
+            response = self._session.post(url, payload, timeout=self._transport.timeout, **kwargs)
+            if record is not None:
+                record.bytes = len(response.content)
+        return response
+
+    def _parse(self, parser_name: str, content: bytes, struct: type):
+        if self._parsed_cache is not None:
+            with profiler.span('parsed-cache', parser_name) as record:
+                result = self._parsed_cache.get(parser_name, content, struct)
+                if record is not None:
+                    record.cache = 'miss' if result is None else 'hit'
+            if result is not None:
+                return result
+
+        result = getattr(_get_parsers(), parser_name)(content)
+        if self._parsed_cache is not None:
+            with profiler.span('parsed-cache', parser_name):
+                self._parsed_cache.put(parser_name, content, result)
+        return result
+
+    def login(self, judge_id: str, password: str) -> None:
+        self._set_identity(judge_id, password)
+        self._post(self._url(TimusUrls.auth), self._login_payload(), allow_redirects=False)
+
+    def login_local(self, judge_id: str, password: str, auth_key: str) -> None:
+        self._set_identity(judge_id, password)
+        self._cookies['AuthorID'] = auth_key
+        if self._requests_session is not None:
+            self._requests_session.cookies.set('AuthorID', auth_key)
+
+    def get_auth_key(self) -> str:
+        return self._session.cookies['AuthorID']
+
+    def get_compilation_error(self, submit_id: str) -> str:
+        return self._read_text(self._get(self._compilation_error_url(submit_id)))
+
+    def get_problem(self, number: int) -> Problem:
+        return self._parse(self._problem_parser, self.fetch_problem(number), Problem)
+
+    def fetch_problem(self, number: int) -> bytes:
+        return self._get(self._problem_url(number), CacheKind.problem).content
+
+    def get_problem_parser(self) -> Callable[[bytes], Problem]:
+        return getattr(_get_parsers(), self._problem_parser)
+
+    def get_submit_status(self, submit_id: str) -> SubmitStatus:
+        response = self._get(self._submit_status_url(submit_id))
+        return _get_parsers().parse_submit_status(response.content)
+
+    def get_submits_window(self, from_id: str, count: int) -> List[SubmitStatus]:
+        response = self._get(self._submits_window_url(from_id, count))
+        return _get_parsers().parse_problem_submits(response.content)
+
+    def get_submit_statuses(self, submit_ids: List[str]) -> Dict[str, SubmitStatus]:
+        submit_ids = [str(submit_id) for submit_id in submit_ids]
+        statuses = {}
+        for from_id, count in get_status_windows(submit_ids):
+            for status in self.get_submits_window(str(from_id), count):
+                statuses[status.submit_id] = status
+        for submit_id in get_missing_ids(submit_ids, statuses):
+            statuses[submit_id] = self._check_own_status(submit_id, self.get_submit_status(submit_id))
+        return {submit_id: statuses[submit_id] for submit_id in submit_ids}
+
+    def submit(self, judge_id: str, language: str, problem_num: int, source: str) -> str:
+        # one attempt only: callers keep submit_interval between submits, see acm_cli.submit_queue
+        payload = self._submit_payload(judge_id, language, problem_num, source)
+        response = self._post(self._url(TimusUrls.submit), payload, allow_redirects=False)
+        return self._read_submit_id(response, problem_num)
+
+    def get_problem_set(self, page: ProblemsPage=None, tag: ProblemsTag=None, sort_type: SortType = SortType.id,
+                        show_ac: bool = True) -> List[Problem]:
+        response = self._get(self._problem_set_url(page, tag, sort_type, show_ac), CacheKind.problem_set)
+        return self._parse('parse_problem_set', response.content, Problem)
+
+    def get_problem_submits(self, problem_number: int, count: int = 1000) -> List[SubmitStatus]:
+        return list(self.iter_problem_submits(problem_number, count))
+
+    def iter_problem_submits(self, problem_number: int, count: int = 1000) -> Iterator[SubmitStatus]:
+        url = self._my_submits_url(count, problem_number=problem_number)
+        return _get_parsers().iter_problem_submits(self._get_stream(url))
+
+    def iter_my_submits(self, count: int = 1000, from_id: str = None) -> Iterator[SubmitStatus]:
+        url = self._my_submits_url(count, from_id=from_id)
+        return _get_parsers().iter_problem_submits(self._get_stream(url))
+
+    def get_submit_source(self, submit_id: str) -> str:
+        url, payload = self._submit_source_request(self.get_submit_status(submit_id))
+        return self._read_text(self._post(url, payload))
+
     def get_languages(self) -> List[Language]:
-        if self._cached_languages is not None:
-            return self._cached_languages
+        languages = self._recall(self._languages)
+        if languages is not None:
+            return languages
 
-        response = self._session.get(TimusUrls.submit)
-        self._cached_languages = parsers.parse_languages(response.content)
-        return self._cached_languages
+        response = self._get(self._url(TimusUrls.submit), CacheKind.metadata)
+        return self._remember_languages(self._parse('parse_languages', response.content, Language), response)
 
-    def get_tags(self) -> List[ProblemsTag]:
-        if self._cached_tags is not None:
-            return self._cached_tags
+    def get_language_id(self, name: str) -> Optional[str]:
+        self.get_languages()
+        return self._resolve_language(name)
+
+    def _get_problem_set_menu(self) -> ProblemSetMenu:
+        # tags and pages come from one page, which is fetched and parsed once for both
+        menu = self._recall(self._menu)
+        if menu is not None:
+            return menu
 
-        response = self._session.get(TimusUrls.problem_set)
-        self._cached_tags = parsers.parse_tags(response.content)
-        return self._cached_tags
+        response = self._get(self._url(TimusUrls.problem_set), CacheKind.metadata)
+        return self._remember_menu(self._parse('parse_problem_set_menu', response.content, ProblemSetMenu), response)
 
+    def get_tags(self) -> List[ProblemsTag]:
+        return self._get_problem_set_menu().tags
 
     def get_pages(self) -> List[ProblemsPage]:
-        if self._cached_pages is not None:
-            return self._cached_pages
-        response = self._session.get(TimusUrls.problem_set)
-        self._cached_pages = parsers.parse_pages(response.content)
-        return self._cached_pages
+        return self._get_problem_set_menu().pages
 
     def get_tag_by_id(self, tag_id: str) -> ProblemsTag:
-        tag_id = tag_id.lower()
-        tags = self.get_tags()
-        for tag in tags:
-            if tag_id == tag.id:
-                return tag
-        raise ValueError('Timus don\'t have tag with id {0}'.format(tag_id))
+        self._get_problem_set_menu()
+        return self._find_tag(tag_id)
 
     def get_page_by_id(self, page_id: str) -> ProblemsPage:
-        page_id = page_id.lower()
-        pages = self.get_pages()
-        for page in pages:
-            if page_id == page.id:
-                return page
-        raise ValueError('Timus don\'t have page with id {0}'.format(page_id))
+        self._get_problem_set_menu()
+        return self._find_page(page_id)
+
+    def complete_tag_id(self, prefix: str) -> List[str]:
+        self._get_problem_set_menu()
+        return self._tag_lookup.complete(prefix)
+
+    def complete_page_id(self, prefix: str) -> List[str]:
+        self._get_problem_set_menu()
+        return self._page_lookup.complete(prefix)
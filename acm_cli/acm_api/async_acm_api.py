@@ -0,0 +1,222 @@
+import asyncio
+import threading
+from abc import ABCMeta, abstractmethod
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from .acm_api import AcmApi
+from .structs import Problem, SubmitStatus, SortType, Language, ProblemsTag, ProblemsPage
+
+
+class AsyncAcmApi(metaclass=ABCMeta):
+    submit_interval = 0.0
+    data_fetched_at = None  # type: Optional[float]
+
+    @abstractmethod
+    async def login(self, judge_id: str, password: str) -> None:
+        pass
+
+    @abstractmethod
+    def login_local(self, judge_id: str, password: str, auth_key: str) -> None:
+        pass
+
+    @abstractmethod
+    def get_auth_key(self) -> str:
+        pass
+
+    @abstractmethod
+    def set_password(self, password: str) -> None:
+        pass
+
+    @abstractmethod
+    async def get_compilation_error(self, submit_id: str) -> str:
+        pass
+
+    @abstractmethod
+    async def get_problem(self, number: int) -> Problem:
+        pass
+
+    @abstractmethod
+    async def fetch_problem(self, number: int) -> bytes:
+        pass
+
+    @abstractmethod
+    def get_problem_parser(self) -> Callable[[bytes], Problem]:
+        pass
+
+    @abstractmethod
+    async def get_submit_status(self, submit_id: str) -> SubmitStatus:
+        pass
+
+    @abstractmethod
+    async def get_submits_window(self, from_id: str, count: int) -> List[SubmitStatus]:
+        pass
+
+    @abstractmethod
+    async def get_submit_statuses(self, submit_ids: List[str]) -> Dict[str, SubmitStatus]:
+        pass
+
+    @abstractmethod
+    async def submit(self, judge_id: str, language: str, problem_num: int, source: str) -> str:
+        pass
+
+    @abstractmethod
+    async def get_problem_set(self, page: ProblemsPage=None, tag: ProblemsTag=None, sort_type: SortType = SortType.id,
+                              show_ac: bool = True) -> List[Problem]:
+        pass
+
+    @abstractmethod
+    async def get_problem_submits(self, problem_number: int, count: int = 1000) -> List[SubmitStatus]:
+        pass
+
+    @abstractmethod
+    def iter_problem_submits(self, problem_number: int, count: int = 1000) -> AsyncIterator[SubmitStatus]:
+        pass
+
+    @abstractmethod
+    def iter_my_submits(self, count: int = 1000, from_id: str = None) -> AsyncIterator[SubmitStatus]:
+        pass
+
+    @abstractmethod
+    async def get_submit_source(self, submit_id: str) -> str:
+        pass
+
+    @abstractmethod
+    async def get_languages(self) -> List[Language]:
+        pass
+
+    @abstractmethod
+    async def get_language_id(self, name: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    async def get_tags(self) -> List[ProblemsTag]:
+        pass
+
+    @abstractmethod
+    async def get_pages(self) -> List[ProblemsPage]:
+        pass
+
+    @abstractmethod
+    async def get_tag_by_id(self, tag_id: str) -> ProblemsTag:
+        pass
+
+    @abstractmethod
+    async def get_page_by_id(self, page_id: str) -> ProblemsPage:
+        pass
+
+    @abstractmethod
+    async def complete_tag_id(self, prefix: str) -> List[str]:
+        pass
+
+    @abstractmethod
+    async def complete_page_id(self, prefix: str) -> List[str]:
+        pass
+
+
+class SyncAcmApi(AcmApi):
+    # Blocking facade over an AsyncAcmApi. Coroutines run on a private event loop
+    # in a background thread, so calls from several threads still overlap.
+    def __init__(self, api: AsyncAcmApi):
+        self.api = api
+        self.submit_interval = api.submit_interval
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    @property
+    def data_fetched_at(self) -> Optional[float]:
+        return self.api.data_fetched_at
+
+    @data_fetched_at.setter
+    def data_fetched_at(self, fetched_at: Optional[float]) -> None:
+        self.api.data_fetched_at = fetched_at
+
+    def close(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def login(self, judge_id: str, password: str) -> None:
+        self._run(self.api.login(judge_id, password))
+
+    def login_local(self, judge_id: str, password: str, auth_key: str) -> None:
+        self.api.login_local(judge_id, password, auth_key)
+
+    def get_auth_key(self) -> str:
+        return self.api.get_auth_key()
+
+    def set_password(self, password: str) -> None:
+        self.api.set_password(password)
+
+    def get_compilation_error(self, submit_id: str) -> str:
+        return self._run(self.api.get_compilation_error(submit_id))
+
+    def get_problem(self, number: int) -> Problem:
+        return self._run(self.api.get_problem(number))
+
+    def fetch_problem(self, number: int) -> bytes:
+        return self._run(self.api.fetch_problem(number))
+
+    def get_problem_parser(self) -> Callable[[bytes], Problem]:
+        return self.api.get_problem_parser()
+
+    def get_submit_status(self, submit_id: str) -> SubmitStatus:
+        return self._run(self.api.get_submit_status(submit_id))
+
+    def get_submits_window(self, from_id: str, count: int) -> List[SubmitStatus]:
+        return self._run(self.api.get_submits_window(from_id, count))
+
+    def get_submit_statuses(self, submit_ids: List[str]) -> Dict[str, SubmitStatus]:
+        return self._run(self.api.get_submit_statuses(submit_ids))
+
+    def submit(self, judge_id: str, language: str, problem_num: int, source: str) -> str:
+        return self._run(self.api.submit(judge_id, language, problem_num, source))
+
+    def get_problem_set(self, page: ProblemsPage=None, tag: ProblemsTag=None, sort_type: SortType = SortType.id,
+                        show_ac: bool = True) -> List[Problem]:
+        return self._run(self.api.get_problem_set(page, tag, sort_type, show_ac))
+
+    def get_problem_submits(self, problem_number: int, count: int = 1000) -> List[SubmitStatus]:
+        return self._run(self.api.get_problem_submits(problem_number, count))
+
+    def iter_problem_submits(self, problem_number: int, count: int = 1000) -> Iterator[SubmitStatus]:
+        return self._iterate(self.api.iter_problem_submits(problem_number, count))
+
+    def iter_my_submits(self, count: int = 1000, from_id: str = None) -> Iterator[SubmitStatus]:
+        return self._iterate(self.api.iter_my_submits(count, from_id))
+
+    def _iterate(self, iterator: AsyncIterator):
+        while True:
+            try:
+                yield self._run(iterator.__anext__())
+            except StopAsyncIteration:
+                return
+
+    def get_submit_source(self, submit_id: str) -> str:
+        return self._run(self.api.get_submit_source(submit_id))
+
+    def get_languages(self) -> List[Language]:
+        return self._run(self.api.get_languages())
+
+    def get_language_id(self, name: str) -> Optional[str]:
+        return self._run(self.api.get_language_id(name))
+
+    def get_tags(self) -> List[ProblemsTag]:
+        return self._run(self.api.get_tags())
+
+    def get_pages(self) -> List[ProblemsPage]:
+        return self._run(self.api.get_pages())
+
+    def get_tag_by_id(self, tag_id: str) -> ProblemsTag:
+        return self._run(self.api.get_tag_by_id(tag_id))
+
+    def get_page_by_id(self, page_id: str) -> ProblemsPage:
+        return self._run(self.api.get_page_by_id(page_id))
+
+    def complete_tag_id(self, prefix: str) -> List[str]:
+        return self._run(self.api.complete_tag_id(prefix))
+
+    def complete_page_id(self, prefix: str) -> List[str]:
+        return self._run(self.api.complete_page_id(prefix))
@@ -0,0 +1,166 @@
+import asyncio
+import gzip
+import http.client
+import http.cookies
+import ssl
+import urllib.parse
+import zlib
+from typing import Dict, Union
+
+from .transport import TransportOptions, RETRY_STATUSES, ACCEPT_ENCODING
+
+_MAX_REDIRECTS = 5
+
+
+class AsyncHttpError(Exception):
+    pass
+
+
+class HttpResponse(object):
+    def __init__(self, url: str, status_code: int, headers: http.client.HTTPMessage, content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+
+class AsyncHttpClient(object):
+    # Minimal HTTP/1.1 client on top of asyncio streams, one connection per request
+    def __init__(self, options: TransportOptions = None):
+        self.cookies = {}
+        self.options = options if options is not None else TransportOptions()
+        self._semaphore = None
+
+    async def get(self, url: str, headers: Dict[str, str] = None, allow_redirects: bool = True) -> HttpResponse:
+        return await self.request('GET', url, None, headers, allow_redirects)
+
+    async def post(self, url: str, data: Dict[str, Union[str, int]] = None, headers: Dict[str, str] = None,
+                   allow_redirects: bool = True) -> HttpResponse:
+        return await self.request('POST', url, data, headers, allow_redirects)
+
+    async def request(self, method: str, url: str, data: Dict[str, Union[str, int]] = None,
+                      headers: Dict[str, str] = None, allow_redirects: bool = True) -> HttpResponse:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.options.pool_size)
+
+        url = str(url)
+        self.options.check_online(url)
+        for _redirect in range(_MAX_REDIRECTS):
+            response = await self._send_with_retries(method, url, data, headers)
+            if not allow_redirects or response.status_code not in (301, 302, 303, 307, 308):
+                return response
+            url = urllib.parse.urljoin(url, response.headers['Location'])
+            if response.status_code in (301, 302, 303):
+                method, data = 'GET', None
+        raise AsyncHttpError('Too many redirects for {0}'.format(url))
+
+    async def _send_with_retries(self, method: str, url: str, data, headers: Dict[str, str]) -> HttpResponse:
+        # POST is not idempotent, a submit must never be sent twice
+        retries = self.options.retries if method in ('GET', 'HEAD') else 0
+        for attempt in range(retries + 1):
+            try:
+                async with self._semaphore:
+                    response = await asyncio.wait_for(self._send(method, url, data, headers),
+                                                      self.options.connect_timeout + self.options.read_timeout)
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                if attempt == retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == retries:
+                    return response
+            await asyncio.sleep(self.options.get_backoff(attempt))
+
+    async def _send(self, method: str, url: str, data, headers: Dict[str, str]) -> HttpResponse:
+        parts = urllib.parse.urlsplit(url)
+        secure = parts.scheme == 'https'
+        port = parts.port or (443 if secure else 80)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+
+        body = urllib.parse.urlencode(data).encode('utf-8') if data is not None else b''
+        request_headers = {
+            'Host': parts.netloc,
+            'Accept-Encoding': ACCEPT_ENCODING,
+            'Connection': 'close',
+        }
+        if self.cookies:
+            request_headers['Cookie'] = '; '.join('{0}={1}'.format(k, v) for k, v in self.cookies.items())
+        if data is not None:
+            request_headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            request_headers['Content-Length'] = str(len(body))
+        if headers is not None:
+            request_headers.update(headers)
+
+        request = '{0} {1} HTTP/1.1\r\n'.format(method, path)
+        request += ''.join('{0}: {1}\r\n'.format(k, v) for k, v in request_headers.items())
+        request = request.encode('latin-1') + b'\r\n' + body
+
+        context = ssl.create_default_context() if secure else None
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(parts.hostname, port, ssl=context),
+                                                self.options.connect_timeout)
+        try:
+            writer.write(request)
+            await writer.drain()
+            return await self._read_response(url, method, reader)
+        finally:
+            writer.close()
+
+    async def _read_response(self, url: str, method: str, reader: asyncio.StreamReader) -> HttpResponse:
+        status_line = await reader.readline()
+        try:
+            status_code = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            raise AsyncHttpError('Malformed status line from {0}: {1!r}'.format(url, status_line))
+
+        header_lines = []
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            header_lines.append(line)
+        headers = http.client.parse_headers(_LinesReader(header_lines))
+
+        for cookie_header in headers.get_all('Set-Cookie', []):
+            cookie = http.cookies.SimpleCookie()
+            cookie.load(cookie_header)
+            for name, morsel in cookie.items():
+                self.cookies[name] = morsel.value
+
+        if method == 'HEAD' or status_code in (204, 304) or 100 <= status_code < 200:
+            content = b''
+        elif headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            content = await _read_chunked(reader)
+        elif 'Content-Length' in headers:
+            content = await reader.readexactly(int(headers['Content-Length']))
+        else:
+            content = await reader.read()
+
+        encoding = headers.get('Content-Encoding', '').lower()
+        if encoding == 'gzip':
+            content = gzip.decompress(content)
+        elif encoding == 'deflate':
+            content = zlib.decompress(content)
+
+        return HttpResponse(url, status_code, headers, content)
+
+
+class _LinesReader(object):
+    def __init__(self, lines):
+        self._lines = iter(lines + [b'\r\n'])
+
+    def readline(self, limit: int = -1) -> bytes:
+        return next(self._lines, b'')
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    chunks = []
+    while True:
+        size_line = await reader.readline()
+        size = int(size_line.split(b';')[0].strip(), 16)
+        if size == 0:
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            return b''.join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readline()
@@ -0,0 +1,142 @@
+import enum
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+_DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+_CACHED_HEADERS = ['Content-Type', 'ETag', 'Last-Modified']
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    content BLOB NOT NULL,
+    content_type TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+'''
+
+
+class CacheKind(enum.Enum):
+    problem = 'problem'
+    problem_set = 'problem-set'
+    metadata = 'metadata'
+    status = 'status'
+
+
+_DEFAULT_TTLS = {
+    CacheKind.problem: 3 * 24 * 60 * 60,
+    CacheKind.problem_set: 10 * 60,
+    CacheKind.metadata: 24 * 60 * 60,
+    CacheKind.status: 0,
+}
+
+
+def get_default_ttl(kind: CacheKind) -> float:
+    return _DEFAULT_TTLS[kind]
+
+
+class CachedResponse(object):
+    status_code = 200
+
+    def __init__(self, content: bytes, headers: Dict[str, str], fetched_at: float):
+        self.content = content
+        self.headers = headers
+        self.fetched_at = fetched_at
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def get_validators(self) -> Dict[str, str]:
+        validators = {}
+        if 'ETag' in self.headers:
+            validators['If-None-Match'] = self.headers['ETag']
+        if 'Last-Modified' in self.headers:
+            validators['If-Modified-Since'] = self.headers['Last-Modified']
+        return validators
+
+
+class HttpCache(object):
+    def __init__(self, path: str, max_size: int = _DEFAULT_MAX_SIZE, ttls: Dict[CacheKind, float] = None):
+        cache_dir = os.path.dirname(path)
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+        self.max_size = max_size
+        self.ttls = dict(_DEFAULT_TTLS)
+        if ttls is not None:
+            self.ttls.update(ttls)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+
+    @staticmethod
+    def make_key(url: str, locale: str, judge_id: Optional[str]) -> str:
+        identity = '\n'.join([url, locale or '', judge_id or ''])
+        return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+    def get_ttl(self, kind: CacheKind) -> float:
+        return self.ttls[kind]
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT content, content_type, etag, last_modified, fetched_at FROM responses WHERE key = ?',
+                (key,)).fetchone()
+            if row is None:
+                return None
+            with self._connection:
+                self._connection.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (time.time(), key))
+
+        content, content_type, etag, last_modified, fetched_at = row
+        headers = {}
+        if content_type is not None:
+            headers['Content-Type'] = content_type
+        if etag is not None:
+            headers['ETag'] = etag
+        if last_modified is not None:
+            headers['Last-Modified'] = last_modified
+        return CachedResponse(content, headers, fetched_at)
+
+    def put(self, key: str, url: str, content: bytes, headers) -> CachedResponse:
+        now = time.time()
+        cached_headers = {name: headers[name] for name in _CACHED_HEADERS if name in headers}
+        row = (key, url, content, cached_headers.get('Content-Type'), cached_headers.get('ETag'),
+               cached_headers.get('Last-Modified'), len(content), now, now)
+        with self._lock, self._connection:
+            self._connection.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', row)
+            self._evict()
+        return CachedResponse(content, cached_headers, now)
+
+    def refresh(self, key: str) -> None:
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute('UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE key = ?',
+                                     (now, now, key))
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM responses')
+
+    def _evict(self) -> None:
+        total_size = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total_size <= self.max_size:
+            return
+
+        rows = self._connection.execute('SELECT key, size FROM responses ORDER BY accessed_at').fetchall()
+        evicted = []
+        for key, size in rows:
+            if total_size <= self.max_size:
+                break
+            evicted.append((key,))
+            total_size -= size
+        self._connection.executemany('DELETE FROM responses WHERE key = ?', evicted)
@@ -0,0 +1,59 @@
+import bisect
+import difflib
+from typing import Dict, Generic, List, Optional, TypeVar
+
+from .structs import IdWithDescription, Language
+
+T = TypeVar('T', bound=IdWithDescription)
+
+# a misspelled language name still has to be close, a wrong compiler is worse than an error
+_FUZZY_CUTOFF = 0.75
+
+
+class IdLookup(Generic[T]):
+    # built once per load of the metadata: exact ids from a dict, completions from the sorted ids
+    def __init__(self, items: List[T]):
+        self._by_id = {}  # type: Dict[str, T]
+        for item in items:
+            self._by_id.setdefault(item.id.lower(), item)
+        self._ids = sorted(self._by_id)
+
+    def get(self, item_id: str) -> Optional[T]:
+        return self._by_id.get(item_id.lower())
+
+    def complete(self, prefix: str) -> List[str]:
+        prefix = prefix.lower()
+        ids = []
+        for i in range(bisect.bisect_left(self._ids, prefix), len(self._ids)):
+            if not self._ids[i].startswith(prefix):
+                break
+            ids.append(self._by_id[self._ids[i]].id)
+        return ids
+
+
+class LanguageLookup(object):
+    def __init__(self, languages: List[Language], aliases: Dict[str, str] = None):
+        self.languages = languages
+        self.aliases = aliases or {}
+        self._by_id = IdLookup(languages)
+        self._by_description = {}  # type: Dict[str, Language]
+        for language in languages:
+            self._by_description.setdefault(language.description.lower(), language)
+
+    def resolve(self, name: str) -> Optional[Language]:
+        # the first rule that matches wins and the judge order breaks ties, so a name always gives one compiler
+        name = name.strip().lower()
+        name = self.aliases.get(name, name)
+        language = self._by_id.get(name) or self._by_description.get(name)
+        if language is not None:
+            return language
+        for language in self.languages:
+            if name in language.description.lower():
+                return language
+        # misspellings: the name against the start of every description of the same length
+        best, best_ratio = None, _FUZZY_CUTOFF
+        for language in self.languages:
+            ratio = difflib.SequenceMatcher(None, name, language.description.lower()[:len(name)]).ratio()
+            if ratio > best_ratio or (best is None and ratio == best_ratio):
+                best, best_ratio = language, ratio
+        return best
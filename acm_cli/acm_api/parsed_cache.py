@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable
+
+_DEFAULT_MAX_ENTRIES = 5000
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS parsed (
+    key TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS parsed_accessed_at ON parsed (accessed_at);
+'''
+
+
+class ParsedCache(object):
+    def __init__(self, path: str, version: int, max_entries: int = _DEFAULT_MAX_ENTRIES):
+        cache_dir = os.path.dirname(path)
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+        self.version = version
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+        with self._connection:
+            self._connection.execute('DELETE FROM parsed WHERE version != ?', (version,))
+
+    @staticmethod
+    def make_key(parser_name: str, content: bytes) -> str:
+        digest = hashlib.sha1(content)
+        digest.update(parser_name.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, parser_name: str, content: bytes, struct: type) -> Any:
+        key = self.make_key(parser_name, content)
+        with self._lock:
+            row = self._connection.execute('SELECT data FROM parsed WHERE key = ? AND version = ?',
+                                           (key, self.version)).fetchone()
+            if row is None:
+                return None
+            with self._connection:
+                self._connection.execute('UPDATE parsed SET accessed_at = ? WHERE key = ?', (time.time(), key))
+        return _load(json.loads(row[0]), struct)
+
+    def put(self, parser_name: str, content: bytes, result: Any) -> None:
+        key = self.make_key(parser_name, content)
+        data = json.dumps(_dump(result), ensure_ascii=False, separators=(',', ':'))
+        with self._lock, self._connection:
+            self._connection.execute('INSERT OR REPLACE INTO parsed VALUES (?, ?, ?, ?)',
+                                     (key, self.version, data, time.time()))
+            self._evict()
+
+    def get_or_parse(self, parser: Callable[[bytes], Any], content: bytes, struct: type) -> Any:
+        result = self.get(parser.__name__, content, struct)
+        if result is None:
+            result = parser(content)
+            self.put(parser.__name__, content, result)
+        return result
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM parsed')
+
+    def _evict(self) -> None:
+        count = self._connection.execute('SELECT COUNT(*) FROM parsed').fetchone()[0]
+        if count <= self.max_entries:
+            return
+        self._connection.execute(
+            'DELETE FROM parsed WHERE key IN (SELECT key FROM parsed ORDER BY accessed_at LIMIT ?)',
+            (count - self.max_entries,))
+
+
+def _dump(result: Any) -> Any:
+    if isinstance(result, list):
+        return [item.to_dict() for item in result]
+    return result.to_dict()
+
+
+def _load(data: Any, struct: type) -> Any:
+    if isinstance(data, list):
+        return [struct.from_dict(item) for item in data]
+    return struct.from_dict(data)
@@ -0,0 +1,189 @@
+import contextlib
+import contextvars
+import functools
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+# records of the running span, a context variable keeps the spans of concurrent coroutines apart
+_current = contextvars.ContextVar('current_span', default=None)
+_profile = None  # type: Optional[Profile]
+
+
+class Record(object):
+    def __init__(self, phase: str, name: str):
+        self.phase = phase
+        self.name = name
+        self.duration = 0.0
+        self.child_duration = 0.0
+        self.bytes = None  # type: Optional[int]
+        self.rows = None  # type: Optional[int]
+        self.cache = None  # type: Optional[str]
+
+    @property
+    def self_duration(self) -> float:
+        return max(self.duration - self.child_duration, 0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'phase': self.phase,
+            'name': self.name,
+            'ms': round(self.duration * 1000, 3),
+            'self_ms': round(self.self_duration * 1000, 3),
+            'bytes': self.bytes,
+            'rows': self.rows,
+            'cache': self.cache,
+        }
+
+
+class Profile(object):
+    def __init__(self):
+        self.records = []  # type: List[Record]
+        self.started = time.perf_counter()
+        self.duration = None  # type: Optional[float]
+        self._lock = threading.Lock()
+
+    def _enter(self, record: Record):
+        return _current.set(record)
+
+    def _exit(self, record: Record, token, duration: float) -> None:
+        _current.reset(token)
+        parent = _current.get()
+        with self._lock:
+            record.duration += duration
+            if parent is not None:
+                parent.child_duration += duration
+
+    def _add(self, record: Record) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self.started
+
+    def get_phases(self) -> Dict[str, Dict[str, Any]]:
+        phases = {}
+        for record in self.records:
+            phase = phases.setdefault(record.phase, {'calls': 0, 'self': 0.0, 'total': 0.0, 'bytes': None,
+                                                     'rows': None, 'cache': {}})
+            phase['calls'] += 1
+            phase['self'] += record.self_duration
+            phase['total'] += record.duration
+            if record.bytes is not None:
+                phase['bytes'] = (phase['bytes'] or 0) + record.bytes
+            if record.rows is not None:
+                phase['rows'] = (phase['rows'] or 0) + record.rows
+            if record.cache is not None:
+                phase['cache'][record.cache] = phase['cache'].get(record.cache, 0) + 1
+        return phases
+
+    def format_report(self) -> str:
+        lines = ['{0:<14} {1:>5} {2:>10} {3:>10} {4:>10} {5:>7}  {6}'.format(
+            'phase', 'calls', 'self ms', 'total ms', 'KB', 'rows', 'cache')]
+        accounted = 0.0
+        for name, phase in sorted(self.get_phases().items(), key=lambda item: -item[1]['self']):
+            accounted += phase['self']
+            cache = ', '.join('{0} {1}'.format(count, kind) for kind, count in sorted(phase['cache'].items()))
+            size = '{0:.1f}'.format(phase['bytes'] / 1024) if phase['bytes'] is not None else '-'
+            rows = phase['rows'] if phase['rows'] is not None else '-'
+            lines.append('{0:<14} {1:>5} {2:>10.1f} {3:>10.1f} {4:>10} {5:>7}  {6}'.format(
+                name, phase['calls'], phase['self'] * 1000, phase['total'] * 1000, size, rows, cache).rstrip())
+        # output to the terminal and everything between the hooks
+        lines.append('{0:<14} {1:>5} {2:>10.1f}'.format('other', '', max(self.duration - accounted, 0.0) * 1000))
+        lines.append('{0:<14} {1:>5} {2:>10.1f}'.format('total', '', self.duration * 1000))
+        return '\n'.join(lines)
+
+    def write_json_lines(self, path: str, command: List[str]) -> None:
+        # appended, so that the runs of a CI job end up in one file
+        with open(path, 'a', encoding='utf-8') as json_file:
+            for record in self.records:
+                json_file.write(json.dumps(dict(record.to_dict(), command=command), ensure_ascii=False) + '\n')
+            total = {'phase': 'total', 'name': ' '.join(command), 'ms': round(self.duration * 1000, 3),
+                     'command': command}
+            json_file.write(json.dumps(total, ensure_ascii=False) + '\n')
+
+
+def start() -> Profile:
+    global _profile
+    _profile = Profile()
+    return _profile
+
+
+def stop() -> Optional[Profile]:
+    global _profile
+    profile, _profile = _profile, None
+    if profile is not None:
+        profile.finish()
+    return profile
+
+
+def is_enabled() -> bool:
+    return _profile is not None
+
+
+@contextlib.contextmanager
+def span(phase: str, name: str) -> Iterator[Optional[Record]]:
+    profile = _profile
+    if profile is None:
+        yield None
+        return
+
+    record = Record(phase, name)
+    token = profile._enter(record)
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        profile._exit(record, token, time.perf_counter() - started)
+        profile._add(record)
+
+
+def iterate(phase: str, name: str, items: Iterable, get_size: Callable[[Any], int] = None) -> Iterator:
+    # only the time spent inside the iterator is counted, not the time of the consumer
+    profile = _profile
+    if profile is None:
+        yield from items
+        return
+
+    record = Record(phase, name)
+    record.rows = 0
+    if get_size is not None:
+        record.bytes = 0
+    iterator = iter(items)
+    try:
+        while True:
+            token = profile._enter(record)
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                profile._exit(record, token, time.perf_counter() - started)
+            record.rows += 1
+            if get_size is not None:
+                record.bytes += get_size(item)
+            yield item
+    finally:
+        profile._add(record)
+
+
+def _get_size(value: Any) -> Optional[int]:
+    return len(value) if isinstance(value, (bytes, str)) else None
+
+
+def profiled(phase: str):
+    # for the parsers: the size of the page and the number of parsed rows are recorded as well
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _profile is None:
+                return function(*args, **kwargs)
+            with span(phase, function.__name__) as record:
+                result = function(*args, **kwargs)
+                record.bytes = _get_size(args[0]) if args else None
+                record.rows = len(result) if isinstance(result, list) else 1
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None  # type: BaseException
+
+
+class SingleFlight(object):
+    # concurrent calls with the same key wait for the first one and share its result
+    def __init__(self):
+        self._calls = {}  # type: Dict[Hashable, _Call]
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight(object):
+    def __init__(self):
+        self._calls = {}  # type: Dict[Hashable, asyncio.Future]
+
+    async def do(self, key: Hashable, function: Callable[[], Awaitable]) -> Any:
+        future = self._calls.get(key)
+        if future is None:
+            future = self._calls[key] = asyncio.ensure_future(function())
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+        # a cancelled caller must not cancel the request the others are waiting for
+        return await asyncio.shield(future)
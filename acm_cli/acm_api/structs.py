@@ -1,12 +1,23 @@
 import enum
+from typing import Any, Dict, List, Optional
+
+
+class Verdict(enum.Enum):
+    compiling = 'Compiling'
+    running = 'Running'
+    waiting = 'Waiting'
+    accepted = 'Accepted'
+    failed = 'Failed'
+
+    def __str__(self):
+        return self.value
 
 
 class SubmitStatus(object):
     # TODO(actics): make this abstract (now it timus only support)
-    _processing_verdicts = ['Compiling', 'Running', 'Waiting']
-    _running_verdict = 'Running'
-    _accepted_verdict = 'Accepted'
-    _failed_verdict = 'Failed'
+    __slots__ = ['submit_id', 'date', 'author', 'problem', 'language', 'verdict', 'test', 'runtime', 'memory',
+                 'info', 'source_file']
+    _processing_verdicts = frozenset([Verdict.compiling, Verdict.running, Verdict.waiting])
     _compilation_error_info = 'Compilation error'
 
     def __init__(self) -> None:
@@ -15,17 +26,18 @@ class SubmitStatus(object):
         self.author = ''
         self.problem = ''
         self.language = ''
-        self.verdict = ''
-        self.test = ''
-        self.runtime = ''
-        self.memory = ''
+        self.verdict = None  # type: Optional[Verdict]
+        self.test = None  # type: Optional[int]
+        self.runtime = None  # type: Optional[float]
+        self.memory = None  # type: Optional[int]
         self.info = ''
         self.source_file = ''
 
     def set_verdict(self, verdict: str) -> None:
-        self.verdict = verdict
-        if not self.in_process and not self.accepted:
-            self.verdict = self._failed_verdict
+        try:
+            self.verdict = Verdict(verdict)
+        except ValueError:
+            self.verdict = Verdict.failed
             self.info = verdict
 
     @property
@@ -34,22 +46,40 @@ class SubmitStatus(object):
 
     @property
     def running(self) -> bool:
-        return self.verdict == self._running_verdict
+        return self.verdict is Verdict.running
 
     @property
     def accepted(self) -> bool:
-        return self.verdict == self._accepted_verdict
+        return self.verdict is Verdict.accepted
 
     @property
     def failed(self) -> bool:
-        return self.verdict == self._failed_verdict
+        return self.verdict is Verdict.failed
 
     @property
     def compilation_error(self) -> bool:
         return self.info == self._compilation_error_info
 
+    def to_dict(self) -> Dict[str, Any]:
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data['verdict'] = self.verdict.value if self.verdict is not None else None
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SubmitStatus':
+        status = cls()
+        for name in cls.__slots__:
+            if name in data:
+                setattr(status, name, data[name])
+        status.verdict = Verdict(status.verdict) if status.verdict is not None else None
+        return status
+
 
 class Problem(object):
+    __slots__ = ['number', 'title', 'time_limit', 'memory_limit', 'text', 'input', 'output', 'sample_inputs',
+                 'sample_outputs', 'author', 'source', 'tags', 'difficulty', 'is_accepted', 'discussion_count',
+                 'submission_count', 'accepted_submission_count', 'rating_length']
+
     def __init__(self):
         self.number = 0
         self.title = ''
@@ -70,6 +100,17 @@ class Problem(object):
         self.accepted_submission_count = 0
         self.rating_length = 0
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Problem':
+        problem = cls()
+        for name in cls.__slots__:
+            if name in data:
+                setattr(problem, name, data[name])
+        return problem
+
 
 class SortType(enum.Enum):
     id = 'id'
@@ -78,18 +119,44 @@ class SortType(enum.Enum):
 
 
 class IdWithDescription(object):
+    __slots__ = ['id', 'description']
+
     def __init__(self, obj_id: str, description: str):
         self.id = obj_id
         self.description = description
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {'id': self.id, 'description': self.description}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'IdWithDescription':
+        return cls(data['id'], data['description'])
+
 
 class Language(IdWithDescription):
-    pass
+    __slots__ = []
 
 
 class ProblemsTag(IdWithDescription):
-    pass
+    __slots__ = []
 
 
 class ProblemsPage(IdWithDescription):
-    pass
+    __slots__ = []
+
+
+class ProblemSetMenu(object):
+    # the pages and the tags share one page of the judge, so they are parsed and cached together
+    __slots__ = ['pages', 'tags']
+
+    def __init__(self, pages: List[ProblemsPage] = None, tags: List[ProblemsTag] = None):
+        self.pages = pages if pages is not None else []
+        self.tags = tags if tags is not None else []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'pages': [page.to_dict() for page in self.pages], 'tags': [tag.to_dict() for tag in self.tags]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ProblemSetMenu':
+        return cls([ProblemsPage.from_dict(item) for item in data['pages']],
+                   [ProblemsTag.from_dict(item) for item in data['tags']])
@@ -0,0 +1,75 @@
+import random
+import time
+from typing import Callable, Dict, Iterator, List
+
+from .acm_api import AcmApi
+from .structs import SubmitStatus
+
+
+class BackoffPolicy(object):
+    def __init__(self, waiting_delay: float = 0.5, running_delay: float = 1.0, max_delay: float = 5.0,
+                 factor: float = 1.5, jitter: float = 0.2):
+        self.waiting_delay = waiting_delay
+        self.running_delay = running_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.jitter = jitter
+
+    def get_delay(self, statuses: List[SubmitStatus], unchanged_polls: int) -> float:
+        # compilation and queueing end quickly, but a running solution may take all of its time limit
+        if any(status.in_process and not status.running for status in statuses):
+            delay = self.waiting_delay
+        else:
+            delay = min(self.running_delay * self.factor ** unchanged_polls, self.max_delay)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+def _get_status_key(status: SubmitStatus):
+    return status.verdict, status.test, status.runtime, status.memory, status.info
+
+
+class SubmitWatcher(object):
+    def __init__(self, api: AcmApi, policy: BackoffPolicy = None,
+                 callback: Callable[[SubmitStatus], None] = None):
+        self.api = api
+        self.policy = policy if policy is not None else BackoffPolicy()
+        self.callback = callback
+        self.statuses = {}  # type: Dict[str, SubmitStatus]
+        self._pending = set()
+        self._unchanged_polls = 0
+
+    def add(self, submit_id: str) -> None:
+        self._pending.add(str(submit_id))
+
+    def discard(self, submit_id: str) -> None:
+        self._pending.discard(str(submit_id))
+
+    @property
+    def pending(self) -> List[str]:
+        return sorted(self._pending, key=int)
+
+    def poll(self, submit_ids: List[str] = None) -> List[SubmitStatus]:
+        changed = []
+        for status in self.api.get_submit_statuses(self.pending if submit_ids is None else submit_ids).values():
+            previous = self.statuses.get(status.submit_id)
+            self.statuses[status.submit_id] = status
+            if not status.in_process:
+                self._pending.discard(status.submit_id)
+            if previous is None or _get_status_key(previous) != _get_status_key(status):
+                changed.append(status)
+                if self.callback is not None:
+                    self.callback(status)
+
+        self._unchanged_polls = 0 if changed else self._unchanged_polls + 1
+        return changed
+
+    def get_delay(self) -> float:
+        pending_statuses = [self.statuses[submit_id] for submit_id in self._pending if submit_id in self.statuses]
+        return self.policy.get_delay(pending_statuses, self._unchanged_polls)
+
+    def watch(self) -> Iterator[SubmitStatus]:
+        while self._pending:
+            for status in self.poll():
+                yield status
+            if self._pending:
+                time.sleep(self.get_delay())
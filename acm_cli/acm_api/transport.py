@@ -0,0 +1,62 @@
+from typing import Tuple
+
+from .acm_api import OfflineError
+
+_DEFAULT_POOL_SIZE = 10
+_DEFAULT_CONNECT_TIMEOUT = 5.0
+_DEFAULT_READ_TIMEOUT = 30.0
+_DEFAULT_RETRIES = 3
+_DEFAULT_BACKOFF_FACTOR = 0.5
+# server errors and gateway hiccups are worth another try, client errors are not
+RETRY_STATUSES = (500, 502, 503, 504)
+ACCEPT_ENCODING = 'gzip, deflate'
+
+
+class TransportOptions(object):
+    def __init__(self, base_url: str = None, pool_size: int = _DEFAULT_POOL_SIZE,
+                 connect_timeout: float = _DEFAULT_CONNECT_TIMEOUT, read_timeout: float = _DEFAULT_READ_TIMEOUT,
+                 retries: int = _DEFAULT_RETRIES, backoff_factor: float = _DEFAULT_BACKOFF_FACTOR,
+                 offline: bool = False):
+        self.base_url = base_url.rstrip('/') if base_url else None
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        # nothing is sent, reads are served only from the local cache
+        self.offline = offline
+
+    def check_online(self, url: str) -> None:
+        if self.offline:
+            raise OfflineError('{0} is not available in the offline mode'.format(url))
+
+    @property
+    def key(self) -> Tuple:
+        # two options with equal keys build the same session
+        return (self.base_url, self.pool_size, self.connect_timeout, self.read_timeout, self.retries,
+                self.backoff_factor, self.offline)
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        return self.connect_timeout, self.read_timeout
+
+    def get_backoff(self, attempt: int) -> float:
+        return self.backoff_factor * 2 ** attempt
+
+
+def create_session(options: TransportOptions):
+    # requests is slow to import, so it is loaded only when the first request is made
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    # POST is not idempotent: a submit is only retried when the connection could not be established
+    retry = Retry(total=options.retries, backoff_factor=options.backoff_factor, status_forcelist=RETRY_STATUSES,
+                  allowed_methods=frozenset(['GET', 'HEAD']), raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=options.pool_size, pool_maxsize=options.pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+    return session
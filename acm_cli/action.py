@@ -10,6 +10,11 @@ class Action(Enum):
     languages = 'languages'
     tags = 'tags'
     pages = 'pages'
+    mirror = 'mirror'
+    status = 'status'
+    sync = 'sync'
+    search = 'search'
+    daemon = 'daemon'
 
     def __str__(self):
         return self.value
@@ -3,10 +3,18 @@ import gettext
 import os
 import sys
 import time
-from typing import List, Dict, Callable, Tuple
+from typing import List, Dict, Callable, Iterator, Tuple
 
 from .page_tag_prompt import PageTagPrompt, pages_action, tags_action
-from .acm_api import AcmApi, SubmitStatus, Language, ProblemsPage, ProblemsTag
+from .mirror import mirror_action
+from .submits_db import SubmitsDatabase
+from .submit_queue import SubmitJob, SubmitQueue
+from .problem_store import ProblemStore
+from .problem_query import ProblemQuery, load_problems, run_query
+from .listing import Column, get_dict_columns, get_struct_columns, get_output_format, is_structured, write_listing
+from .search_index import SearchIndex, SearchResult
+from .acm_api import AcmApi, AcmApiError, OfflineError, SubmitStatus, Problem, ProblemsPage, ProblemsTag
+from .acm_api import profiler
 from .action import Action
 from .settings import Settings
 from .simple_progressbar import SimpleProgressBar
@@ -15,15 +23,29 @@ _ = gettext.gettext
 _n = gettext.ngettext
 double_sep = str(os.linesep + os.linesep)
 
-QUERY_WAIT_TIME = 0.3
-
-language_map = {
-    'c': 'c11',
-    'c++': 'c++14',
-    'python': 'python 3',
-    'python2': 'python 2.7',
-    'python3': 'python 3',
-}
+_PROBLEM_COLUMNS = [
+    Column('number', lambda p: p.number),
+    Column('title', lambda p: p.title),
+    Column('difficulty', lambda p: p.difficulty),
+    Column('authors', lambda p: p.rating_length),
+    Column('accepted', lambda p: p.is_accepted),
+]
+_SUBMIT_COLUMNS = [
+    Column('submit_id', lambda s: s.submit_id),
+    Column('date', lambda s: s.date),
+    Column('author', lambda s: s.author),
+    Column('problem', lambda s: s.problem),
+    Column('language', lambda s: s.language),
+    Column('verdict', lambda s: s.verdict),
+    Column('info', lambda s: s.info),
+    Column('test', lambda s: s.test),
+    Column('runtime', lambda s: s.runtime),
+    Column('memory', lambda s: s.memory),
+]
+_LANGUAGE_COLUMNS = [Column('id', lambda l: l.id), Column('description', lambda l: l.description)]
+# the values of the json rows, so the score is rounded in one place
+_SEARCH_COLUMNS = [Column(name, lambda r, name=name: r.to_dict()[name])
+                   for name in ('number', 'title', 'difficulty', 'score')]
 
 
 class Actions(object):
@@ -38,29 +60,60 @@ class Actions(object):
             Action.languages: languages_action,
             Action.tags: tags_action,
             Action.pages: pages_action,
+            Action.mirror: mirror_action,
+            Action.status: status_action,
+            Action.sync: sync_action,
+            Action.search: search_action,
         }
 
     @classmethod
     def run(cls, api: AcmApi, settings: Settings) -> None:
         action_map = cls._get_actions_map()
-        action_map[settings.action](api, settings)
+        # the daemon serves many commands with one api, the age is reported for every command
+        api.data_fetched_at = None
+        if settings.profile or settings.profile_json:
+            profiler.start()
+        try:
+            action_map[settings.action](api, settings)
+        except OfflineError as error:
+            print(_('Offline: {0}').format(error), file=sys.stderr)
+            sys.exit(1)
+        finally:
+            _report_profile(settings)
+        if api.data_fetched_at is not None:
+            print(_('Offline: the data was downloaded {0} ago').format(_format_age(time.time() - api.data_fetched_at)),
+                  file=sys.stderr)
+
+
+def _report_profile(settings: Settings) -> None:
+    profile = profiler.stop()
+    if profile is None:
+        return
+    if settings.profile:
+        print(profile.format_report(), file=sys.stderr)
+    if settings.profile_json:
+        profile.write_json_lines(settings.profile_json, settings.argv)
 
 
-def _convert_language(language: str, languages: List[Language]) -> str:
-    # TODO(actics): move to api
-    language = language.lower()
-    if language in language_map:
-        language = language_map[language]
+def _format_age(seconds: float) -> str:
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return _n('{0} minute', '{0} minutes', minutes).format(minutes)
+    hours = minutes // 60
+    if hours < 48:
+        return _n('{0} hour', '{0} hours', hours).format(hours)
+    days = hours // 24
+    return _n('{0} day', '{0} days', days).format(days)
 
-    for compiler in languages:
-        if language in compiler.description.lower():
-            return compiler.id
-    return None
+
+def _note_fetched_at(api: AcmApi, fetched_at: float) -> None:
+    if api.data_fetched_at is None or fetched_at < api.data_fetched_at:
+        api.data_fetched_at = fetched_at
 
 
 def _get_status_string(status: SubmitStatus, delimiter: str= ' @ ') -> str:
     verdict_pattern = '[{s.verdict:^11}]'
-    time_pattern = _('time:{s.runtime:^7}s')
+    time_pattern = _('time:{s.runtime:^7.3f}s')
     memory_pattern = _('memory:{s.memory:^9}KB')
     test_pattern = _('test:{s.test:^4}')
     info_pattern = _('info: {s.info}')
@@ -74,13 +127,13 @@ def _get_status_string(status: SubmitStatus, delimiter: str= ' @ ') -> str:
     # else:
     #    string = Fore.RED + verdict + Style.RESET_ALL
 
-    if status.runtime and status.memory:
+    if status.runtime is not None and status.memory is not None:
         string += delimiter
         string += time_pattern.format(s=status)
         string += delimiter
         string += memory_pattern.format(s=status)
 
-    if status.test:
+    if status.test is not None:
         string += delimiter
         string += test_pattern.format(s=status)
 
@@ -91,53 +144,124 @@ def _get_status_string(status: SubmitStatus, delimiter: str= ' @ ') -> str:
     return string
 
 
-def _process_submit_status(api: AcmApi, bar: SimpleProgressBar, status_id: str) -> None:
-    status = api.get_submit_status(status_id)
-    status_str = _get_status_string(status)
+def _format_submit_row(status: SubmitStatus, widths: Dict[str, int]) -> str:
+    return _('{s.submit_id} {s.problem}: {0}').format(_get_status_string(status), s=status)
 
-    bar.clear()
-    print(_('Submit of problem "{s.problem}" on language {s.language}. Submit id: {s.submit_id}').format(s=status))
 
-    bar.update(status_str)
-    while status.in_process:
-        status = api.get_submit_status(status_id)
-        status_str = _get_status_string(status)
-        bar.update(status_str)
-        if status.in_process:
-            time.sleep(QUERY_WAIT_TIME)
+def _iter_finished(queue: SubmitQueue) -> Iterator[SubmitStatus]:
+    for status in queue.run():
+        if not status.in_process:
+            yield status
+
+
+def _print_compilation_error(api: AcmApi, status: SubmitStatus) -> None:
+    error = api.get_compilation_error(status.submit_id)
+    print()
+    print(_('Compilation error log:'), end=double_sep)
+    print(error)
+
+
+def _process_submit_status(queue: SubmitQueue, bar: SimpleProgressBar) -> None:
+    status = None
+    for status_update in queue.run():
+        if status is None:
+            bar.clear()
+            print(_('Submit of problem "{s.problem}" on language {s.language}. '
+                    'Submit id: {s.submit_id}').format(s=status_update))
+        status = status_update
+        bar.update(_get_status_string(status))
+    if status is None:
+        return
     print()
     if status.compilation_error:
-        error = api.get_compilation_error(status_id)
-        print()
-        print(_('Compilation error log:'), end=double_sep)
-        print(error)
+        _print_compilation_error(queue.api, status)
 
 
-def submit_action(api: AcmApi, settings: Settings) -> None:
-    bar = SimpleProgressBar()
+def _process_submit_statuses(queue: SubmitQueue, bar: SimpleProgressBar) -> None:
+    finished = []
+    for status in queue.run():
+        if status.in_process:
+            continue
+        bar.clear()
+        print(_('{s.submit_id} {s.problem}: {0}').format(_get_status_string(status), s=status))
+        finished.append(status)
+    bar.clear()
+    for status in finished:
+        if status.compilation_error:
+            print(_('Submit {s.submit_id}, problem "{s.problem}":').format(s=status), end='')
+            _print_compilation_error(queue.api, status)
 
-    try:
-        with open(settings.source_file, 'r') as source_file:
-            source = source_file.read()
-    except FileNotFoundError:
-        # FIXME(actics): print
-        raise
 
-    languages = api.get_languages()
-    lang = _convert_language(settings.language, languages)
+def submit_action(api: AcmApi, settings: Settings) -> None:
+    if settings.offline:
+        # a failed submit is retried by the queue, so it is refused before anything is queued
+        raise OfflineError(_('submits need the judge, run the command without --offline'))
+
+    structured = is_structured(settings)
+    bar = SimpleProgressBar(enabled=not structured)
+
+    def on_submit(job: SubmitJob) -> None:
+        bar.clear()
+        if job.submit_id is None:
+            print(_('Submit of problem {j.problem_number} from {j.source_file} failed. Try again later.').format(j=job),
+                  file=sys.stderr if structured else sys.stdout)
+            return
+        if job.error is not None:
+            print(_('Verdict of submit {j.submit_id} is unknown: {j.error}').format(j=job),
+                  file=sys.stderr if structured else sys.stdout)
+            return
+        if structured:
+            return
+        if len(settings.submit_jobs) > 1:
+            print(_('Problem {j.problem_number} from {j.source_file} submitted, '
+                    'submit id: {j.submit_id}').format(j=job))
+        bar.update(_('Please wait. Your submit in process...'))
+
+    # the judge would reject every attempt of a job with an unknown language, so none of the jobs is queued
+    language_ids = [api.get_language_id(language) for problem_number, source_file, language in settings.submit_jobs]
+    for (problem_number, source_file, language), language_id in zip(settings.submit_jobs, language_ids):
+        if language_id is None:
+            print(_('Unknown language {0} for {1}').format(language, source_file),
+                  file=sys.stderr if structured else sys.stdout)
+            sys.exit(1)
 
-    bar.update(_('Please wait. Your submit in process...'))
-    try:
-        status_id = api.submit(settings.judge_id, lang, settings.problem_number, source)
-    except AcmApi:
-        bar.update(_('Submit failed. Try again later.'))
+    queue = SubmitQueue(api, settings.judge_id, callback=on_submit)
+    for (problem_number, source_file, language), language_id in zip(settings.submit_jobs, language_ids):
+        try:
+            with open(source_file, 'r') as source:
+                queue.add(SubmitJob(problem_number, source_file, language_id, source.read()))
+        except FileNotFoundError:
+            # FIXME(actics): print
+            raise
+
+    if structured:
+        # only the final verdicts, one row per submit as soon as it is judged
+        write_listing(_iter_finished(queue), settings.output_format, _SUBMIT_COLUMNS)
         return
 
-    _process_submit_status(api, bar, status_id)
+    bar.update(_('Please wait. Your submit in process...'))
+    if len(settings.submit_jobs) == 1:
+        _process_submit_status(queue, bar)
+    else:
+        _process_submit_statuses(queue, bar)
+
+
+def _get_problem(api: AcmApi, settings: Settings) -> Problem:
+    try:
+        return api.get_problem(settings.problem_number)
+    except OfflineError:
+        store = ProblemStore(settings.mirror_dir, settings.locale)
+        if settings.problem_number not in store:
+            raise
+        _note_fetched_at(api, store.get_saved_at(settings.problem_number))
+        return store.load(settings.problem_number)
 
 
 def problem_action(api: AcmApi, settings: Settings) -> None:
-    problem = api.get_problem(settings.problem_number)
+    problem = _get_problem(api, settings)
+    if is_structured(settings):
+        write_listing([problem], settings.output_format, get_struct_columns(Problem))
+        return
     accepted = ''
     if problem.is_accepted is not None:
         accepted = '[✔] ' if problem.is_accepted else '[-] '
@@ -166,63 +290,142 @@ def problem_action(api: AcmApi, settings: Settings) -> None:
         print(sample_output)
 
 
+def _open_history(settings: Settings) -> SubmitsDatabase:
+    return SubmitsDatabase(os.path.join(settings.history_dir, '{0}.sqlite'.format(settings.judge_id)))
+
+
+def _needs_history(settings: Settings) -> bool:
+    # the judge filters the submits by problem only, the other filters are answered by the local history
+    return settings.verdict is not None or settings.submit_language is not None or settings.since is not None
+
+
 def problem_submits_action(api: AcmApi, settings: Settings) -> None:
-    submits = api.get_problem_submits(settings.problem_number, settings.count)
-    for submit in submits:
-        print(_get_status_string(submit))
+    if settings.judge_id is None and _needs_history(settings):
+        print(_('Judge id is required for --verdict, --language and --since'))
+        sys.exit(1)
+
+    history = _open_history(settings) if settings.judge_id is not None else None
+    if history is None or (history.get_count() == 0 and not settings.offline and not _needs_history(settings)):
+        # one page of the judge, a first sync of the history would download every submit
+        submits = api.iter_problem_submits(settings.problem_number, settings.count)
+    else:
+        # past verdicts never change, so only the new submits are downloaded
+        if settings.offline and history.get_count() == 0:
+            raise OfflineError(_('the local history of submits is empty, run "sync" first'))
+        if settings.offline:
+            # every sync that finds new submits writes to the history file
+            _note_fetched_at(api, os.path.getmtime(history.path))
+        else:
+            history.sync(api)
+        submits = history.query(settings.problem_number, settings.verdict, settings.submit_language,
+                                settings.since, limit=settings.count)
+    write_listing(submits, settings.output_format, _SUBMIT_COLUMNS, lambda submit, widths: _get_status_string(submit))
+
+
+def sync_action(api: AcmApi, settings: Settings) -> None:
+    if settings.judge_id is None:
+        print(_('Judge id is required for synchronization'))
+        sys.exit(1)
+
+    history = _open_history(settings)
+    synced = history.sync(api)
+    if is_structured(settings):
+        write_listing([{'synced': synced, 'count': history.get_count()}], settings.output_format,
+                      get_dict_columns('synced', 'count'))
+        return
+    print(_('Synchronized {0} submits, {1} submits in the local history').format(synced, history.get_count()))
+
+
+def status_action(api: AcmApi, settings: Settings) -> None:
+    try:
+        statuses = api.get_submit_statuses(settings.submit_ids)
+    except AcmApiError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+    write_listing((statuses[submit_id] for submit_id in settings.submit_ids), settings.output_format,
+                  _SUBMIT_COLUMNS, _format_submit_row)
 
 
-def _get_page_tag(api: AcmApi, settings: Settings) -> Tuple[ProblemsPage, ProblemsTag]:
-    if settings.page_id is None and settings.tag_id is None:
+def _get_page_tags(api: AcmApi, settings: Settings) -> Tuple[ProblemsPage, List[ProblemsTag]]:
+    if settings.page_id is None and not settings.tag_ids:
         prompt = PageTagPrompt(api)
         try:
             prompt.cmdloop()
         except KeyboardInterrupt:
             print()
             sys.exit(0)
-        return prompt.page, prompt.tag
+        return prompt.page, [prompt.tag] if prompt.tag is not None else []
 
-    page, tag = None, None
+    page, tags = None, []
     if settings.page_id is not None:
         try:
             page = api.get_page_by_id(settings.page_id)
         except ValueError:
             print(_('Unknown page name "{0}"').format(settings.page_id))
             sys.exit(1)
-    if settings.tag_id is not None:
+    for tag_id in settings.tag_ids:
         try:
-            tag = api.get_tag_by_id(settings.tag_id)
+            tags.append(api.get_tag_by_id(tag_id))
         except ValueError:
-            print(_('Unknown tag name "{0}"').format(settings.tag_id))
+            print(_('Unknown tag name "{0}"').format(tag_id))
             sys.exit(1)
-    return page, tag
+    return page, tags
 
 
 def problem_set_action(api: AcmApi, settings: Settings) -> None:
-    page, tag = _get_page_tag(api, settings)
+    if settings.solved is not None and settings.judge_id is None:
+        # the judge marks the solved problems only for a signed in user
+        print(_('Judge id is required for --solved and --unsolved'))
+        sys.exit(1)
 
-    problems = api.get_problem_set(page, tag, settings.sort, settings.show_ac)
-    max_title_len = max([len(p.title) for p in problems]) + 2
-    title_pattern = '{{p.title:<{0}}}'.format(max_title_len)
-    for problem in problems:
-        title = title_pattern.format(p=problem)
-        accepted = ''
-        if problem.is_accepted is not None:
-            accepted = '✔' if problem.is_accepted else '-'
-        difficulty = _('difficulty: {p.difficulty:<6}').format(p=problem)
-        authors = _('authors: {p.rating_length}').format(p=problem)
-        print('[{0:^3}] {1}. {2} {3} {4}'.format(accepted, problem.number, title, difficulty, authors))
+    page, tags = _get_page_tags(api, settings)
+
+    query = ProblemQuery(page, tags, settings.min_difficulty, settings.max_difficulty, settings.solved, settings.sort,
+                         settings.limit, settings.offset)
+    write_listing(run_query(load_problems(api, page, tags), query), settings.output_format, _PROBLEM_COLUMNS,
+                  _format_problem_row)
+
+
+def _format_problem_row(problem: Problem, widths: Dict[str, int]) -> str:
+    title = '{0:<{1}}'.format(problem.title, widths['title'] + 2)
+    accepted = ''
+    if problem.is_accepted is not None:
+        accepted = '✔' if problem.is_accepted else '-'
+    difficulty = _('difficulty: {p.difficulty:<6}').format(p=problem)
+    authors = _('authors: {p.rating_length}').format(p=problem)
+    return '[{0:^3}] {1}. {2} {3} {4}'.format(accepted, problem.number, title, difficulty, authors)
 
 
 def submit_source_action(api: AcmApi, settings: Settings) -> None:
     if settings.password is None:
         settings.password = getpass.getpass()
-    api._password = settings.password
+    api.set_password(settings.password)
     source = api.get_submit_source(settings.submit_id)
+    if is_structured(settings):
+        write_listing([{'submit_id': settings.submit_id, 'source': source}], settings.output_format,
+                      get_dict_columns('submit_id', 'source'))
+        return
     print(source)
 
 
 def languages_action(api: AcmApi, settings: Settings=None) -> None:
-    languages = api.get_languages()
-    for language in languages:
-        print(_('language {l.id}: {l.description}').format(l=language))
+    write_listing(api.get_languages(), get_output_format(settings), _LANGUAGE_COLUMNS,
+                  lambda language, widths: _('language {l.id}: {l.description}').format(l=language))
+
+
+def search_action(api: AcmApi, settings: Settings) -> None:
+    store = ProblemStore(settings.mirror_dir, settings.locale)
+    index = SearchIndex.for_store(store)
+    if settings.reindex:
+        index.clear()
+    index.update(store)
+
+    results = index.search(settings.query, settings.tag_id, settings.min_difficulty, settings.max_difficulty,
+                           settings.limit)
+    if not results and not is_structured(settings):
+        print(_('Nothing found. Use "mirror" to download problems for offline search.'))
+    write_listing(results, settings.output_format, _SEARCH_COLUMNS, _format_search_row)
+
+
+def _format_search_row(result: SearchResult, widths: Dict[str, int]) -> str:
+    return _('{r.score:6.2f} {r.number}. {r.title} (difficulty: {r.difficulty})').format(r=result)
@@ -0,0 +1,162 @@
+import contextlib
+import json
+import os
+import socket
+import sys
+import traceback
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .acm_api import AcmApi
+from .settings import Settings
+
+_ENCODING = 'utf-8'
+_BACKLOG = 8
+
+
+def _send(writer, **message) -> None:
+    writer.write(json.dumps(message).encode(_ENCODING) + b'\n')
+
+
+class _StreamWriter(object):
+    def __init__(self, writer, stream: str):
+        self._writer = writer
+        self._stream = stream
+
+    def write(self, text: str) -> int:
+        if text:
+            _send(self._writer, **{self._stream: text})
+        return len(text)
+
+    def flush(self) -> None:
+        self._writer.flush()
+
+
+def _connect(path: str) -> Optional[socket.socket]:
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(path)
+    except OSError:
+        client.close()
+        return None
+    return client
+
+
+def is_running(path: str) -> bool:
+    client = _connect(path)
+    if client is None:
+        return False
+    client.close()
+    return True
+
+
+def _request(client: socket.socket, **message) -> int:
+    with client, client.makefile('rb') as reader, client.makefile('wb') as writer:
+        _send(writer, **message)
+        writer.flush()
+        for line in reader:
+            message = json.loads(line.decode(_ENCODING))
+            if 'out' in message:
+                sys.stdout.write(message['out'])
+                sys.stdout.flush()
+            elif 'err' in message:
+                sys.stderr.write(message['err'])
+                sys.stderr.flush()
+            elif 'exit' in message:
+                return message['exit']
+    print('Connection to the daemon was lost', file=sys.stderr)
+    return 1
+
+
+def run_remote(path: str, argv: List[str]) -> Optional[int]:
+    client = _connect(path)
+    if client is None:
+        return None
+    return _request(client, argv=argv, cwd=os.getcwd())
+
+
+def stop(path: str) -> bool:
+    client = _connect(path)
+    if client is None:
+        return False
+    _request(client, stop=True)
+    return True
+
+
+class Daemon(object):
+    def __init__(self, path: str, create_api: Callable[[Settings], AcmApi],
+                 run_action: Callable[[AcmApi, Settings], None]):
+        self.path = path
+        self._create_api = create_api
+        self._run_action = run_action
+        self._apis = {}  # type: Dict[Tuple, AcmApi]
+        self._stopped = False
+
+    def _get_api(self, settings: Settings) -> AcmApi:
+        # every setting create_api reads, an api built with other credentials or transport is never reused
+        key = (settings.locale, settings.judge_id, settings.password, settings.http_client, settings.cache,
+               settings.renderer, settings.offline, settings.transport.key)
+        if key not in self._apis:
+            self._apis[key] = self._create_api(settings)
+        return self._apis[key]
+
+    def _run(self, argv: List[str], cwd: str, writer) -> int:
+        stdout = _StreamWriter(writer, 'out')
+        code = 0
+        # commands are served one by one, so swapping the process-wide streams is safe
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(_StreamWriter(writer, 'err')):
+            try:
+                os.chdir(cwd)
+                settings = Settings.read(argv)
+                self._run_action(self._get_api(settings), settings)
+            except SystemExit as error:
+                code = error.code if isinstance(error.code, int) else int(error.code is not None)
+            except Exception:
+                traceback.print_exc()
+                code = 1
+        stdout.flush()
+        return code
+
+    def _handle(self, connection: socket.socket) -> None:
+        with connection.makefile('rb') as reader, connection.makefile('wb') as writer:
+            line = reader.readline()
+            if not line:
+                # a liveness check from is_running
+                return
+            request = json.loads(line.decode(_ENCODING))
+            if request.get('stop'):
+                self._stopped = True
+                code = 0
+            else:
+                code = self._run(request['argv'], request['cwd'], writer)
+            _send(writer, exit=code)
+
+    def serve_forever(self) -> None:
+        socket_dir = os.path.dirname(self.path)
+        if socket_dir and not os.path.exists(socket_dir):
+            os.makedirs(socket_dir)
+        if os.path.exists(self.path):
+            # left by a daemon that was killed
+            os.unlink(self.path)
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # the daemon acts with the user's judge session, nobody else may connect
+        umask = os.umask(0o077)
+        try:
+            server.bind(self.path)
+        finally:
+            os.umask(umask)
+        server.listen(_BACKLOG)
+        try:
+            while not self._stopped:
+                connection, _address = server.accept()
+                with connection:
+                    try:
+                        self._handle(connection)
+                    except OSError:
+                        # the client went away, e.g. on Ctrl+C
+                        pass
+        finally:
+            server.close()
+            os.unlink(self.path)
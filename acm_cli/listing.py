@@ -0,0 +1,148 @@
+import json
+import operator
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, TextIO
+
+FORMATS = ['table', 'tsv', 'json', 'jsonl']
+DEFAULT_FORMAT = 'table'
+# rows that decide the widths of the table columns, later rows do not move them
+_LOOKAHEAD = 100
+# rows are written in batches, one write per row is slow through a pipe and through the daemon socket
+_BATCH = 256
+# a slow source, like a status page on a slow connection, still shows its rows without a long delay
+_FLUSH_INTERVAL = 0.2
+
+
+class Column(object):
+    def __init__(self, name: str, get: Callable[[Any], Any]):
+        self.name = name
+        self.get = get
+
+
+def _to_tsv(value: Any) -> str:
+    if value is None:
+        return ''
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+
+def _to_json(row: Any) -> str:
+    # structs of the api, or plain dicts for the summaries of the commands
+    return json.dumps(row.to_dict() if hasattr(row, 'to_dict') else row, ensure_ascii=False)
+
+
+class ListingWriter(object):
+    # rows are rendered as they come from the parser: the table in the human format, tsv with a header line,
+    # json as one array and jsonl as one object per line
+    def __init__(self, output_format: str, columns: List[Column],
+                 format_row: Callable[[Any, Dict[str, int]], str] = None, stream: TextIO = None):
+        if output_format not in FORMATS:
+            raise ValueError('Unknown output format {0}, available: {1}'.format(output_format, ', '.join(FORMATS)))
+        self.output_format = output_format
+        self.columns = columns
+        self.format_row = format_row
+        self.count = 0
+        self._stream = stream
+        self._buffer = []  # type: List[str]
+        self._flushed_at = time.monotonic()
+
+    @property
+    def stream(self) -> TextIO:
+        # looked up on every write, the daemon replaces sys.stdout for each command
+        return self._stream if self._stream is not None else sys.stdout
+
+    def _add(self, text: str) -> None:
+        self._buffer.append(text)
+        if len(self._buffer) >= _BATCH or time.monotonic() - self._flushed_at >= _FLUSH_INTERVAL:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._buffer:
+            self.stream.write(''.join(self._buffer))
+            self._buffer = []
+        self.stream.flush()
+        self._flushed_at = time.monotonic()
+
+    def _measure(self, rows: List[Any]) -> Dict[str, int]:
+        return {column.name: max([len(str(column.get(row))) for row in rows] or [0]) for column in self.columns}
+
+    def _write_table(self, rows: Iterable[Any]) -> None:
+        iterator = iter(rows)
+        window = []
+        for row in iterator:
+            window.append(row)
+            if len(window) >= _LOOKAHEAD:
+                break
+        widths = self._measure(window)
+        for row in window:
+            self._add(self.format_row(row, widths) + '\n')
+        for row in iterator:
+            self._add(self.format_row(row, widths) + '\n')
+
+    def _write_tsv(self, rows: Iterable[Any]) -> None:
+        self._add('\t'.join(column.name for column in self.columns) + '\n')
+        for row in rows:
+            self._add('\t'.join(_to_tsv(column.get(row)) for column in self.columns) + '\n')
+
+    def _write_json(self, rows: Iterable[Any]) -> None:
+        separator = '[\n'
+        for row in rows:
+            self._add(separator + _to_json(row))
+            separator = ',\n'
+        self._add('[]\n' if separator == '[\n' else '\n]\n')
+
+    def _write_jsonl(self, rows: Iterable[Any]) -> None:
+        for row in rows:
+            self._add(_to_json(row) + '\n')
+
+    def _count(self, rows: Iterable[Any]) -> Iterable[Any]:
+        for row in rows:
+            self.count += 1
+            yield row
+
+    def write(self, rows: Iterable[Any]) -> int:
+        writers = {
+            'table': self._write_table,
+            'tsv': self._write_tsv,
+            'json': self._write_json,
+            'jsonl': self._write_jsonl,
+        }
+        try:
+            writers[self.output_format](self._count(rows))
+            self._flush()
+        except BrokenPipeError:
+            # the reader, like "head", has gone: the rest of the rows is not needed
+            _silence(self.stream)
+        return self.count
+
+
+def _silence(stream: TextIO) -> None:
+    # python flushes stdout once more at exit, that write must not fail again
+    try:
+        os.dup2(os.open(os.devnull, os.O_WRONLY), stream.fileno())
+    except (AttributeError, OSError, ValueError):
+        pass
+
+
+def get_struct_columns(struct: type) -> List[Column]:
+    return [Column(name, operator.attrgetter(name)) for name in struct.__slots__]
+
+
+def get_dict_columns(*names: str) -> List[Column]:
+    return [Column(name, operator.itemgetter(name)) for name in names]
+
+
+def get_output_format(settings=None) -> str:
+    # the prompt of problem-set shows the lists without settings
+    return settings.output_format if settings is not None else DEFAULT_FORMAT
+
+
+def is_structured(settings=None) -> bool:
+    # tsv and json are read by programs: progress bars and hints stay out of them
+    return get_output_format(settings) != DEFAULT_FORMAT
+
+
+def write_listing(rows: Iterable[Any], output_format: str, columns: List[Column],
+                  format_row: Callable[[Any, Dict[str, int]], str] = None) -> int:
+    return ListingWriter(output_format, columns, format_row).write(rows)
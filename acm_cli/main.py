@@ -1,16 +1,21 @@
 #!/usr/bin/env python3
 
+import gettext
 import json
 import os
+import sys
 
-import colorama
-
-from .actions import Actions
-from .acm_api import AcmApi, TimusApi
+from .acm_api import AcmApi
+from .action import Action
 from .settings import Settings
 
+_ = gettext.gettext
+
 
 AUTH_KEYS_FILE = os.path.expanduser('~/.local/share/acmcli/author_ids.json')
+HTTP_CACHE_FILE = os.path.expanduser('~/.cache/acmcli/http.sqlite')
+PARSED_CACHE_FILE = os.path.expanduser('~/.cache/acmcli/parsed.sqlite')
+DAEMON_SOCKET_FILE = os.path.expanduser('~/.cache/acmcli/daemon.sock')
 
 
 def api_auth(api: AcmApi, settings: Settings) -> None:
@@ -27,7 +32,10 @@ def api_auth(api: AcmApi, settings: Settings) -> None:
     except FileNotFoundError:
         auth_keys = {}
 
-    if settings.judge_id not in auth_keys:
+    if settings.judge_id not in auth_keys and settings.offline:
+        # stored pages are looked up by the judge id, the key is only needed by the judge
+        api.login_local(settings.judge_id, settings.password, '')
+    elif settings.judge_id not in auth_keys:
         api.login(settings.judge_id, settings.password)
 
         auth_keys[settings.judge_id] = api.get_auth_key()
@@ -38,12 +46,65 @@ def api_auth(api: AcmApi, settings: Settings) -> None:
         api.login_local(settings.judge_id, settings.password, auth_keys[settings.judge_id])
 
 
+def create_api(settings: Settings) -> AcmApi:
+    from .acm_api import TimusApi, HttpCache, ParsedCache
+    cache, parsed_cache = None, None
+    if settings.cache:
+        cache = HttpCache(HTTP_CACHE_FILE)
+        parsed_cache = ParsedCache(PARSED_CACHE_FILE, TimusApi.parser_version)
+    if settings.http_client == 'asyncio':
+        from .acm_api import AsyncTimusApi, SyncAcmApi
+        api = SyncAcmApi(AsyncTimusApi(settings.locale, cache, parsed_cache, settings.transport, settings.renderer))
+    else:
+        api = TimusApi(settings.locale, cache, parsed_cache, settings.transport, settings.renderer)
+
+    api_auth(api, settings)
+    return api
+
+
+def daemon_action(settings: Settings) -> None:
+    from . import daemon
+    from .actions import Actions
+
+    if settings.stop:
+        if not daemon.stop(DAEMON_SOCKET_FILE):
+            print(_('Daemon is not running'))
+        return
+    if daemon.is_running(DAEMON_SOCKET_FILE):
+        print(_('Daemon is already running'))
+        sys.exit(1)
+
+    print(_('Serving commands on {0}').format(DAEMON_SOCKET_FILE))
+    try:
+        daemon.Daemon(DAEMON_SOCKET_FILE, create_api, Actions.run).serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def _is_interactive(settings: Settings) -> bool:
+    # prompts need the terminal of the client, so these commands never go to the daemon
+    if settings.action == Action.problem_set:
+        return settings.page_id is None and not settings.tag_ids
+    return settings.action == Action.submit_source and settings.password is None
+
+
 def main() -> None:
+    # argparse exits on "--help" and on errors, so the heavy imports below are only paid by real commands
+    settings = Settings.read()
+
+    # colorama translates the colors on Windows and strips them when the output is not a terminal
+    import colorama
     colorama.init()
 
-    settings = Settings.read()
-    api = TimusApi(settings.locale)
+    if settings.action == Action.daemon:
+        daemon_action(settings)
+        return
 
-    api_auth(api, settings)
+    if settings.daemon and not _is_interactive(settings):
+        from .daemon import run_remote
+        code = run_remote(DAEMON_SOCKET_FILE, sys.argv[1:])
+        if code is not None:
+            sys.exit(code)
 
-    Actions.run(api, settings)
+    from .actions import Actions
+    Actions.run(create_api(settings), settings)
@@ -0,0 +1,118 @@
+import gettext
+import sys
+import threading
+import time
+from typing import List
+
+from .acm_api import AcmApi
+from .listing import get_dict_columns, is_structured, write_listing
+from .problem_store import ProblemStore
+from .settings import Settings
+from .simple_progressbar import SimpleProgressBar
+
+_ = gettext.gettext
+
+
+class RateLimiter(object):
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class Mirror(object):
+    def __init__(self, api: AcmApi, store: ProblemStore, workers: int, rate: float):
+        self.api = api
+        self.store = store
+        self.workers = workers
+        # all requests go to one judge host, so one limiter is a per-host limiter
+        self.limiter = RateLimiter(rate)
+        self.done = 0
+        self.failed = []
+
+    def _fetch(self, number: int) -> bytes:
+        self.limiter.wait()
+        return self.api.fetch_problem(number)
+
+    def run(self, numbers: List[int], bar: SimpleProgressBar = None) -> None:
+        # concurrent.futures pulls in multiprocessing, which is slow to import for every command
+        from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+        pending = [number for number in numbers if number not in self.store]
+        self.done = len(numbers) - len(pending)
+        parser = self.api.get_problem_parser()
+
+        fetch_pool = ThreadPoolExecutor(self.workers)
+        parse_pool = ProcessPoolExecutor(self.workers)
+        try:
+            futures = {fetch_pool.submit(self._fetch, number): number for number in pending}
+            fetches = set(futures)
+            while futures:
+                finished, _not_finished = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    number = futures.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception:
+                        self.failed.append(number)
+                        continue
+                    if future in fetches:
+                        futures[parse_pool.submit(parser, result)] = number
+                    else:
+                        self.store.save(result)
+                        self.done += 1
+                if bar is not None:
+                    bar.update(_('Mirrored {0}/{1} problems, failed {2}').format(
+                        self.done, len(numbers), len(self.failed)))
+        finally:
+            fetch_pool.shutdown(wait=False, cancel_futures=True)
+            parse_pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _get_problem_numbers(api: AcmApi, settings: Settings) -> List[int]:
+    if settings.problem_range is not None:
+        first, last = settings.problem_range
+        return list(range(first, last + 1))
+
+    page, tag = None, None
+    try:
+        if settings.page_id is not None:
+            page = api.get_page_by_id(settings.page_id)
+        if settings.tag_id is not None:
+            tag = api.get_tag_by_id(settings.tag_id)
+    except ValueError as error:
+        print(error)
+        sys.exit(1)
+    return [problem.number for problem in api.get_problem_set(page, tag)]
+
+
+def mirror_action(api: AcmApi, settings: Settings) -> None:
+    structured = is_structured(settings)
+    bar = SimpleProgressBar(enabled=not structured)
+    store = ProblemStore(settings.mirror_dir, settings.locale)
+    numbers = _get_problem_numbers(api, settings)
+
+    mirror = Mirror(api, store, settings.workers, settings.rate)
+    try:
+        mirror.run(numbers, bar)
+    except KeyboardInterrupt:
+        bar.clear()
+        print(_('Interrupted. Run the same command again to resume.'), file=sys.stderr if structured else sys.stdout)
+        sys.exit(1)
+
+    bar.clear()
+    if structured:
+        summary = {'mirrored': mirror.done, 'total': len(numbers), 'path': store.path, 'failed': sorted(mirror.failed)}
+        write_listing([summary], settings.output_format, get_dict_columns('mirrored', 'total', 'path', 'failed'))
+        return
+    print(_('Mirrored {0} of {1} problems to {2}').format(mirror.done, len(numbers), store.path))
+    if mirror.failed:
+        print(_('Failed problems: {0}').format(', '.join(str(number) for number in sorted(mirror.failed))))
@@ -3,25 +3,23 @@ import sys
 import gettext
 
 from .acm_api import AcmApi
+from .listing import Column, get_output_format, write_listing
 from .settings import Settings
 
 _ = gettext.gettext
 
 
+_ID_COLUMNS = [Column('id', lambda x: x.id), Column('description', lambda x: x.description)]
+
+
 def tags_action(api: AcmApi, settings: Settings=None) -> None:
-    tags = api.get_tags()
-    max_id_length = max(len(tag.id) for tag in tags)
-    format_string = _('tag  {{t.id:<{0}}} : {{t.description}}').format(max_id_length)
-    for tag in tags:
-        print(format_string.format(t=tag))
+    write_listing(api.get_tags(), get_output_format(settings), _ID_COLUMNS,
+                  lambda tag, widths: _('tag  {t.id:<{0}} : {t.description}').format(widths['id'], t=tag))
 
 
 def pages_action(api: AcmApi, settings: Settings=None) -> None:
-    pages = api.get_pages()
-    max_id_length = max(len(page.id) for page in pages)
-    format_string = _('page  {{p.id:<{0}}} : {{p.description}}').format(max_id_length)
-    for page in pages:
-        print(format_string.format(p=page))
+    write_listing(api.get_pages(), get_output_format(settings), _ID_COLUMNS,
+                  lambda page, widths: _('page  {p.id:<{0}} : {p.description}').format(widths['id'], p=page))
 
 
 class PageTagPrompt(cmd.Cmd):
@@ -49,7 +47,7 @@ class PageTagPrompt(cmd.Cmd):
 
     def complete_page(self, text, line, begidx, endidx):
         prefix = line[begidx:]
-        return [page.id for page in self.api.get_pages() if page.id.startswith(prefix)]
+        return self.api.complete_page_id(prefix)
 
     def do_tag(self, line):
         try:
@@ -60,7 +58,7 @@ class PageTagPrompt(cmd.Cmd):
 
     def complete_tag(self, text, line, begidx, endidx):
         prefix = line[begidx:]
-        return [tag.id for tag in self.api.get_tags() if tag.id.startswith(prefix)]
+        return self.api.complete_tag_id(prefix)
 
     def do_help(self, line):
         print(_('Type "page ID" or "tag ID". For list of available IDs type "pages" or "tags"'))
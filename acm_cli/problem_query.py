@@ -0,0 +1,72 @@
+import argparse
+import itertools
+from typing import Iterator, List, Optional, Tuple
+
+from .acm_api import AcmApi, Problem, ProblemsPage, ProblemsTag, SortType
+
+# sort keys of the command line, with the order they have without ":asc" or ":desc"
+_SORT_FIELDS = {
+    SortType.id.value: ('number', False),
+    SortType.authors.value: ('rating_length', True),
+    SortType.difficulty.value: ('difficulty', False),
+    'title': ('title', False),
+}
+DEFAULT_SORT = [('number', False)]
+
+
+def parse_sort_keys(value: str) -> List[Tuple[str, bool]]:
+    # "difficulty,authors:asc" - the first key decides, the next ones break ties
+    keys = []
+    for part in value.split(','):
+        name, _sep, direction = part.strip().lower().partition(':')
+        if name not in _SORT_FIELDS or direction not in ('', 'asc', 'desc'):
+            raise argparse.ArgumentTypeError('sort must look like difficulty,authors:asc; keys: {0}'.format(
+                ', '.join(_SORT_FIELDS)))
+        field, descending = _SORT_FIELDS[name]
+        keys.append((field, descending if not direction else direction == 'desc'))
+    return keys
+
+
+class ProblemQuery(object):
+    def __init__(self, page: ProblemsPage = None, tags: List[ProblemsTag] = None, min_difficulty: int = None,
+                 max_difficulty: int = None, solved: Optional[bool] = None, sort: List[Tuple[str, bool]] = None,
+                 limit: int = None, offset: int = 0):
+        self.page = page
+        self.tags = tags or []
+        self.min_difficulty = min_difficulty
+        self.max_difficulty = max_difficulty
+        # None shows every problem, True only the solved ones, False only the unsolved ones
+        self.solved = solved
+        self.sort = sort or DEFAULT_SORT
+        self.limit = limit
+        self.offset = offset
+
+
+def load_problems(api: AcmApi, page: ProblemsPage = None, tags: List[ProblemsTag] = None) -> List[Problem]:
+    # the judge is asked in one form only: sorted by id, solved problems included. Every other order and
+    # filter is applied here, so they reuse the cached pages instead of a new request each
+    tags = tags or [None]
+    problems = api.get_problem_set(page, tags[0], SortType.id, True)
+    for tag in tags[1:]:
+        numbers = set(problem.number for problem in api.get_problem_set(page, tag, SortType.id, True))
+        problems = [problem for problem in problems if problem.number in numbers]
+    return problems
+
+
+def _matches(problem: Problem, query: ProblemQuery) -> bool:
+    if query.min_difficulty is not None and problem.difficulty < query.min_difficulty:
+        return False
+    if query.max_difficulty is not None and problem.difficulty > query.max_difficulty:
+        return False
+    if query.solved is not None and bool(problem.is_accepted) != query.solved:
+        return False
+    return True
+
+
+def run_query(problems: List[Problem], query: ProblemQuery) -> Iterator[Problem]:
+    found = [problem for problem in problems if _matches(problem, query)]
+    # stable sorts from the last key to the first give the multi-key order
+    for field, descending in reversed(query.sort):
+        found.sort(key=lambda problem: getattr(problem, field), reverse=descending)
+    stop = query.offset + query.limit if query.limit is not None else None
+    return itertools.islice(found, query.offset, stop)
@@ -0,0 +1,41 @@
+import json
+import os
+from typing import Iterator, List
+
+from .acm_api import Problem
+
+
+class ProblemStore(object):
+    def __init__(self, root: str, locale: str):
+        self.path = os.path.join(os.path.expanduser(root), locale.lower())
+        if not os.path.exists(self.path):
+            os.makedirs(self.path)
+
+    def __contains__(self, number: int) -> bool:
+        return os.path.exists(self._get_problem_path(number))
+
+    def __iter__(self) -> Iterator[Problem]:
+        for number in self.numbers():
+            yield self.load(number)
+
+    def numbers(self) -> List[int]:
+        names = (os.path.splitext(name) for name in os.listdir(self.path))
+        return sorted(int(number) for number, ext in names if ext == '.json' and number.isdigit())
+
+    def load(self, number: int) -> Problem:
+        with open(self._get_problem_path(number), 'r', encoding='utf-8') as problem_file:
+            return Problem.from_dict(json.load(problem_file))
+
+    def get_saved_at(self, number: int) -> float:
+        return os.path.getmtime(self._get_problem_path(number))
+
+    def save(self, problem: Problem) -> None:
+        # write to a temporary file first, so an interrupted run never leaves a broken entry
+        problem_path = self._get_problem_path(problem.number)
+        tmp_path = problem_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as problem_file:
+            json.dump(problem.to_dict(), problem_file, ensure_ascii=False)
+        os.replace(tmp_path, problem_path)
+
+    def _get_problem_path(self, number: int) -> str:
+        return os.path.join(self.path, '{0}.json'.format(int(number)))
@@ -0,0 +1,168 @@
+import collections
+import math
+import os
+import re
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from .acm_api import Problem
+from .problem_store import ProblemStore
+
+_TOKEN_RE = re.compile(r'[^\W_]+')
+_K1 = 1.2
+_B = 0.75
+# a term in the title or in the tags says more about the problem than a term in the statement
+_FIELD_WEIGHTS = {
+    'title': 3.0,
+    'tags': 2.0,
+    'source': 1.0,
+    'text': 1.0,
+    'input': 1.0,
+    'output': 1.0,
+}
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS documents (
+    number INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    difficulty INTEGER NOT NULL,
+    length REAL NOT NULL,
+    indexed_at REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS tags (
+    number INTEGER NOT NULL,
+    tag TEXT NOT NULL COLLATE NOCASE
+);
+CREATE INDEX IF NOT EXISTS tags_tag ON tags (tag);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    frequency REAL NOT NULL,
+    PRIMARY KEY (term, number)
+) WITHOUT ROWID;
+'''
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _get_term_frequencies(problem: Problem) -> Dict[str, float]:
+    frequencies = collections.defaultdict(float)
+    for field, weight in _FIELD_WEIGHTS.items():
+        value = getattr(problem, field)
+        if isinstance(value, list):
+            value = ' '.join(value)
+        for term in tokenize(value):
+            frequencies[term] += weight
+    return frequencies
+
+
+class SearchResult(object):
+    def __init__(self, number: int, title: str, difficulty: int, score: float):
+        self.number = number
+        self.title = title
+        self.difficulty = difficulty
+        self.score = score
+
+    def to_dict(self) -> Dict[str, object]:
+        return {'number': self.number, 'title': self.title, 'difficulty': self.difficulty,
+                'score': round(self.score, 4)}
+
+
+class SearchIndex(object):
+    def __init__(self, path: str):
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_SCHEMA)
+        columns = [row[1] for row in self._connection.execute('PRAGMA table_info(documents)')]
+        if 'indexed_at' not in columns:
+            # an index from an older version: its problems count as never indexed and are indexed again
+            with self._connection:
+                self._connection.execute('ALTER TABLE documents ADD COLUMN indexed_at REAL NOT NULL DEFAULT 0')
+        self._lengths = None
+
+    @classmethod
+    def for_store(cls, store: ProblemStore) -> 'SearchIndex':
+        return cls(os.path.join(store.path, 'index.sqlite'))
+
+    def clear(self) -> None:
+        with self._connection:
+            self._connection.executescript('DELETE FROM documents; DELETE FROM tags; DELETE FROM postings;')
+        self._lengths = None
+
+    def add(self, problems: Iterable[Problem]) -> int:
+        added = 0
+        # taken before the problems are read, so a problem saved again while it is indexed is indexed once more
+        indexed_at = time.time()
+        with self._connection:
+            for problem in problems:
+                frequencies = _get_term_frequencies(problem)
+                self._remove(problem.number)
+                self._connection.execute('INSERT OR REPLACE INTO documents (number, title, difficulty, length, '
+                                         'indexed_at) VALUES (?, ?, ?, ?, ?)',
+                                         (problem.number, problem.title, problem.difficulty,
+                                          sum(frequencies.values()), indexed_at))
+                self._connection.executemany('INSERT INTO tags VALUES (?, ?)',
+                                             [(problem.number, tag) for tag in problem.tags])
+                self._connection.executemany('INSERT INTO postings VALUES (?, ?, ?)',
+                                             [(term, problem.number, tf) for term, tf in frequencies.items()])
+                added += 1
+        self._lengths = None
+        return added
+
+    def _remove(self, number: int) -> None:
+        row = self._connection.execute('SELECT number FROM documents WHERE number = ?', (number,)).fetchone()
+        if row is None:
+            return
+        self._connection.execute('DELETE FROM postings WHERE number = ?', (number,))
+        self._connection.execute('DELETE FROM tags WHERE number = ?', (number,))
+
+    def update(self, store: ProblemStore) -> int:
+        # a problem mirrored again since it was indexed may have a changed statement
+        indexed = dict(self._connection.execute('SELECT number, indexed_at FROM documents'))
+        return self.add(store.load(number) for number in store.numbers()
+                        if number not in indexed or store.get_saved_at(number) > indexed[number])
+
+    def _get_lengths(self) -> Dict[int, float]:
+        if self._lengths is None:
+            self._lengths = dict(self._connection.execute('SELECT number, length FROM documents'))
+        return self._lengths
+
+    def _get_candidates(self, tag: str, min_difficulty: int, max_difficulty: int) -> Dict[int, Tuple[str, int]]:
+        query = 'SELECT number, title, difficulty FROM documents WHERE difficulty BETWEEN ? AND ?'
+        params = [min_difficulty if min_difficulty is not None else 0,
+                  max_difficulty if max_difficulty is not None else 2 ** 31]
+        if tag is not None:
+            query += " AND number IN (SELECT number FROM tags WHERE tag LIKE '%' || ? || '%')"
+            params.append(tag)
+        return {number: (title, difficulty) for number, title, difficulty in self._connection.execute(query, params)}
+
+    def search(self, text: str, tag: str = None, min_difficulty: int = None, max_difficulty: int = None,
+               limit: int = 20) -> List[SearchResult]:
+        lengths = self._get_lengths()
+        if not lengths:
+            return []
+        average_length = sum(lengths.values()) / len(lengths)
+        candidates = self._get_candidates(tag, min_difficulty, max_difficulty)
+
+        terms = tokenize(text)
+        scores = collections.defaultdict(float)
+        for term in set(terms):
+            postings = self._connection.execute('SELECT number, frequency FROM postings WHERE term = ?',
+                                                (term,)).fetchall()
+            if not postings:
+                continue
+            idf = math.log(1 + (len(lengths) - len(postings) + 0.5) / (len(postings) + 0.5))
+            for number, frequency in postings:
+                if number not in candidates:
+                    continue
+                norm = _K1 * (1 - _B + _B * lengths[number] / average_length)
+                scores[number] += idf * frequency * (_K1 + 1) / (frequency + norm)
+
+        if not terms:
+            # only filters were given, list every matching problem
+            scores = {number: 0.0 for number in candidates}
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [SearchResult(number, candidates[number][0], candidates[number][1], score) for number, score in ranked]
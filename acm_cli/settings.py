@@ -2,25 +2,79 @@ import os
 import locale
 import configparser
 import argparse
+import sys
+import time
 
-from .acm_api import SortType
+from .acm_api import TransportOptions
 from .action import Action
+from .listing import FORMATS, DEFAULT_FORMAT
+from .problem_query import DEFAULT_SORT, parse_sort_keys
 
 _SECTION = 'section'
 _DEFAULT_SOURCE_FILE = os.path.expanduser('~/acmcli.code')
 _CONFIG_NAME = os.path.expanduser('~/.config/acmcli.conf')
+_DEFAULT_MIRROR_DIR = os.path.expanduser('~/.local/share/acmcli/problems')
+_DEFAULT_HISTORY_DIR = os.path.expanduser('~/.local/share/acmcli/submits')
 
 
-def _parse_args():
+def _non_negative(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError('invalid int value: {0!r}'.format(value))
+    if number < 0:
+        raise argparse.ArgumentTypeError('must not be negative')
+    return number
+
+
+def _problem_range(value: str):
+    first, _sep, last = value.partition('-')
+    try:
+        first = int(first)
+        last = int(last) if last else first
+    except ValueError:
+        raise argparse.ArgumentTypeError('range must look like 1000-1100')
+    if first > last:
+        raise argparse.ArgumentTypeError('range start is greater than range end')
+    return first, last
+
+
+def _submit_job(value: str):
+    number, _sep, rest = value.partition(':')
+    source_file, _sep, language = rest.partition(':')
+    try:
+        number = int(number)
+    except ValueError:
+        raise argparse.ArgumentTypeError('job must look like 1000, 1000:a.cpp or 1000:a.cpp:c++')
+    return number, source_file or None, language or None
+
+
+def _date(value: str) -> int:
+    import calendar
+    try:
+        return calendar.timegm(time.strptime(value, '%Y-%m-%d'))
+    except ValueError:
+        raise argparse.ArgumentTypeError('date must look like 2017-01-31')
+
+
+def _parse_args(argv=None):
     parser = argparse.ArgumentParser()
     subparsers = parser.add_subparsers(dest='action', help='sub-command help')
 
     parser.add_argument('-v', '--version', action='version')
     parser.add_argument('-l', '--locale', choices=['en', 'ru'])
     parser.add_argument('-c', '--config')
+    parser.add_argument('--no-cache', action='store_const', const=True, help='do not use cached judge responses')
+    parser.add_argument('--no-daemon', action='store_true', help='run the command in this process')
+    parser.add_argument('--offline', action='store_const', const=True,
+                        help='do not connect to the judge, use only the data saved by previous runs')
+    parser.add_argument('--profile', action='store_true', help='print where the time of the command was spent')
+    parser.add_argument('--format', choices=FORMATS, help='output of the commands')
+    parser.add_argument('--profile-json', metavar='FILE', help='append the timings of the command to FILE as JSON lines')
 
-    submit_parser = subparsers.add_parser(Action.submit.value, help='submit solution for problem')
-    submit_parser.add_argument('problem_number', type=int)
+    submit_parser = subparsers.add_parser(Action.submit.value, help='submit solutions for problems')
+    submit_parser.add_argument('jobs', nargs='+', type=_submit_job, metavar='problem_number[:file[:language]]',
+                               help='solutions are submitted in order, as often as the judge allows')
     submit_parser.add_argument('-s', '--source-file')
     submit_parser.add_argument('-j', '--judge-id')
     submit_parser.add_argument('-l', '--language')
@@ -34,13 +88,27 @@ def _parse_args():
     problem_parser.add_argument('problem_number', type=int)
     problem_parser.add_argument('-j', '--judge-id')
     problem_parser.add_argument('-c', '--count', type=int)
+    problem_parser.add_argument('--verdict', help='show only submits with this verdict')
+    problem_parser.add_argument('--language', help='show only submits on this language')
+    problem_parser.add_argument('--since', type=_date, help='show only submits since date: 2017-01-31')
 
     problem_set_parser = subparsers.add_parser(Action.problem_set.value, help='get problem set')
     problem_set_parser.add_argument('-p', '--page')
-    problem_set_parser.add_argument('-t', '--tag')
-    problem_set_parser.add_argument('-s', '--sort', type=SortType)
+    problem_set_parser.add_argument('-t', '--tag', action='append', help='may be repeated, problems have all the tags')
+    problem_set_parser.add_argument('-s', '--sort', type=parse_sort_keys,
+                                    help='keys id, authors, difficulty, title with optional :asc or :desc, '
+                                         'for example difficulty,authors:asc')
     problem_set_parser.add_argument('-j', '--judge-id')
     problem_set_parser.add_argument('--show-ac', action='store_const', const=True, help='show solved problems')
+    solved_group = problem_set_parser.add_mutually_exclusive_group()
+    solved_group.add_argument('--solved', action='store_const', const=True, dest='solved',
+                              help='show only solved problems')
+    solved_group.add_argument('--unsolved', action='store_const', const=False, dest='solved',
+                              help='show only unsolved problems')
+    problem_set_parser.add_argument('--min-difficulty', type=int)
+    problem_set_parser.add_argument('--max-difficulty', type=int)
+    problem_set_parser.add_argument('-n', '--limit', type=_non_negative)
+    problem_set_parser.add_argument('--offset', type=_non_negative, default=0, help='skip this many problems of the result')
 
     submit_source_parser = subparsers.add_parser(Action.submit_source.value, help='get submit source code')
     submit_source_parser.add_argument('submit_id', type=int)
@@ -50,7 +118,35 @@ def _parse_args():
     subparsers.add_parser(Action.tags.value, help='get tags list')
     subparsers.add_parser(Action.pages.value, help='get pages list')
 
-    return parser.parse_args()
+    status_parser = subparsers.add_parser(Action.status.value, help='get status of submits')
+    status_parser.add_argument('submit_ids', nargs='+', type=int)
+    status_parser.add_argument('-j', '--judge-id')
+
+    sync_parser = subparsers.add_parser(Action.sync.value, help='download new submits to the local history')
+    sync_parser.add_argument('-j', '--judge-id')
+
+    search_parser = subparsers.add_parser(Action.search.value, help='search mirrored problems')
+    search_parser.add_argument('query', nargs='*')
+    search_parser.add_argument('-t', '--tag')
+    search_parser.add_argument('--min-difficulty', type=int)
+    search_parser.add_argument('--max-difficulty', type=int)
+    search_parser.add_argument('-n', '--limit', type=int, default=20)
+    search_parser.add_argument('--reindex', action='store_true', help='rebuild the search index')
+    search_parser.add_argument('-o', '--output', help='local store directory')
+
+    mirror_parser = subparsers.add_parser(Action.mirror.value, help='download problems to the local store')
+    mirror_parser.add_argument('-p', '--page')
+    mirror_parser.add_argument('-t', '--tag')
+    mirror_parser.add_argument('-r', '--range', type=_problem_range, help='range of problem numbers: 1000-1100')
+    mirror_parser.add_argument('-w', '--workers', type=int, help='number of concurrent downloads')
+    mirror_parser.add_argument('--rate', type=float, help='maximum requests per second')
+    mirror_parser.add_argument('-o', '--output', help='local store directory')
+    mirror_parser.add_argument('-j', '--judge-id')
+
+    daemon_parser = subparsers.add_parser(Action.daemon.value, help='keep a warm session for other commands')
+    daemon_parser.add_argument('--stop', action='store_true', help='stop the running daemon')
+
+    return parser.parse_args(argv)
 
 
 class Config(object):
@@ -63,6 +159,21 @@ class Config(object):
         self.show_ac = True
         self.submits_count = 1000
         self.source_file = os.path.expanduser(_DEFAULT_SOURCE_FILE)
+        self.cache = True
+        self.mirror_dir = _DEFAULT_MIRROR_DIR
+        self.mirror_workers = 4
+        self.mirror_rate = 2.0
+        self.http_client = 'requests'
+        self.history_dir = _DEFAULT_HISTORY_DIR
+        self.judge_url = None
+        self.pool_size = 10
+        self.connect_timeout = 5.0
+        self.read_timeout = 30.0
+        self.retries = 3
+        self.retry_backoff = 0.5
+        self.renderer = 'html2text'
+        self.offline = False
+        self.output_format = DEFAULT_FORMAT
 
     @classmethod
     def read(cls, config_name):
@@ -92,6 +203,41 @@ class Config(object):
             config.show_ac = parser.getint(_SECTION, 'submits_count')
         if parser.has_option(_SECTION, 'source_file'):
             config.source_file = parser.get(_SECTION, 'source_file')
+        if parser.has_option(_SECTION, 'cache'):
+            config.cache = parser.getboolean(_SECTION, 'cache')
+        if parser.has_option(_SECTION, 'mirror_dir'):
+            config.mirror_dir = parser.get(_SECTION, 'mirror_dir')
+        if parser.has_option(_SECTION, 'mirror_workers'):
+            config.mirror_workers = parser.getint(_SECTION, 'mirror_workers')
+        if parser.has_option(_SECTION, 'mirror_rate'):
+            config.mirror_rate = parser.getfloat(_SECTION, 'mirror_rate')
+        if parser.has_option(_SECTION, 'history_dir'):
+            config.history_dir = parser.get(_SECTION, 'history_dir')
+        if parser.has_option(_SECTION, 'http_client'):
+            config.http_client = parser.get(_SECTION, 'http_client').lower()
+        if parser.has_option(_SECTION, 'judge_url'):
+            config.judge_url = parser.get(_SECTION, 'judge_url')
+        if parser.has_option(_SECTION, 'pool_size'):
+            config.pool_size = parser.getint(_SECTION, 'pool_size')
+        if parser.has_option(_SECTION, 'connect_timeout'):
+            config.connect_timeout = parser.getfloat(_SECTION, 'connect_timeout')
+        if parser.has_option(_SECTION, 'read_timeout'):
+            config.read_timeout = parser.getfloat(_SECTION, 'read_timeout')
+        if parser.has_option(_SECTION, 'retries'):
+            config.retries = parser.getint(_SECTION, 'retries')
+        if parser.has_option(_SECTION, 'retry_backoff'):
+            config.retry_backoff = parser.getfloat(_SECTION, 'retry_backoff')
+        if parser.has_option(_SECTION, 'renderer'):
+            config.renderer = parser.get(_SECTION, 'renderer').lower()
+        if parser.has_option(_SECTION, 'offline'):
+            config.offline = parser.getboolean(_SECTION, 'offline')
+        if parser.has_option(_SECTION, 'format'):
+            config.output_format = parser.get(_SECTION, 'format').lower()
+            if config.output_format not in FORMATS:
+                # the same check as the choices of --format
+                print('{0}: format must be one of {1}, not {2}'.format(
+                    config_name, ', '.join(FORMATS), config.output_format), file=sys.stderr)
+                sys.exit(2)
         return config
 
 
@@ -104,14 +250,43 @@ class Settings(object):
         self.language = ''
         self.locale = ''
         self.submit_id = ''
+        self.submit_ids = []
+        self.submit_jobs = []
         self.password = ''
         self.show_tags = False
         self.show_ac = True
         self.sort = None
         self.tag_id = None
+        self.tag_ids = []
         self.page_id = None
         self.count = None
         self.source_file = ''
+        self.cache = True
+        self.problem_range = None
+        self.workers = 1
+        self.rate = 0.0
+        self.mirror_dir = ''
+        self.http_client = 'requests'
+        self.history_dir = ''
+        self.verdict = None
+        self.submit_language = None
+        self.since = None
+        self.query = ''
+        self.min_difficulty = None
+        self.max_difficulty = None
+        self.limit = None
+        self.offset = 0
+        self.solved = None
+        self.reindex = False
+        self.daemon = True
+        self.transport = None
+        self.stop = False
+        self.renderer = 'html2text'
+        self.offline = False
+        self.profile = False
+        self.profile_json = None
+        self.output_format = DEFAULT_FORMAT
+        self.argv = []
 
     def convert_locale(self):
         if self.locale is None:
@@ -119,8 +294,8 @@ class Settings(object):
         self.locale = 'Russian' if self.locale.lower().startswith('ru') else 'English'
 
     @classmethod
-    def read(cls):
-        args = _parse_args()
+    def read(cls, argv=None):
+        args = _parse_args(argv)
         # TODO(actics): set default config name in build
         config_name = args.config if args.config is not None else _CONFIG_NAME
         config = Config.read(config_name)
@@ -129,34 +304,96 @@ class Settings(object):
         settings.action = Action(args.action)
 
         if settings.action == Action.submit:
-            settings.problem_number = args.problem_number
             settings.judge_id = args.judge_id if args.judge_id is not None else config.judge_id
             settings.language = args.language if args.language is not None else config.language
             settings.source_file = args.source_file if args.source_file is not None else config.source_file
             settings.source_file = os.path.expanduser(settings.source_file)
+            settings.submit_jobs = [(number, os.path.expanduser(source_file or settings.source_file),
+                                     language or settings.language)
+                                    for number, source_file, language in args.jobs]
+            settings.problem_number = settings.submit_jobs[0][0]
 
         if settings.action == Action.problem:
             settings.problem_number = args.problem_number
             settings.judge_id = args.judge_id if args.judge_id is not None else config.judge_id
             settings.show_tags = args.show_tags if args.show_tags is not None else config.show_tags
+            # problems downloaded by "mirror" are shown in the offline mode as well
+            settings.mirror_dir = os.path.expanduser(config.mirror_dir)
 
         if settings.action == Action.problem_submits:
             settings.problem_number = args.problem_number
             settings.judge_id = args.judge_id if args.judge_id is not None else config.judge_id
             settings.count = args.count if args.count is not None else config.submits_count
+            settings.verdict = args.verdict
+            settings.submit_language = args.language
+            settings.since = args.since
 
         if settings.action == Action.problem_set:
             settings.page_id = args.page
-            settings.tag_id = args.tag
-            settings.sort = args.sort if args.sort is not None else SortType.id
+            settings.tag_ids = args.tag or []
+            settings.sort = args.sort if args.sort is not None else DEFAULT_SORT
             settings.judge_id = args.judge_id if args.judge_id is not None else config.judge_id
             settings.show_ac = args.show_ac if args.show_ac is not None else config.show_ac
+            settings.solved = args.solved
+            if settings.solved is None and not settings.show_ac and settings.judge_id is not None:
+                # hiding the solved problems is the same as showing only the unsolved ones
+                settings.solved = False
+            settings.min_difficulty = args.min_difficulty
+            settings.max_difficulty = args.max_difficulty
+            settings.limit = args.limit
+            settings.offset = args.offset
 
         if settings.action == Action.submit_source:
             settings.submit_id = args.submit_id
             settings.judge_id = args.judge_id if args.judge_id is not None else config.judge_id
 
+        if settings.action == Action.status:
+            settings.submit_ids = [str(submit_id) for submit_id in args.submit_ids]
+            settings.judge_id = args.judge_id if args.judge_id is not None else config.judge_id
+
+        if settings.action == Action.sync:
+            settings.judge_id = args.judge_id if args.judge_id is not None else config.judge_id
+
+        if settings.action == Action.search:
+            settings.query = ' '.join(args.query)
+            settings.tag_id = args.tag
+            settings.min_difficulty = args.min_difficulty
+            settings.max_difficulty = args.max_difficulty
+            settings.limit = args.limit
+            settings.reindex = args.reindex
+            settings.mirror_dir = args.output if args.output is not None else config.mirror_dir
+            settings.mirror_dir = os.path.expanduser(settings.mirror_dir)
+
+        if settings.action == Action.mirror:
+            settings.page_id = args.page
+            settings.tag_id = args.tag
+            settings.problem_range = args.range
+            settings.workers = args.workers if args.workers is not None else config.mirror_workers
+            settings.rate = args.rate if args.rate is not None else config.mirror_rate
+            settings.mirror_dir = args.output if args.output is not None else config.mirror_dir
+            settings.mirror_dir = os.path.expanduser(settings.mirror_dir)
+            settings.judge_id = args.judge_id if args.judge_id is not None else config.judge_id
+
+        if settings.action == Action.daemon:
+            settings.stop = args.stop
+
         settings.password = config.password
+        settings.http_client = config.http_client
+        settings.renderer = config.renderer
+        settings.history_dir = os.path.expanduser(config.history_dir)
+        settings.daemon = not args.no_daemon
+        settings.offline = args.offline if args.offline is not None else config.offline
+        settings.profile = args.profile
+        settings.profile_json = args.profile_json
+        settings.output_format = args.format if args.format is not None else config.output_format
+        settings.argv = list(argv if argv is not None else sys.argv[1:])
+        # mirror workers must not wait for a free connection of the pool
+        settings.transport = TransportOptions(config.judge_url, max(config.pool_size, settings.workers),
+                                              config.connect_timeout, config.read_timeout, config.retries,
+                                              config.retry_backoff, settings.offline)
+        settings.cache = not args.no_cache if args.no_cache is not None else config.cache
+        # the cache is the only source of data in the offline mode
+        settings.cache = settings.cache or settings.offline
         settings.locale = args.locale if args.locale is not None else config.locale
         settings.convert_locale()
 
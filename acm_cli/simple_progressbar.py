@@ -1,13 +1,15 @@
 import sys
 
-from colorama import Fore, Style
-
 
 class SimpleProgressBar(object):
-    def __init__(self):
+    def __init__(self, enabled: bool = True):
+        # a disabled bar keeps the machine-readable output clean
+        self.enabled = enabled
         self.prev_print_len = 0
 
     def update(self, text, text_len=None):
+        if not self.enabled:
+            return
         self.clear()
         print(text, end='')
         sys.stdout.flush()
@@ -15,9 +17,12 @@ class SimpleProgressBar(object):
         self.prev_print_len = text_len if text_len is not None else len(text)
 
     def clear(self):
+        if not self.enabled:
+            return
         space = ' ' * self.prev_print_len
         print('\r{0}\r'.format(space), end='')
         self.prev_print_len = 0
 
     def update_status(self, string):
+        from colorama import Fore, Style
         self.update(string, len(string) - len(Fore.RED + Style.RESET_ALL))
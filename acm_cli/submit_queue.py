@@ -0,0 +1,144 @@
+import json
+import os
+import time
+from collections import deque
+from typing import Callable, Iterator, List, Optional
+
+from .acm_api import AcmApi, AcmApiError, SubmitStatus, SubmitThrottledError, SubmitWatcher
+
+_DEFAULT_CLOCK_FILE = os.path.expanduser('~/.cache/acmcli/last_submit.json')
+_MAX_ATTEMPTS = 3
+
+
+class SubmitJob(object):
+    def __init__(self, problem_number: int, source_file: str, language: str, source: str = None):
+        self.problem_number = problem_number
+        self.source_file = source_file
+        self.language = language
+        self.source = source
+        self.attempts = 0
+        self.submit_id = None
+        # set when the verdict of an accepted submit could not be looked up and it is no longer watched
+        self.error = None  # type: Optional[AcmApiError]
+
+
+class SubmitClock(object):
+    # the time of the last accepted submit is shared by all acmcli processes of the user
+    def __init__(self, judge_id: str, interval: float, path: str = _DEFAULT_CLOCK_FILE):
+        self.judge_id = judge_id
+        self.interval = interval
+        self.path = path
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, 'r') as clock_file:
+                return json.load(clock_file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def get_wait(self) -> float:
+        last_time = self._load().get(self.judge_id, 0.0)
+        return max(last_time + self.interval - time.time(), 0.0)
+
+    def mark(self) -> None:
+        clock_dir = os.path.dirname(self.path)
+        if clock_dir and not os.path.exists(clock_dir):
+            os.makedirs(clock_dir)
+
+        times = self._load()
+        times[self.judge_id] = time.time()
+        tmp_path = '{0}.{1}.tmp'.format(self.path, os.getpid())
+        with open(tmp_path, 'w') as clock_file:
+            json.dump(times, clock_file)
+        os.replace(tmp_path, self.path)
+
+
+class SubmitQueue(object):
+    def __init__(self, api: AcmApi, judge_id: str, clock: SubmitClock = None, watcher: SubmitWatcher = None,
+                 callback: Callable[[SubmitJob], None] = None, max_attempts: int = _MAX_ATTEMPTS):
+        self.api = api
+        self.judge_id = judge_id
+        self.clock = clock if clock is not None else SubmitClock(judge_id, api.submit_interval)
+        self.watcher = watcher if watcher is not None else SubmitWatcher(api)
+        self.callback = callback
+        self.max_attempts = max_attempts
+        self.jobs = {}  # submit id -> job
+        self.failed = []  # type: List[SubmitJob]
+        self.lost = []  # type: List[SubmitJob]
+        self._queue = deque()
+        self._poll_errors = {}  # submit id -> failed polls in a row
+
+    def add(self, job: SubmitJob) -> None:
+        self._queue.append(job)
+
+    def _submit_next(self) -> None:
+        job = self._queue.popleft()
+        job.attempts += 1
+        try:
+            job.submit_id = self.api.submit(self.judge_id, job.language, job.problem_number, job.source)
+        except SubmitThrottledError:
+            # somebody else has submitted in the meantime, so the next try waits for a whole interval
+            self.clock.mark()
+            if job.attempts < self.max_attempts:
+                self._queue.appendleft(job)
+                return
+            self.failed.append(job)
+        except AcmApiError:
+            # any other rejection would be repeated by the judge as it is
+            self.failed.append(job)
+        else:
+            self.clock.mark()
+            self.jobs[job.submit_id] = job
+            self.watcher.add(job.submit_id)
+        if self.callback is not None:
+            self.callback(job)
+
+    def _poll(self) -> List[SubmitStatus]:
+        try:
+            return self.watcher.poll()
+        except AcmApiError:
+            pass
+        # one submit that cannot be looked up must not stop the others, so each of them is polled on its own
+        changed = []
+        for submit_id in self.watcher.pending:
+            try:
+                changed.extend(self.watcher.poll([submit_id]))
+            except AcmApiError as error:
+                self._on_poll_error(submit_id, error)
+            else:
+                self._poll_errors.pop(submit_id, None)
+        return changed
+
+    def _on_poll_error(self, submit_id: str, error: AcmApiError) -> None:
+        self._poll_errors[submit_id] = self._poll_errors.get(submit_id, 0) + 1
+        if self._poll_errors[submit_id] < self.max_attempts:
+            return
+        self.watcher.discard(submit_id)
+        job = self.jobs[submit_id]
+        job.error = error
+        self.lost.append(job)
+        if self.callback is not None:
+            self.callback(job)
+
+    def _get_wait(self) -> Optional[float]:
+        return self.clock.get_wait() if self._queue else None
+
+    def run(self) -> Iterator[SubmitStatus]:
+        # submits go out exactly when the judge allows them, verdicts are polled in between
+        while self._queue or self.watcher.pending:
+            wait = self._get_wait()
+            if wait == 0.0:
+                self._submit_next()
+                continue
+
+            if self.watcher.pending:
+                for status in self._poll():
+                    yield status
+                delay = self.watcher.get_delay() if self.watcher.pending else None
+                wait = self._get_wait()
+                if delay is None or (wait is not None and wait < delay):
+                    delay = wait
+            else:
+                delay = wait
+            if delay:
+                time.sleep(delay)
@@ -0,0 +1,157 @@
+import calendar
+import datetime
+import os
+import re
+import sqlite3
+from typing import Iterable, Iterator, Optional
+
+from .acm_api import AcmApi, SubmitStatus, Verdict
+
+_SYNC_PAGE_SIZE = 1000
+_DATE_RE = re.compile(r'(\d{1,2}):(\d{2}):(\d{2})\s*(\d{1,2}) (\w+) (\d{4})')
+# months as the status pages of both locales write them, the first three letters are enough;
+# strptime knows only the month names of the process locale
+_MONTHS = {name: number for number, names in enumerate([
+    ('jan', 'янв'), ('feb', 'фев'), ('mar', 'мар'), ('apr', 'апр'), ('may', 'май', 'мая'), ('jun', 'июн'),
+    ('jul', 'июл'), ('aug', 'авг'), ('sep', 'сен'), ('oct', 'окт'), ('nov', 'ноя'), ('dec', 'дек'),
+], 1) for name in names}
+_PROBLEM_RE = re.compile(r'^\s*(\d+)')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS submits (
+    submit_id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    timestamp INTEGER,
+    author TEXT NOT NULL,
+    problem TEXT NOT NULL,
+    problem_number INTEGER,
+    language TEXT NOT NULL COLLATE NOCASE,
+    verdict TEXT COLLATE NOCASE,
+    test INTEGER,
+    runtime REAL,
+    memory INTEGER,
+    info TEXT NOT NULL COLLATE NOCASE,
+    source_file TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS submits_problem ON submits (problem_number, submit_id);
+CREATE INDEX IF NOT EXISTS submits_verdict ON submits (verdict, info);
+CREATE INDEX IF NOT EXISTS submits_language ON submits (language);
+CREATE INDEX IF NOT EXISTS submits_timestamp ON submits (timestamp);
+'''
+
+_COLUMNS = ['submit_id', 'date', 'author', 'problem', 'language', 'verdict', 'test', 'runtime', 'memory', 'info',
+            'source_file']
+_PROCESSING_VERDICTS = [Verdict.compiling.value, Verdict.running.value, Verdict.waiting.value]
+
+
+def _parse_timestamp(date: str) -> Optional[int]:
+    match = _DATE_RE.search(date)
+    if match is None:
+        return None
+    hour, minute, second, day, month, year = match.groups()
+    month = _MONTHS.get(month[:3].lower())
+    if month is None:
+        return None
+    try:
+        moment = datetime.datetime(int(year), month, int(day), int(hour), int(minute), int(second))
+    except ValueError:
+        return None
+    return calendar.timegm(moment.timetuple())
+
+
+def _parse_problem_number(problem: str) -> Optional[int]:
+    match = _PROBLEM_RE.match(problem)
+    return int(match.group(1)) if match is not None else None
+
+
+class SubmitsDatabase(object):
+    def __init__(self, path: str):
+        db_dir = os.path.dirname(path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def get_count(self) -> int:
+        return self._connection.execute('SELECT COUNT(*) FROM submits').fetchone()[0]
+
+    def get_sync_floor(self) -> Optional[int]:
+        # rows still in process may change, so they are fetched again on the next sync
+        placeholders = ', '.join('?' * len(_PROCESSING_VERDICTS))
+        pending = self._connection.execute(
+            'SELECT MIN(submit_id) FROM submits WHERE verdict IN ({0})'.format(placeholders),
+            _PROCESSING_VERDICTS).fetchone()[0]
+        if pending is not None:
+            return pending - 1
+        return self._connection.execute('SELECT MAX(submit_id) FROM submits').fetchone()[0]
+
+    def save(self, statuses: Iterable[SubmitStatus]) -> int:
+        rows = []
+        for status in statuses:
+            row = status.to_dict()
+            row['submit_id'] = int(row['submit_id'])
+            row['timestamp'] = _parse_timestamp(status.date)
+            row['problem_number'] = _parse_problem_number(status.problem)
+            rows.append(row)
+
+        columns = _COLUMNS + ['timestamp', 'problem_number']
+        query = 'INSERT OR REPLACE INTO submits ({0}) VALUES ({1})'.format(
+            ', '.join(columns), ', '.join(':' + column for column in columns))
+        with self._connection:
+            self._connection.executemany(query, rows)
+        return len(rows)
+
+    def query(self, problem_number: int = None, verdict: str = None, language: str = None, since: int = None,
+              until: int = None, limit: int = None) -> Iterator[SubmitStatus]:
+        conditions, params = [], []
+        if problem_number is not None:
+            conditions.append('problem_number = ?')
+            params.append(problem_number)
+        if verdict is not None:
+            conditions.append('(verdict = ? OR info = ?)')
+            params.extend([verdict, verdict])
+        if language is not None:
+            conditions.append("language LIKE ? || '%'")
+            params.append(language)
+        if since is not None:
+            conditions.append('timestamp >= ?')
+            params.append(since)
+        if until is not None:
+            conditions.append('timestamp < ?')
+            params.append(until)
+
+        query = 'SELECT {0} FROM submits'.format(', '.join(_COLUMNS))
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY submit_id DESC'
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+
+        for row in self._connection.execute(query, params):
+            data = dict(zip(_COLUMNS, row))
+            data['submit_id'] = str(data['submit_id'])
+            yield SubmitStatus.from_dict(data)
+
+    def sync(self, api: AcmApi, page_size: int = _SYNC_PAGE_SIZE) -> int:
+        floor = self.get_sync_floor()
+        from_id = None
+        synced = 0
+        while True:
+            rows = 0
+            fresh = []
+            for status in api.iter_my_submits(page_size, from_id):
+                rows += 1
+                if floor is not None and int(status.submit_id) <= floor:
+                    break
+                fresh.append(status)
+            synced += self.save(fresh)
+
+            if len(fresh) < rows or rows < page_size:
+                return synced
+            from_id = str(int(fresh[-1].submit_id) - 1)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from acm_cli.acm_api import TransportOptions  # noqa: E402
+from acm_cli.acm_api.apis.timus.timus_api import TimusApi  # noqa: E402
+from mock_timus_server import MockOptions, MockTimusServer, _FIRST_SUBMIT_ID  # noqa: E402
+
+_FIRST_PROBLEM = 1000
+
+
+class Result(object):
+    def __init__(self):
+        self.latencies = []  # type: List[float]
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def add(self, latency: float, failed: bool) -> None:
+        with self._lock:
+            self.latencies.append(latency)
+            self.failures += failed
+
+    def format(self, name: str, elapsed: float) -> str:
+        latencies = sorted(self.latencies)
+        p95 = latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+        return '{0:<10} {1:6} calls {2:8.1f} calls/s  p50 {3:7.1f} ms  p95 {4:7.1f} ms  {5} failed'.format(
+            name, len(latencies), len(latencies) / elapsed, statistics.median(latencies) * 1000, p95 * 1000,
+            self.failures)
+
+
+def _call(result: Result, function: Callable[[], object]) -> None:
+    started = time.perf_counter()
+    try:
+        function()
+    except Exception:
+        # the client does not check the status of a page, an error page fails in the parser
+        result.add(time.perf_counter() - started, True)
+    else:
+        result.add(time.perf_counter() - started, False)
+
+
+def _poll(api: TimusApi, from_id: str, count: int) -> None:
+    # an error page has no rows, so it parses to an empty window
+    if not api.get_submits_window(from_id, count):
+        raise ValueError('empty status window at {0}'.format(from_id))
+
+
+def run(name: str, workers: int, calls: List[Callable[[], object]]) -> None:
+    result = Result()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(workers) as executor:
+        for call in calls:
+            executor.submit(_call, result, call)
+    print(result.format(name, time.perf_counter() - started))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Concurrent status polling and bulk downloads against a mock Timus')
+    parser.add_argument('--url', help='judge to load, a local mock_timus_server.py is started by default')
+    parser.add_argument('-w', '--workers', type=int, default=8, help='threads sharing one client')
+    parser.add_argument('--polls', type=int, default=500, help='status windows to poll')
+    parser.add_argument('--problems', type=int, default=200, help='problems to download')
+    parser.add_argument('--latency', type=float, default=20.0, help='milliseconds of latency of the local mock')
+    parser.add_argument('--jitter', type=float, default=5.0, help='milliseconds of jitter of the local mock')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of failing requests of the local mock')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        options = MockOptions(args.latency / 1000, args.jitter / 1000, args.error_rate, seed=args.seed)
+        server = MockTimusServer(options).start()
+        url = server.url
+
+    # retries would hide the injected errors and stretch the latencies
+    api = TimusApi('en', transport=TransportOptions(url, pool_size=args.workers, retries=0))
+    try:
+        submit_ids = [str(_FIRST_SUBMIT_ID + i * 7) for i in range(args.polls)]
+        run('status', args.workers, [lambda x=x: _poll(api, x, 10) for x in submit_ids])
+        numbers = [_FIRST_PROBLEM + i for i in range(args.problems)]
+        run('problems', args.workers, [lambda x=x: api.get_problem(x) for x in numbers])
+    finally:
+        if server is not None:
+            server.stop()
+            print('server: {0} requests, {1} failed'.format(server.state.requests, server.state.errors))
+
+
+if __name__ == '__main__':
+    main()
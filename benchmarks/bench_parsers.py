@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from acm_cli.acm_api.apis.timus import parsers  # noqa: E402
+from acm_cli.acm_api.apis.timus.timus_api import TimusUrls, DEFAULT_JUDGE_URL  # noqa: E402
+
+# the committed pages are recorded with --record from a local mock_timus_server.py, whose pages follow the
+# markup the parsers expect; --record --url http://acm.timus.ru refreshes them from the judge
+_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+# memory over the committed fixtures, for --baseline; timings depend on the machine and are never committed
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline_parsers.json')
+_RECORD_PROBLEMS = [1000, 1001, 1201, 1500, 2000]
+# a statement with the source block below a paragraph, kept with the recorded pages, see tests
+NESTED_SOURCE_FIXTURE = 'problem_en_1000_nested_source.html'
+_LOCALES = {'en': 'English', 'ru': 'Russian'}
+_TIMING_KEYS = ('pages_per_s', 'rows_per_s')
+
+# fixture files are matched to parsers by their name prefix
+_PARSERS = [
+    ('parse_problem', 'problem_'),
+    ('parse_problem_native', 'problem_'),
+    ('parse_problem_set', 'problemset_all'),
+    ('parse_problem_submits', 'status_'),
+    ('parse_languages', 'submit'),
+    ('parse_tags', 'problemset_menu'),
+    ('parse_pages', 'problemset_menu'),
+    ('parse_problem_set_menu', 'problemset_menu'),
+]
+
+_PROBLEM_LABELS = {
+    'en': ('Time limit: 1.0 second', 'Memory limit: 64 MB', 'Input', 'Output', 'Samples', 'Problem Author: ',
+           'Problem Source: ', 'Difficulty: 215', 'Discussion (46)', 'All submissions (13992)',
+           'All accepted submissions (5752)', 'Solutions rating (4896)'),
+    'ru': ('Ограничение времени: 1.0 секунды', 'Ограничение памяти: 64 МБ', 'Исходные данные', 'Результат', 'Примеры',
+           'Автор задачи: ', 'Источник задачи: ', 'Сложность: 215', 'Обсуждение (46)', 'Все попытки (13992)',
+           'Все правильные попытки (5752)', 'Рейтинг решений (4896)'),
+}
+
+_STATUS_ROW = ('<TR class="{0}"><TD class="id"><A HREF="getsubmit.aspx/{1}.cpp">{1}</A></TD><TD class="date"><NOBR>'
+               '12:{2:02}:00</NOBR><BR><NOBR>18 Oct 2026</NOBR></TD><TD class="coder"><A HREF="author.aspx?id={3}">'
+               'Team {3}</A></TD><TD class="problem"><A HREF="problem.aspx?space=1&amp;num={4}">{4}</A><SPAN '
+               'class="problemname">. Problem {4}</SPAN></TD><TD class="language">G++ 9.2 x64</TD><TD class="{5}">'
+               '{6}</TD><TD class="test">{7}</TD><TD class="runtime">0.{2:03}</TD><TD class="memory">1 {3:03} KB</TD>'
+               '</TR>\n')
+# like the real pages, so that lxml decodes the bytes as UTF-8
+_HEAD = '<HEAD><META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=utf-8"></HEAD>'
+_VERDICTS = [('verdict_ac', 'Accepted', ''), ('verdict_rj', 'Wrong answer', '3'),
+             ('verdict_rj', 'Time limit exceeded', '12'), ('verdict_wt', 'Running', '1')]
+
+
+def _make_problem(number: int, locale: str, nested_source: bool = False) -> bytes:
+    labels = _PROBLEM_LABELS[locale]
+    source = '<DIV class="problem_source"><B>{1[5]}</B>Ivan Ivanov<BR><B>{1[6]}</B>Ural Championship 2026</DIV>'
+    if nested_source:
+        # some statements keep the source block inside the last paragraph instead of after it
+        source = '<DIV class="problem_par"><DIV class="problem_par_normal">Good luck!</DIV>' + source + '</DIV>'
+    paragraph = ('<DIV class="problem_par"><DIV class="problem_par_normal">A sequence of <I>n</I> integers '
+                 '<I>a</I><SUB>1</SUB>, &hellip;, <I>a<SUB>n</SUB></I> is given, 1 &le; <I>n</I> &le; 10<SUP>5'
+                 '</SUP>. Find the <A HREF="/help.aspx">longest</A> run with the <B>maximal</B> sum.</DIV></DIV>\n')
+    sample = '<TR><TD><PRE class="intable">3\n1 -2 3\n</PRE></TD><TD><PRE class="intable">3\n</PRE></TD></TR>'
+    page = (_HEAD + '<HTML><BODY><TABLE><TR><TD><DIV class="problem_content"><H2 class="problem_title">{0}. Maximal Run</H2>'
+            '<DIV class="problem_limits">{1[0]}<BR>{1[1]}</DIV><DIV id="problem_text" class="problem_text">{2}'
+            '<H3 class="problem_subtitle">{1[2]}</H3>{3}<H3 class="problem_subtitle">{1[3]}</H3>{3}'
+            '<H3 class="problem_subtitle">{1[4]}</H3><TABLE class="sample"><TR><TH>input</TH><TH>output</TH></TR>'
+            '{4}</TABLE>' + source + '</DIV><DIV class="problem_links"><SPAN>{1[7]}</SPAN> '
+            '<A HREF="/print.aspx">print</A> '
+            '<A HREF="/submit.aspx">submit</A> <A HREF="/forum/?problem={0}">{1[8]}</A> '
+            '<A HREF="/status.aspx?num={0}&amp;author=me">my</A> <A HREF="/status.aspx?num={0}">{1[9]}</A> '
+            '<A HREF="/status.aspx?num={0}&amp;status=accepted">{1[10]}</A> <A HREF="/ranklist.aspx?num={0}">'
+            '{1[11]}</A></DIV><DIV class="problem_tags"><SPAN class="problem_tags_toggle">Tags:</SPAN> '
+            '<A HREF="/problemset.aspx?tag=dp">dynamic programming</A>, <A HREF="/problemset.aspx?tag=greedy">greedy'
+            '</A></DIV></DIV></TD></TR></TABLE></BODY></HTML>')
+    return page.format(number, labels, paragraph * 8, paragraph, sample * 3).encode('utf-8')
+
+
+def _make_problem_set(count: int) -> bytes:
+    row = ('<TR class="content"><TD>{0}</TD><TD>{1}</TD><TD><A HREF="problem.aspx?num={1}">Problem {1}</A></TD>'
+           '<TD><A HREF="problemset.aspx?tag=x">Ural Championship {2}</A></TD><TD>{3}</TD><TD>{4}</TD></TR>\n')
+    images = ['<IMG SRC="images/ok.gif">', '<IMG SRC="images/minus.gif">', '']
+    rows = ''.join(row.format(images[i % 3], 1000 + i, 2000 + i % 26, 100000 // (i + 1), 100 + i * 7)
+                   for i in range(count))
+    return ('<HTML><BODY><TABLE class="problemset"><TR class="content"><TD></TD><TD>ID</TD><TD>Name</TD>'
+            '<TD>Source</TD><TD>Rating</TD><TD>Difficulty</TD></TR>\n{0}</TABLE></BODY></HTML>').format(rows)\
+        .encode('utf-8')
+
+
+def _make_status(count: int) -> bytes:
+    rows = ''.join(_STATUS_ROW.format('even' if i % 2 == 0 else 'odd', 9000000 - i, i % 60, i % 50,
+                                      1000 + i % 1200, *_VERDICTS[i % len(_VERDICTS)])
+                   for i in range(count))
+    return ('<HTML><BODY><TABLE class="status"><TR class="header"><TD>ID</TD></TR>\n{0}</TABLE></BODY>'
+            '</HTML>').format(rows).encode('utf-8')
+
+
+def _make_submit() -> bytes:
+    options = ''.join('<OPTION VALUE="{0}">Language {0} x64</OPTION>'.format(i) for i in range(30))
+    return ('<HTML><BODY><FORM><SELECT NAME="Language">{0}</SELECT></FORM></BODY></HTML>').format(options)\
+        .encode('utf-8')
+
+
+def _make_problemset_menu() -> bytes:
+    pages = ''.join('<A HREF="problemset.aspx?space=1&amp;page={0}">{0}</A> | <A HREF="x.aspx">x</A> '.format(i)
+                    for i in range(1, 13))
+    tags = ''.join('<A HREF="problemset.aspx?space=1&amp;tag=tag{0}">Tag {0}</A> '.format(i) for i in range(25))
+    return ('<HTML><BODY><P><A HREF="problemset.aspx?space=1&amp;page=all">All</A></P><P>{0}</P>'
+            '<P>{1}</P><P>{1}</P></BODY></HTML>').format(pages, tags).encode('utf-8')
+
+
+def make_synthetic_corpus() -> Dict[str, bytes]:
+    corpus = {
+        'problemset_all.html': _make_problem_set(1200),
+        'status_1000.html': _make_status(1000),
+        'submit.html': _make_submit(),
+        'problemset_menu.html': _make_problemset_menu(),
+    }
+    for locale in _LOCALES:
+        for number in _RECORD_PROBLEMS:
+            corpus['problem_{0}_{1}.html'.format(locale, number)] = _make_problem(number, locale)
+    corpus[NESTED_SOURCE_FIXTURE] = _make_problem(_RECORD_PROBLEMS[0], 'en', nested_source=True)
+    return corpus
+
+
+def record(path: str, base_url: str) -> None:
+    from acm_cli.acm_api import TransportOptions
+    from acm_cli.acm_api.transport import create_session
+
+    options = TransportOptions(base_url)
+    pages = {
+        'problemset_all.html': TimusUrls.problem_set.get_url(base_url, {'space': 1, 'page': 'all'}),
+        'status_1000.html': TimusUrls.status.get_url(base_url, {'count': 1000}),
+        'submit.html': TimusUrls.submit.get_url(base_url),
+        'problemset_menu.html': TimusUrls.problem_set.get_url(base_url),
+    }
+    if not os.path.exists(path):
+        os.makedirs(path)
+    for locale, name in _LOCALES.items():
+        session = create_session(options)
+        session.cookies.set('Locale', name)
+        urls = dict(pages) if locale == 'en' else {}
+        for number in _RECORD_PROBLEMS:
+            urls['problem_{0}_{1}.html'.format(locale, number)] = TimusUrls.problem.get_url(base_url, {'num': number})
+        for file_name, url in urls.items():
+            response = session.get(url, timeout=options.timeout)
+            response.raise_for_status()
+            with open(os.path.join(path, file_name), 'wb') as fixture:
+                fixture.write(response.content)
+            print('recorded {0} ({1} bytes)'.format(file_name, len(response.content)))
+
+
+def load_corpus(path: str) -> Tuple[Dict[str, bytes], str]:
+    if not os.path.isdir(path) or not os.listdir(path):
+        return make_synthetic_corpus(), 'synthetic'
+    corpus = {}
+    for name in sorted(os.listdir(path)):
+        with open(os.path.join(path, name), 'rb') as fixture:
+            corpus[name] = fixture.read()
+    return corpus, path
+
+
+def _count_rows(result) -> int:
+    return len(result) if isinstance(result, list) else 1
+
+
+def measure(parser: Callable, pages: List[bytes], min_time: float) -> Dict[str, float]:
+    rows = sum(_count_rows(parser(page)) for page in pages)
+
+    # the fastest pass over the corpus is the least disturbed by the rest of the system
+    best = float('inf')
+    deadline = time.perf_counter() + min_time
+    while True:
+        started = time.perf_counter()
+        for page in pages:
+            parser(page)
+        best = min(best, time.perf_counter() - started)
+        if time.perf_counter() >= deadline:
+            break
+
+    # memory is measured apart from the timing, tracemalloc slows everything down;
+    # the collector runs only where it is called, so the figures are the same on every run
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        results = [parser(page) for page in pages]
+        # allocations still alive after parsing, the blocks freed along the way are not counted
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+        retained_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+    del results
+
+    return {
+        'pages_per_s': len(pages) / best,
+        'rows_per_s': rows / best,
+        'peak_kb': peak / 1024,
+        'retained_kb': retained / 1024,
+        'retained_blocks': retained_blocks,
+    }
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        # only a baseline saved on this machine has timings to compare with
+        if 'pages_per_s' in base and result['pages_per_s'] < base['pages_per_s'] * (1 - tolerance):
+            regressions.append('{0}: {1:.1f} pages/s, baseline {2:.1f}'.format(
+                name, result['pages_per_s'], base['pages_per_s']))
+        if result['peak_kb'] > base['peak_kb'] * (1 + tolerance):
+            regressions.append('{0}: peak {1:.0f} KB, baseline {2:.0f} KB'.format(
+                name, result['peak_kb'], base['peak_kb']))
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Throughput and memory of the Timus parsers')
+    parser.add_argument('--fixtures', default=_FIXTURES_DIR,
+                        help='directory of saved pages, synthetic pages are used when it is empty')
+    parser.add_argument('--record', action='store_true', help='download a fresh corpus to --fixtures and exit')
+    parser.add_argument('--url', default=DEFAULT_JUDGE_URL, help='judge to record the corpus from')
+    parser.add_argument('--parser', action='append', help='benchmark only these parsers')
+    parser.add_argument('--min-time', type=float, default=1.0, help='seconds to run every parser')
+    parser.add_argument('--save-baseline', help='write the results to this JSON file')
+    parser.add_argument('--memory-only', action='store_true',
+                        help='leave the timings out of --save-baseline, like the committed baseline_parsers.json')
+    parser.add_argument('--baseline', nargs='?', const=BASELINE_FILE,
+                        help='fail if bigger than the results in this JSON file, or slower when it has timings; '
+                             'the committed baseline_parsers.json by default, which has memory only')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative regression')
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.fixtures, args.url)
+        return
+
+    corpus, source = load_corpus(args.fixtures)
+    print('corpus: {0}, {1} pages'.format(source, len(corpus)))
+    results = {}
+    for name, prefix in _PARSERS:
+        if args.parser and name not in args.parser:
+            continue
+        pages = [content for file_name, content in corpus.items() if file_name.startswith(prefix)]
+        if not pages:
+            continue
+        results[name] = result = measure(getattr(parsers, name), pages, args.min_time)
+        print('{0:<22} {1:9.1f} pages/s {2:11.0f} rows/s  peak {3:8.0f} KB  retained {4:7.0f} KB in {5:7} blocks'
+              .format(name, result['pages_per_s'], result['rows_per_s'], result['peak_kb'], result['retained_kb'],
+                      result['retained_blocks']))
+
+    if args.save_baseline:
+        if args.memory_only:
+            results = {name: {key: value for key, value in result.items() if key not in _TIMING_KEYS}
+                       for name, result in results.items()}
+        with open(args.save_baseline, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print('REGRESSION ' + regression)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+import argparse
+import difflib
+import os
+import sys
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lxml.html  # noqa: E402
+
+from acm_cli.acm_api.apis.timus import parsers  # noqa: E402
+from acm_cli.acm_api.apis.timus.markdown_renderer import render_markdown  # noqa: E402
+from bench_parsers import load_corpus, _FIXTURES_DIR  # noqa: E402
+
+_RENDERERS = [
+    ('html2text', parsers._render_html2text),
+    ('native', render_markdown),
+]
+
+
+def _load_statements(corpus: Dict[str, bytes]) -> List[bytes]:
+    return [content for name, content in corpus.items() if name.startswith('problem_')]
+
+
+def measure(render: Callable[[lxml.html.HtmlElement], str], pages: List[bytes], min_time: float) -> float:
+    # the trees are parsed in advance, only the rendering of the statements is timed
+    statements = [lxml.html.fromstring(page).get_element_by_id('problem_text') for page in pages]
+    best = float('inf')
+    deadline = time.perf_counter() + min_time
+    while True:
+        started = time.perf_counter()
+        for statement in statements:
+            render(statement)
+        best = min(best, time.perf_counter() - started)
+        if time.perf_counter() >= deadline:
+            return len(statements) / best
+
+
+def _similarity(first: str, second: str) -> float:
+    return difflib.SequenceMatcher(None, first.split(), second.split(), autojunk=False).ratio()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Speed of the statement renderers on saved problem pages')
+    parser.add_argument('--fixtures', default=_FIXTURES_DIR,
+                        help='directory of saved pages (bench_parsers.py --record), synthetic pages when it is empty')
+    parser.add_argument('--min-time', type=float, default=1.0, help='seconds to run every renderer')
+    parser.add_argument('--show', action='store_true', help='print the statements of both renderers')
+    args = parser.parse_args()
+
+    corpus, source = load_corpus(args.fixtures)
+    pages = _load_statements(corpus)
+    print('corpus: {0}, {1} statements'.format(source, len(pages)))
+    for name, render in _RENDERERS:
+        print('{0:<10} {1:9.1f} statements/s'.format(name, measure(render, pages, args.min_time)))
+
+    # the whole problem, so that the input, output and samples are split off as they are in the client
+    similarities = []
+    for page in pages:
+        expected = parsers.parse_problem(page)
+        actual = parsers.parse_problem_native(page)
+        similarities.append(_similarity(expected.text, actual.text))
+        if args.show:
+            print('=' * 78, expected.text, '-' * 78, actual.text, sep='\n')
+    print('words in common with html2text: {0:.0%} on average, {1:.0%} at worst'.format(
+        sum(similarities) / len(similarities), min(similarities)))
+
+
+if __name__ == '__main__':
+    main()
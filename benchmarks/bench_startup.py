@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SCRIPT = os.path.join(_ROOT, 'acmcli.py')
+_IMPORT_RE = re.compile(r'^import time:\s*(\d+) \|\s*(\d+) \|( *)(\S+)$')
+# heavy modules that must stay out of "--help" and of commands answered from the cache
+_HEAVY_MODULES = ['requests', 'lxml', 'html2text', 'asyncio', 'multiprocessing']
+_DEFAULT_COMMANDS = ['--help', 'languages --help', '-l en languages']
+
+
+def _run(args: List[str]) -> float:
+    started = time.perf_counter()
+    subprocess.run(args, cwd=_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def _get_imports(command: str) -> Dict[str, int]:
+    args = [sys.executable, '-X', 'importtime', _SCRIPT] + command.split()
+    process = subprocess.run(args, cwd=_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                             universal_newlines=True)
+    imports = {}
+    for line in process.stderr.splitlines():
+        match = _IMPORT_RE.match(line)
+        if match is not None:
+            imports[match.group(4)] = int(match.group(1))
+    return imports
+
+
+def measure(command: str, repeat: int, baseline: float) -> float:
+    args = [sys.executable, _SCRIPT] + command.split()
+    # the interpreter start is the same for every python program, only the time on top of it is ours
+    return statistics.median(_run(args) for _ in range(repeat)) - baseline
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Time to first output of acmcli commands')
+    parser.add_argument('commands', nargs='*', default=_DEFAULT_COMMANDS,
+                        help='command lines to measure, for example "-l en languages"')
+    parser.add_argument('-n', '--repeat', type=int, default=10)
+    parser.add_argument('--target', type=float, default=80, help='maximum milliseconds over a bare interpreter')
+    args = parser.parse_args()
+
+    baseline = statistics.median(_run([sys.executable, '-c', 'pass']) for _ in range(args.repeat))
+    print('bare interpreter: {0:.1f} ms'.format(baseline * 1000))
+
+    failed = False
+    for command in args.commands:
+        elapsed = measure(command, args.repeat, baseline) * 1000
+        imports = _get_imports(command)
+        own = sum(value for name, value in imports.items() if name.split('.')[0] == 'acm_cli') / 1000
+        heavy = [name for name in _HEAVY_MODULES if name in imports]
+        print('{0!r}: {1:.1f} ms (target {2:.0f}), acm_cli self import time {3:.1f} ms, heavy modules: {4}'.format(
+            command, elapsed, args.target, own, ', '.join(heavy) or 'none'))
+        if elapsed > args.target:
+            failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
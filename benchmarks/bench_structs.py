@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from acm_cli.acm_api import SubmitStatus  # noqa: E402
+
+_AUTHORS = ['Team {0}'.format(i) for i in range(20)]
+_LANGUAGES = ['FreePascal 2.6', 'Visual C++ 2017', 'G++ 9.2 x64', 'Python 3.8 x64', 'Java 1.8', 'C# .NET Core 3.1']
+_VERDICTS = ['Accepted', 'Wrong answer', 'Time limit exceeded', 'Memory limit exceeded', 'Compilation error']
+
+
+def _make_status(i: int) -> SubmitStatus:
+    # mimic parsers._parse_submit_status_element: every field starts as a fresh string from lxml
+    status = SubmitStatus()
+    status.submit_id = str(9000000 + i)
+    status.date = '{0:02}:{1:02}:{2:02}{3:02} Oct 2026'.format(i % 24, i % 60, (i * 7) % 60, i % 28 + 1)
+    status.author = sys.intern(''.join(_AUTHORS[i % len(_AUTHORS)]))
+    status.problem = sys.intern('{0}. Problem {0}'.format(1000 + i % 1200))
+    status.language = sys.intern(''.join(_LANGUAGES[i % len(_LANGUAGES)]))
+    status.test = i % 40 + 1
+    status.runtime = (i % 2000) / 1000
+    status.memory = 100 + i % 100000
+    status.set_verdict(''.join(_VERDICTS[i % len(_VERDICTS)]))
+    return status
+
+
+def measure(rows: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    statuses = [_make_status(i) for i in range(rows)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del statuses
+    return (after - before) / rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Memory per SubmitStatus row')
+    parser.add_argument('-n', '--rows', type=int, default=200000)
+    parser.add_argument('--target', type=float, default=400, help='maximum bytes per row')
+    args = parser.parse_args()
+
+    per_row = measure(args.rows)
+    print('SubmitStatus: {0:.0f} bytes/row over {1} rows (target {2:.0f})'.format(per_row, args.rows, args.target))
+    if per_row > args.target:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
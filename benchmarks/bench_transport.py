@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+import argparse
+import gzip
+import http.server
+import os
+import statistics
+import sys
+import threading
+import time
+from typing import Callable, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+
+from acm_cli.acm_api import TransportOptions  # noqa: E402
+from acm_cli.acm_api.transport import create_session  # noqa: E402
+
+_ROW = ('<TR class="even"><TD class="id">{0}</TD><TD class="date"><NOBR>12:00:00</NOBR><BR><NOBR>18 Oct 2026</NOBR>'
+        '</TD><TD class="coder"><A HREF="author.aspx?id={1}">Team {1}</A></TD><TD class="problem">'
+        '<A HREF="problem.aspx?space=1&amp;num={2}">{2}<SPAN class="problemname">. Problem</SPAN></A></TD>'
+        '<TD class="language">G++ 9.2 x64</TD><TD class="verdict_ac">Accepted</TD><TD class="test"><BR></TD>'
+        '<TD class="runtime">0.015</TD><TD class="memory">392 KB</TD></TR>\n')
+
+
+def _make_page(rows: int) -> bytes:
+    body = ''.join(_ROW.format(9000000 - i, i % 50, 1000 + i % 1200) for i in range(rows))
+    return '<HTML><BODY><TABLE class="status">{0}</TABLE></BODY></HTML>'.format(body).encode('utf-8')
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written separately, Nagle would delay the body of a kept-alive response
+    disable_nagle_algorithm = True
+    page = b''
+    # compressed once, so that the numbers show the client and the wire, not the compression speed of python
+    gzip_page = b''
+
+    def do_GET(self):
+        content = self.page
+        accepted = self.headers.get('Accept-Encoding', '')
+        self.send_response(200)
+        if 'gzip' in accepted:
+            content = self.gzip_page
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_server(rows: int) -> Tuple[http.server.HTTPServer, str]:
+    _Handler.page = _make_page(rows)
+    _Handler.gzip_page = gzip.compress(_Handler.page)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, 'http://127.0.0.1:{0}/status.aspx'.format(server.server_port)
+
+
+def _plain_get(url: str) -> requests.Response:
+    # the first request of a command before: a new connection with the default headers of requests
+    return requests.get(url, stream=True)
+
+
+def measure(get: Callable[[str], requests.Response], url: str, repeat: int) -> Tuple[float, int]:
+    times, size = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = get(url)
+        size = len(response.raw.read(decode_content=False))
+        times.append(time.perf_counter() - started)
+        response.close()
+    return statistics.median(times), size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Bytes on the wire and latency of the judge transport')
+    parser.add_argument('--url', help='page to fetch, a local server with a status page is used by default')
+    parser.add_argument('--rows', type=int, default=1000, help='rows of the local status page')
+    parser.add_argument('-n', '--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server, url = _start_server(args.rows)
+
+    # the client kept one default session for the whole command before
+    plain_session = requests.Session()
+    session = create_session(TransportOptions())
+    try:
+        for name, get in [('get', _plain_get), ('session', lambda u: plain_session.get(u, stream=True)),
+                          ('transport', lambda u: session.get(u, stream=True))]:
+            latency, size = measure(get, url, args.repeat)
+            print('{0:<10} {1:>9} bytes  {2:7.2f} ms'.format(name, size, latency * 1000))
+    finally:
+        plain_session.close()
+        session.close()
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
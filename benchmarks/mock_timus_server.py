@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+import argparse
+import gzip
+import http.server
+import os
+import random
+import re
+import sys
+import threading
+import time
+import urllib.parse
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from acm_cli.acm_api.apis.timus.timus_api import TimusUrls, SUBMIT_INTERVAL  # noqa: E402
+from bench_parsers import load_corpus, _FIXTURES_DIR, _HEAD, _make_problem  # noqa: E402
+
+_DEFAULT_SUBMITS = 5000
+_FIRST_SUBMIT_ID = 9000000
+_TEXT = 'text/plain; charset=utf-8'
+_HTML = 'text/html; charset=utf-8'
+# the same verdicts as the real judge prints them, with the test number where it has one
+_VERDICTS = [('verdict_ac', 'Accepted', ''), ('verdict_rj', 'Wrong answer', '3'),
+             ('verdict_rj', 'Time limit exceeded', '12'), ('verdict_rj', 'Compilation error', '')]
+_RUNNING = ('verdict_wt', 'Running', '1')
+_STATUS_ROW = ('<TR class="{0}"><TD class="id">{1}</TD><TD class="date"><NOBR>{2}</NOBR><BR><NOBR>{3}</NOBR></TD>'
+               '<TD class="coder"><A HREF="author.aspx?id={4}">Team {4}</A></TD><TD class="problem">'
+               '<A HREF="problem.aspx?space=1&amp;num={5}">{5}</A><SPAN class="problemname">. Problem {5}</SPAN>'
+               '</TD><TD class="language">{6}</TD><TD class="{7}">{8}</TD><TD class="test">{9}</TD>'
+               '<TD class="runtime">{10}</TD><TD class="memory">{11}</TD></TR>\n')
+_LANGUAGES = {'31': 'Python 3.8 x64', '57': 'GNU C++ 9.2 x64', '64': 'Java 1.8'}
+_EXTENSIONS = {'31': 'py', '57': 'cpp', '64': 'java'}
+
+
+class MockOptions(object):
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, error_status: int = 503,
+                 submit_interval: float = SUBMIT_INTERVAL, judge_time: float = 2.0, submits: int = _DEFAULT_SUBMITS,
+                 seed: int = 0):
+        # seconds added to every response, spread uniformly by the jitter
+        self.latency = latency
+        self.jitter = jitter
+        # share of the requests that get error_status instead of the page
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.submit_interval = submit_interval
+        # how long a new submit stays "Running" before its verdict shows up
+        self.judge_time = judge_time
+        # submits of other authors that are on the status page from the start
+        self.submits = submits
+        self.seed = seed
+
+
+class Submit(object):
+    def __init__(self, submit_id: int, author_id: str, problem: int, language: str, source: str, created: float,
+                 verdict: Tuple[str, str, str]):
+        self.submit_id = submit_id
+        self.author_id = author_id
+        self.problem = problem
+        self.language = language
+        self.source = source
+        self.created = created
+        self.verdict = verdict
+
+
+class TimusState(object):
+    # everything the judge remembers between the requests, shared by the handler threads
+    def __init__(self, options: MockOptions, corpus: Dict[str, bytes]):
+        self.options = options
+        self.corpus = corpus
+        self.submits = []  # type: List[Submit]
+        self.last_submit = {}  # type: Dict[str, float]
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(options.seed)
+        self._lock = threading.Lock()
+        for _ in range(options.submits):
+            author_id = str(100000 + self._random.randrange(50))
+            self._add_submit(author_id, 1000 + self._random.randrange(1200), '57', '', 0.0)
+
+    def _add_submit(self, author_id: str, problem: int, language: str, source: str, created: float) -> Submit:
+        submit = Submit(_FIRST_SUBMIT_ID + len(self.submits), author_id, problem, language, source, created,
+                        self._random.choice(_VERDICTS))
+        self.submits.append(submit)
+        return submit
+
+    def draw_delay_and_error(self) -> Tuple[float, bool]:
+        # one generator for all threads: the same seed gives the same sequence of delays and errors
+        with self._lock:
+            self.requests += 1
+            delay = self.options.latency + self._random.uniform(-1, 1) * self.options.jitter
+            failed = self._random.random() < self.options.error_rate
+            if failed:
+                self.errors += 1
+        return max(delay, 0.0), failed
+
+    def submit(self, judge_id: str, problem: int, language: str, source: str) -> Optional[Submit]:
+        now = time.monotonic()
+        with self._lock:
+            last_time = self.last_submit.get(judge_id)
+            if last_time is not None and now - last_time < self.options.submit_interval:
+                return None
+            self.last_submit[judge_id] = now
+            return self._add_submit(get_author_id(judge_id), problem, language, source, now)
+
+    def get_verdict(self, submit: Submit) -> Tuple[str, str, str]:
+        if submit.created and time.monotonic() - submit.created < self.options.judge_time:
+            return _RUNNING
+        return submit.verdict
+
+    def find_submits(self, from_id: Optional[int], count: int, author_id: Optional[str],
+                     problem: Optional[int]) -> List[Submit]:
+        with self._lock:
+            submits = list(self.submits)
+        if from_id is not None:
+            submits = submits[:max(from_id - _FIRST_SUBMIT_ID + 1, 0)]
+        found = []
+        for submit in reversed(submits):
+            if len(found) >= count:
+                break
+            if author_id is not None and submit.author_id != author_id:
+                continue
+            if problem is not None and submit.problem != problem:
+                continue
+            found.append(submit)
+        return found
+
+    def get_submit(self, submit_id: int) -> Optional[Submit]:
+        index = submit_id - _FIRST_SUBMIT_ID
+        with self._lock:
+            return self.submits[index] if 0 <= index < len(self.submits) else None
+
+
+def get_author_id(judge_id: str) -> str:
+    # a judge id is the author id followed by a few letters
+    digits = re.match(r'\d*', judge_id).group(0)
+    return digits or str(zlib.crc32(judge_id.encode('utf-8')) % 1000000)
+
+
+def _get_source_file(submit: Submit) -> str:
+    return '{0}.{1}'.format(submit.submit_id, _EXTENSIONS.get(submit.language, 'txt'))
+
+
+def _make_status_row(state: TimusState, submit: Submit, index: int, own: bool) -> str:
+    submit_id = str(submit.submit_id)
+    if own:
+        submit_id = '<A HREF="getsubmit.aspx/{0}">{1}</A>'.format(_get_source_file(submit), submit_id)
+    verdict_class, verdict, test = state.get_verdict(submit)
+    judged = verdict_class != 'verdict_wt' and verdict != 'Compilation error'
+    return _STATUS_ROW.format('even' if index % 2 == 0 else 'odd', submit_id,
+                              '12:{0:02}:{1:02}'.format(submit.submit_id // 60 % 60, submit.submit_id % 60),
+                              '18 Oct 2026', submit.author_id, submit.problem,
+                              _LANGUAGES.get(submit.language, submit.language), verdict_class, verdict, test,
+                              '0.{0:03}'.format(submit.submit_id % 1000) if judged else '',
+                              '{0} KB'.format(100 + submit.submit_id % 900) if judged else '')
+
+
+def _make_page(body: str) -> bytes:
+    return '{0}<HTML><BODY>{1}</BODY></HTML>'.format(_HEAD, body).encode('utf-8')
+
+
+def _get_int(query: Dict[str, str], name: str, default: Optional[int] = None) -> Optional[int]:
+    value = query.get(name, '')
+    return int(value) if value.isdigit() else default
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    state = None  # type: TimusState
+
+    def _send(self, status: int, content: bytes, content_type: str = _HTML, headers: Dict[str, str] = None) -> None:
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            content = gzip.compress(content, compresslevel=1)
+            headers = dict(headers or {}, **{'Content-Encoding': 'gzip'})
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(content)
+
+    def _get_cookies(self) -> Dict[str, str]:
+        cookies = {}
+        for part in self.headers.get('Cookie', '').split(';'):
+            name, _, value = part.strip().partition('=')
+            if name:
+                cookies[name] = value
+        return cookies
+
+    def _read_form(self) -> Dict[str, str]:
+        length = int(self.headers.get('Content-Length', 0))
+        form = urllib.parse.parse_qs(self.rfile.read(length).decode('utf-8'), keep_blank_values=True)
+        return {name: values[0] for name, values in form.items()}
+
+    def _handle(self, form: Dict[str, str]) -> None:
+        delay, failed = self.state.draw_delay_and_error()
+        if delay:
+            time.sleep(delay)
+        if failed:
+            self._send(self.state.options.error_status, _make_page('Service Unavailable'))
+            return
+
+        url = urllib.parse.urlsplit(self.path)
+        query = {name: values[0] for name, values in urllib.parse.parse_qs(url.query).items()}
+        path, _, rest = url.path.partition('.aspx')
+        handler = _ROUTES.get(path + '.aspx')
+        if handler is None:
+            self._send(404, _make_page('Not Found'))
+            return
+        handler(self, query, form, rest.lstrip('/'))
+
+    def do_GET(self):
+        self._handle({})
+
+    def do_POST(self):
+        self._handle(self._read_form())
+
+    def log_message(self, format, *args):
+        pass
+
+    def _serve_auth(self, query: Dict[str, str], form: Dict[str, str], rest: str) -> None:
+        judge_id = form.get('JudgeID', '')
+        if form.get('Action') != 'login' or not judge_id:
+            self._send(200, _make_page('Invalid JudgeID'))
+            return
+        self._send(302, b'', headers={'Location': '/', 'Set-Cookie': 'AuthorID={0}; path=/'.format(
+            get_author_id(judge_id))})
+
+    def _serve_submit(self, query: Dict[str, str], form: Dict[str, str], rest: str) -> None:
+        if form.get('Action') != 'submit':
+            self._send(200, self.state.corpus['submit.html'])
+            return
+        # the real judge answers with the form and a message, without the header
+        problem = _get_int(form, 'ProblemNum')
+        if problem is None or not form.get('Source'):
+            self._send(200, _make_page('Invalid submit'))
+            return
+        submit = self.state.submit(form.get('JudgeID', ''), problem, form.get('Language', ''), form['Source'])
+        if submit is None:
+            self._send(200, _make_page('You can submit only once in {0:.0f} seconds'.format(
+                self.state.options.submit_interval)))
+            return
+        self._send(302, b'', headers={'Location': '/status.aspx', 'X-SubmitID': str(submit.submit_id)})
+
+    def _serve_status(self, query: Dict[str, str], form: Dict[str, str], rest: str) -> None:
+        author_id = self._get_cookies().get('AuthorID') if query.get('author') == 'me' else None
+        if query.get('author') == 'me' and author_id is None:
+            self._send(200, _make_page('<TABLE class="status"></TABLE>'))
+            return
+        own_id = self._get_cookies().get('AuthorID')
+        submits = self.state.find_submits(_get_int(query, 'from'), min(_get_int(query, 'count', 15), 1000),
+                                          author_id, _get_int(query, 'num'))
+        rows = ''.join(_make_status_row(self.state, submit, i, submit.author_id == own_id)
+                       for i, submit in enumerate(submits))
+        self._send(200, _make_page('<TABLE class="status"><TR class="header"><TD>ID</TD></TR>\n{0}</TABLE>'.format(
+            rows)))
+
+    def _serve_error(self, query: Dict[str, str], form: Dict[str, str], rest: str) -> None:
+        submit = self.state.get_submit(_get_int(query, 'id', 0))
+        if submit is None or self.state.get_verdict(submit)[1] != 'Compilation error':
+            self._send(200, _make_page('Compilation error is not found'))
+            return
+        self._send(200, 'solution.{0}(1): error: expected a declaration\n'.format(
+            _EXTENSIONS.get(submit.language, 'txt')).encode('utf-8'), _TEXT)
+
+    def _serve_get_submit(self, query: Dict[str, str], form: Dict[str, str], rest: str) -> None:
+        submit_id = rest.split('.')[0]
+        submit = self.state.get_submit(int(submit_id)) if submit_id.isdigit() else None
+        if submit is None or submit.author_id != get_author_id(form.get('JudgeID', '')):
+            self._send(200, _make_page('Access denied'))
+            return
+        self._send(200, submit.source.encode('utf-8'), _TEXT)
+
+    def _serve_problem(self, query: Dict[str, str], form: Dict[str, str], rest: str) -> None:
+        number = _get_int(query, 'num')
+        if number is None:
+            self._send(200, _make_page('Problem not found'))
+            return
+        # the clients send the locale as the judge names it, "English" or "Russian"
+        locale = 'ru' if self._get_cookies().get('Locale', 'English') in ('Russian', 'ru') else 'en'
+        self._send(200, self.state.corpus.get('problem_{0}_{1}.html'.format(locale, number)) or
+                   _make_problem(number, locale))
+
+    def _serve_problem_set(self, query: Dict[str, str], form: Dict[str, str], rest: str) -> None:
+        # the menu with the pages and the tags is the page without a query
+        self._send(200, self.state.corpus['problemset_all.html' if query else 'problemset_menu.html'])
+
+
+_ROUTES = {
+    TimusUrls.auth.path: _Handler._serve_auth,
+    TimusUrls.submit.path: _Handler._serve_submit,
+    TimusUrls.status.path: _Handler._serve_status,
+    TimusUrls.error.path: _Handler._serve_error,
+    TimusUrls.get_submit.path: _Handler._serve_get_submit,
+    TimusUrls.problem.path: _Handler._serve_problem,
+    TimusUrls.problem_set.path: _Handler._serve_problem_set,
+}
+
+
+class MockTimusServer(object):
+    def __init__(self, options: MockOptions = None, fixtures: str = _FIXTURES_DIR, host: str = '127.0.0.1',
+                 port: int = 0):
+        corpus, self.source = load_corpus(fixtures)
+        self.state = TimusState(options if options is not None else MockOptions(), corpus)
+        handler = type('Handler', (_Handler,), {'state': self.state})
+        self._server = http.server.ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return 'http://{0}:{1}'.format(host, port)
+
+    def start(self) -> 'MockTimusServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def __enter__(self) -> 'MockTimusServer':
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Local stand-in for acm.timus.ru, point judge_url at it')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--fixtures', default=_FIXTURES_DIR,
+                        help='directory of saved pages (bench_parsers.py --record), synthetic pages when it is empty')
+    parser.add_argument('--latency', type=float, default=0.0, help='milliseconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='milliseconds of random spread of the latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of the requests that fail')
+    parser.add_argument('--error-status', type=int, default=503, help='HTTP status of the failed requests')
+    parser.add_argument('--submit-interval', type=float, default=SUBMIT_INTERVAL,
+                        help='seconds between the submits of one judge id')
+    parser.add_argument('--judge-time', type=float, default=2.0, help='seconds a new submit stays running')
+    parser.add_argument('--submits', type=int, default=_DEFAULT_SUBMITS, help='submits on the status page at start')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the submits, the delays and the errors')
+    args = parser.parse_args()
+
+    options = MockOptions(args.latency / 1000, args.jitter / 1000, args.error_rate, args.error_status,
+                          args.submit_interval, args.judge_time, args.submits, args.seed)
+    server = MockTimusServer(options, args.fixtures, args.host, args.port)
+    print('serving {0} pages on {1}'.format(server.source, server.url))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print('{0} requests, {1} failed'.format(server.state.requests, server.state.errors))
+
+
+if __name__ == '__main__':
+    main()
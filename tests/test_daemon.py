@@ -0,0 +1,42 @@
+import unittest
+
+from acm_cli.acm_api import TransportOptions
+from acm_cli.daemon import Daemon
+from acm_cli.settings import Settings
+
+
+def _make_settings(password: str = 'secret', read_timeout: float = 30.0) -> Settings:
+    settings = Settings()
+    settings.locale = 'en'
+    settings.judge_id = '1A'
+    settings.password = password
+    settings.http_client = 'requests'
+    settings.cache = True
+    settings.renderer = 'html2text'
+    settings.offline = False
+    settings.transport = TransportOptions(read_timeout=read_timeout)
+    return settings
+
+
+class DaemonApiTest(unittest.TestCase):
+    def setUp(self):
+        self.created = []
+        self.daemon = Daemon('', self._create_api, lambda api, settings: None)
+
+    def _create_api(self, settings: Settings) -> object:
+        self.created.append(settings)
+        return object()
+
+    def test_same_settings_reuse_the_api(self):
+        self.assertIs(self.daemon._get_api(_make_settings()), self.daemon._get_api(_make_settings()))
+        self.assertEqual(1, len(self.created))
+
+    def test_changed_password_or_transport_builds_a_new_api(self):
+        api = self.daemon._get_api(_make_settings())
+        self.assertIsNot(api, self.daemon._get_api(_make_settings(password='other')))
+        self.assertIsNot(api, self.daemon._get_api(_make_settings(read_timeout=5.0)))
+        self.assertEqual(3, len(self.created))
+
+
+if __name__ == '__main__':
+    unittest.main()
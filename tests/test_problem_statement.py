@@ -0,0 +1,56 @@
+import os
+import unittest
+from typing import List, Set
+
+import lxml.html
+
+from acm_cli.acm_api.apis.timus import parsers
+
+_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+_NESTED_SOURCE_FIXTURE = 'problem_en_1000_nested_source.html'
+
+
+def _load_problem_pages() -> List[str]:
+    return sorted(name for name in os.listdir(_FIXTURES_DIR) if name.startswith('problem_'))
+
+
+def _get_skipped(text: lxml.html.HtmlElement) -> Set[lxml.html.HtmlElement]:
+    # the blocks the statement parser leaves out of the text
+    return set(text.find_class('problem_source') + text.find_class('sample') + text.find_class('problem_subtitle'))
+
+
+def _to_html_removed(page: bytes, paths: List[str]) -> str:
+    # the serializer before the single-pass parser: remove the blocks from a fresh tree, then serialize
+    tree = lxml.html.fromstring(page)
+    elements = [tree.getroottree().xpath(path)[0] for path in paths]
+    for element in elements:
+        element.getparent().remove(element)
+    return lxml.html.tostring(tree.get_element_by_id('problem_text')).decode('utf-8')
+
+
+class StatementSerializerTest(unittest.TestCase):
+    def test_matches_removed_blocks(self):
+        names = _load_problem_pages()
+        self.assertIn(_NESTED_SOURCE_FIXTURE, names)
+        for name in names:
+            with open(os.path.join(_FIXTURES_DIR, name), 'rb') as fixture:
+                page = fixture.read()
+            tree = lxml.html.fromstring(page)
+            text = tree.get_element_by_id('problem_text')
+            skipped = _get_skipped(text)
+            before = lxml.html.tostring(tree)
+            paths = [tree.getroottree().getpath(x) for x in skipped]
+
+            self.assertEqual(_to_html_removed(page, paths), parsers._to_html_without(text, skipped), name)
+            self.assertEqual(before, lxml.html.tostring(tree), name)
+
+    def test_nested_source_is_not_in_text(self):
+        with open(os.path.join(_FIXTURES_DIR, _NESTED_SOURCE_FIXTURE), 'rb') as fixture:
+            problem = parsers.parse_problem(fixture.read())
+        self.assertEqual('Ivan Ivanov', problem.author)
+        self.assertNotIn('Ivan Ivanov', problem.text)
+        self.assertTrue(problem.text.endswith('Good luck!'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from acm_cli.acm_api import Problem
+from acm_cli.problem_store import ProblemStore
+from acm_cli.search_index import SearchIndex
+
+
+def _make_problem(number: int, text: str) -> Problem:
+    problem = Problem()
+    problem.number = number
+    problem.title = 'Problem {0}'.format(number)
+    problem.text = text
+    return problem
+
+
+class SearchIndexUpdateTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.store = ProblemStore(self._directory.name, 'en')
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _save(self, problem: Problem, saved_at: float) -> None:
+        self.store.save(problem)
+        path = os.path.join(self.store.path, '{0}.json'.format(problem.number))
+        os.utime(path, (saved_at, saved_at))
+
+    def _find(self, index: SearchIndex, text: str):
+        return [result.number for result in index.search(text)]
+
+    def test_mirrored_again_is_reindexed(self):
+        self._save(_make_problem(1000, 'apples'), time.time() - 60)
+        self._save(_make_problem(1001, 'pears'), time.time() - 60)
+        index = SearchIndex.for_store(self.store)
+        self.assertEqual(2, index.update(self.store))
+        self.assertEqual(0, index.update(self.store))
+
+        self._save(_make_problem(1000, 'oranges'), time.time() + 60)
+        self.assertEqual(1, index.update(self.store))
+        self.assertEqual([1000], self._find(index, 'oranges'))
+        self.assertEqual([], self._find(index, 'apples'))
+
+    def test_index_without_indexed_at_is_rebuilt(self):
+        self._save(_make_problem(1000, 'apples'), time.time() - 60)
+        connection = sqlite3.connect(os.path.join(self.store.path, 'index.sqlite'))
+        connection.execute('CREATE TABLE documents (number INTEGER PRIMARY KEY, title TEXT NOT NULL, '
+                           'difficulty INTEGER NOT NULL, length REAL NOT NULL)')
+        connection.execute("INSERT INTO documents VALUES (1000, 'Problem 1000', 0, 1.0)")
+        connection.commit()
+        connection.close()
+
+        index = SearchIndex.for_store(self.store)
+        self.assertEqual(1, index.update(self.store))
+        self.assertEqual([1000], self._find(index, 'apples'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from typing import Dict, List, Tuple
+
+from acm_cli.acm_api import AcmApiError, BackoffPolicy, SubmitStatus, SubmitThrottledError, SubmitWatcher
+from acm_cli.submit_queue import SubmitClock, SubmitJob, SubmitQueue
+
+
+class _FakeApi(object):
+    submit_interval = 0.0
+
+    def __init__(self, errors=(), lost_ids=(), languages=('1',)):
+        self.errors = list(errors)
+        self.lost_ids = set(lost_ids)
+        self.languages = set(languages)
+        self.sent = []
+
+    def submit(self, judge_id: str, language: str, problem_num: int, source: str) -> str:
+        self.sent.append(problem_num)
+        if language not in self.languages:
+            raise AcmApiError('Timus rejected the submit of problem {0}'.format(problem_num))
+        if self.errors:
+            raise self.errors.pop(0)
+        return str(len(self.sent))
+
+    def get_submit_statuses(self, submit_ids: List[str]) -> Dict[str, SubmitStatus]:
+        if self.lost_ids.intersection(submit_ids):
+            raise AcmApiError('Submit is not found')
+        statuses = {}
+        for submit_id in submit_ids:
+            statuses[submit_id] = SubmitStatus()
+            statuses[submit_id].submit_id = submit_id
+            statuses[submit_id].set_verdict('Accepted')
+        return statuses
+
+
+class _FakeClock(SubmitClock):
+    def __init__(self):
+        super().__init__('judge', 0.0, path='')
+
+    def get_wait(self) -> float:
+        return 0.0
+
+    def mark(self) -> None:
+        pass
+
+
+class SubmitQueueTest(unittest.TestCase):
+    def _run(self, api: _FakeApi, jobs: List[SubmitJob]) -> Tuple[SubmitQueue, List[str], List[SubmitJob]]:
+        watcher = SubmitWatcher(api, BackoffPolicy(0.0, 0.0, 0.0, jitter=0.0))
+        reported = []
+        queue = SubmitQueue(api, 'judge', clock=_FakeClock(), watcher=watcher, callback=reported.append)
+        for job in jobs:
+            queue.add(job)
+        return queue, [status.submit_id for status in queue.run()], reported
+
+    def test_throttled_submit_is_retried(self):
+        api = _FakeApi([SubmitThrottledError('too early')])
+        job = SubmitJob(1000, 'a.cpp', '1', 'source')
+        queue, judged, reported = self._run(api, [job])
+
+        self.assertEqual([1000, 1000], api.sent)
+        self.assertEqual(['2'], judged)
+        self.assertEqual('2', job.submit_id)
+        self.assertEqual([job], reported)
+        self.assertEqual([], queue.failed)
+
+    def test_unknown_language_is_not_retried(self):
+        api = _FakeApi()
+        rejected = SubmitJob(1000, 'a.cob', None, 'source')
+        accepted = SubmitJob(1001, 'b.cpp', '1', 'source')
+        queue, judged, reported = self._run(api, [rejected, accepted])
+
+        self.assertEqual([1000, 1001], api.sent)
+        self.assertEqual(['2'], judged)
+        self.assertIsNone(rejected.submit_id)
+        self.assertEqual([rejected, accepted], reported)
+        self.assertEqual([rejected], queue.failed)
+
+    def test_lost_submit_does_not_stop_the_others(self):
+        queue, judged, reported = self._run(_FakeApi(lost_ids=['1']), [SubmitJob(1000, 'a.cpp', '1', 'source'),
+                                                                       SubmitJob(1001, 'b.cpp', '1', 'source')])
+
+        self.assertEqual(['2'], judged)
+        self.assertEqual(['1'], [job.submit_id for job in queue.lost])
+        self.assertIsInstance(queue.lost[0].error, AcmApiError)
+        self.assertIn(queue.lost[0], reported)
+
+
+if __name__ == '__main__':
+    unittest.main()
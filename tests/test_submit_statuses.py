@@ -0,0 +1,61 @@
+import asyncio
+import unittest
+from typing import Dict, List
+
+from acm_cli.acm_api import SubmitStatus
+from acm_cli.acm_api.apis.timus.async_timus_api import AsyncTimusApi
+from acm_cli.acm_api.apis.timus.timus_api import TimusApi, TimusApiError
+
+
+def _make_status(submit_id: str) -> SubmitStatus:
+    status = SubmitStatus()
+    status.submit_id = submit_id
+    return status
+
+
+# the common status page shows the public submits, the page of one submit the nearest own submit
+_PUBLIC = ['100', '99', '97']
+_OWN = {'98': '98', '50': '42'}
+
+
+def _get_window(from_id: str, count: int) -> List[SubmitStatus]:
+    return [_make_status(x) for x in _PUBLIC if int(from_id) - count < int(x) <= int(from_id)]
+
+
+class _FakeTimusApi(TimusApi):
+    def get_submits_window(self, from_id: str, count: int) -> List[SubmitStatus]:
+        return _get_window(from_id, count)
+
+    def get_submit_status(self, submit_id: str) -> SubmitStatus:
+        return _make_status(_OWN[submit_id])
+
+
+class _FakeAsyncTimusApi(AsyncTimusApi):
+    async def get_submits_window(self, from_id: str, count: int) -> List[SubmitStatus]:
+        return _get_window(from_id, count)
+
+    async def get_submit_status(self, submit_id: str) -> SubmitStatus:
+        return _make_status(_OWN[submit_id])
+
+
+class SubmitStatusesTest(unittest.TestCase):
+    def _get_statuses(self, submit_ids: List[str]) -> List[Dict[str, SubmitStatus]]:
+        sync_api = _FakeTimusApi('en')
+        async_api = _FakeAsyncTimusApi('en')
+        return [sync_api.get_submit_statuses(submit_ids),
+                asyncio.run(async_api.get_submit_statuses(submit_ids))]
+
+    def test_window_and_own_submits(self):
+        for statuses in self._get_statuses(['100', '98', '97']):
+            self.assertEqual(['100', '98', '97'], list(statuses))
+            self.assertEqual(['100', '98', '97'], [status.submit_id for status in statuses.values()])
+
+    def test_foreign_submit_is_an_error(self):
+        with self.assertRaises(TimusApiError):
+            _FakeTimusApi('en').get_submit_statuses(['100', '50'])
+        with self.assertRaises(TimusApiError):
+            asyncio.run(_FakeAsyncTimusApi('en').get_submit_statuses(['100', '50']))
+
+
+if __name__ == '__main__':
+    unittest.main()
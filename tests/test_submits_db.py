@@ -0,0 +1,45 @@
+import calendar
+import os
+import tempfile
+import unittest
+
+from acm_cli.acm_api import SubmitStatus
+from acm_cli.submits_db import SubmitsDatabase, _parse_timestamp
+
+
+def _make_status(submit_id: str, date: str) -> SubmitStatus:
+    status = SubmitStatus()
+    status.submit_id = submit_id
+    status.date = date
+    status.problem = '1000. A+B Problem'
+    status.language = 'G++ 9.2 x64'
+    status.set_verdict('Accepted')
+    return status
+
+
+class ParseTimestampTest(unittest.TestCase):
+    def test_english(self):
+        self.assertEqual(calendar.timegm((2026, 10, 18, 12, 0, 5, 0, 0, 0)), _parse_timestamp('12:00:0518 Oct 2026'))
+
+    def test_russian(self):
+        self.assertEqual(calendar.timegm((2026, 10, 18, 12, 0, 5, 0, 0, 0)), _parse_timestamp('12:00:0518 окт 2026'))
+        self.assertEqual(calendar.timegm((2020, 5, 5, 1, 2, 3, 0, 0, 0)), _parse_timestamp('01:02:03 5 мая 2020'))
+
+    def test_unknown(self):
+        self.assertIsNone(_parse_timestamp('12:00:05 18 Foo 2026'))
+        self.assertIsNone(_parse_timestamp('12:00:05 31 Feb 2026'))
+
+
+class SinceQueryTest(unittest.TestCase):
+    def test_both_locales(self):
+        with tempfile.TemporaryDirectory() as directory:
+            history = SubmitsDatabase(os.path.join(directory, 'submits.sqlite'))
+            history.save([_make_status('3', '10:00:0002 Jan 2026'), _make_status('2', '10:00:0002 янв 2026'),
+                          _make_status('1', '10:00:0031 Dec 2025')])
+            since = calendar.timegm((2026, 1, 1, 0, 0, 0, 0, 0, 0))
+            self.assertEqual(['3', '2'], [status.submit_id for status in history.query(since=since)])
+            history.close()
+
+
+if __name__ == '__main__':
+    unittest.main()